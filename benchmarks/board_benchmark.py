@@ -0,0 +1,168 @@
+"""
+Board engine micro-benchmark.
+
+Compares the bitboard TicTacToeBoard against the previous list-of-lists
+implementation on the operations the game loop calls most often.
+
+Usage:
+    python -m benchmarks.board_benchmark [--seconds 1.0]
+"""
+
+import argparse
+import logging
+import random
+import time
+from typing import Callable, List, Optional, Tuple
+
+from src.config.settings import settings
+from src.game.board import TicTacToeBoard
+from src.utils.logger import logger
+
+
+class ListBoard:
+    """Reference list-of-lists board (the pre-bitboard implementation)."""
+
+    def __init__(self):
+        """Initialize an empty board."""
+        self.board = [[settings.EMPTY_CELL for _ in range(settings.BOARD_SIZE)] for _ in range(settings.BOARD_SIZE)]
+        self.current_player = settings.PLAYER_X
+
+    def make_move(self, row: int, col: int) -> Tuple[bool, str]:
+        """Place the current player's mark."""
+        if not (0 <= row <= 2 and 0 <= col <= 2) or self.board[row][col] != settings.EMPTY_CELL:
+            return False, "Invalid move"
+        self.board[row][col] = self.current_player
+        logger.info(f"Player {self.current_player} placed at position ({row}, {col})")
+        board_state = self.get_board_state()
+        self.current_player = settings.PLAYER_O if self.current_player == settings.PLAYER_X else settings.PLAYER_X
+        return True, f"Move successful!\n{board_state}"
+
+    def get_board_state(self) -> str:
+        """Render the grid as text."""
+        board_str = "\n-------------\n"
+        for row in self.board:
+            board_str += f"| {' | '.join(row)} |\n-------------\n"
+        return board_str
+
+    def check_winner(self) -> Optional[str]:
+        """Scan rows, columns and diagonals."""
+        size = settings.BOARD_SIZE
+        for row in self.board:
+            if row.count(row[0]) == size and row[0] != settings.EMPTY_CELL:
+                return row[0]
+        for col in range(size):
+            column = [self.board[row][col] for row in range(size)]
+            if column.count(column[0]) == size and column[0] != settings.EMPTY_CELL:
+                return column[0]
+        diagonal1 = [self.board[i][i] for i in range(size)]
+        if diagonal1.count(diagonal1[0]) == size and diagonal1[0] != settings.EMPTY_CELL:
+            return diagonal1[0]
+        diagonal2 = [self.board[i][size - 1 - i] for i in range(size)]
+        if diagonal2.count(diagonal2[0]) == size and diagonal2[0] != settings.EMPTY_CELL:
+            return diagonal2[0]
+        return None
+
+    def is_board_full(self) -> bool:
+        """Check every cell."""
+        return all(cell != settings.EMPTY_CELL for row in self.board for cell in row)
+
+    def get_valid_moves(self) -> List[Tuple[int, int]]:
+        """Collect empty cells."""
+        return [
+            (row, col)
+            for row in range(settings.BOARD_SIZE)
+            for col in range(settings.BOARD_SIZE)
+            if self.board[row][col] == settings.EMPTY_CELL
+        ]
+
+
+def play_random_game(board_cls: Callable, rng: random.Random) -> None:
+    """
+    Play one random game, querying the board the way the game loop does.
+
+    Args:
+        board_cls: Board class to instantiate
+        rng: Random source shared across runs
+    """
+    board = board_cls()
+    while True:
+        if board.check_winner() or board.is_board_full():
+            return
+        row, col = rng.choice(board.get_valid_moves())
+        board.make_move(row, col)
+
+
+def rerun_queries(board) -> None:
+    """
+    Query the board the way one Streamlit rerun does: game state from three places,
+    then the valid moves and rendered board for the prompt.
+
+    Args:
+        board: Board to query
+    """
+    for _ in range(3):
+        board.check_winner() or board.is_board_full()
+    board.get_valid_moves()
+    board.get_board_state()
+
+
+def measure(label: str, func: Callable[[], None], seconds: float) -> float:
+    """
+    Call ``func`` repeatedly for roughly ``seconds`` and report ops/sec.
+
+    Args:
+        label: Name printed next to the result
+        func: Zero-argument callable to time
+        seconds: Time budget for the measurement
+
+    Returns:
+        float: Operations per second
+    """
+    ops = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            func()
+        ops += 100
+    rate = ops / (time.perf_counter() - start)
+    print(f"  {label:<28} {rate:>14,.0f} ops/sec")
+    return rate
+
+
+def run(seconds: float) -> None:
+    """
+    Run every benchmark against both board implementations.
+
+    Args:
+        seconds: Time budget per measurement
+    """
+    # Board methods log at INFO; keep the console out of the measurement
+    logger.setLevel(logging.WARNING)
+
+    midgame = [(1, 1), (0, 0), (2, 2), (0, 2)]
+    results = {}
+    for board_cls in (ListBoard, TicTacToeBoard):
+        print(f"{board_cls.__name__}:")
+        board = board_cls()
+        for row, col in midgame:
+            board.make_move(row, col)
+        rates = {
+            "check_winner": measure("check_winner", board.check_winner, seconds),
+            "is_board_full": measure("is_board_full", board.is_board_full, seconds),
+            "get_valid_moves": measure("get_valid_moves", board.get_valid_moves, seconds),
+            "rerun_queries": measure("rerun queries", lambda: rerun_queries(board), seconds),
+        }
+        rng = random.Random(0)
+        rates["random_game"] = measure("random game", lambda: play_random_game(board_cls, rng), seconds)
+        results[board_cls] = rates
+
+    print("Speedup (bitboard / list):")
+    for name, rate in results[TicTacToeBoard].items():
+        print(f"  {name:<28} {rate / results[ListBoard][name]:>13.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=1.0, help="time budget per measurement")
+    run(parser.parse_args().seconds)
@@ -0,0 +1,81 @@
+"""
+Game archive benchmark.
+
+Archives simulated 3x3 games in the compact binary format and compares the
+size per game against the same games as JSON session move histories, then
+times streaming them back with chunked reads and with mmap.
+
+Usage:
+    python -m benchmarks.game_record_benchmark [--games 1000000]
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+
+from src.game.batch_sim import BatchSimulator
+from src.game.game_record import GameRecord, GameRecordWriter, read_records
+from src.utils.logger import logger
+
+OUTCOMES = {1: "X", -1: "O", 0: "draw"}
+
+
+def run(games: int) -> None:
+    """
+    Archive simulated games and print sizes and throughputs.
+
+    Args:
+        games: Games to archive
+    """
+    logger.setLevel(logging.WARNING)
+    batch = BatchSimulator(3, 3, seed=0).run(games, "heuristic", "random")
+    records = [
+        GameRecord(
+            "mock:heuristic",
+            "mock:random",
+            3,
+            3,
+            batch.moves[i, : batch.lengths[i]].tolist(),
+            OUTCOMES[int(batch.winners[i])],
+            "compact",
+            seed=0,
+            played_at=1.7e9 + i,
+            elapsed=1.0,
+        )
+        for i in range(games)
+    ]
+    # One session history's JSON, for the size comparison
+    json_bytes = len(json.dumps(records[0].to_move_history())) / len(records[0].moves)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.ttr")
+        start = time.perf_counter()
+        with GameRecordWriter(path) as writer:
+            for i in range(0, games, 10_000):
+                writer.write_all(records[i:i + 10_000])
+        written = time.perf_counter() - start
+        size = os.path.getsize(path)
+
+        reads = {}
+        for use_mmap in (False, True):
+            start = time.perf_counter()
+            count = sum(1 for _ in read_records(path, use_mmap=use_mmap))
+            reads[use_mmap] = time.perf_counter() - start
+            assert count == games
+
+    moves = sum(len(record.moves) for record in records)
+    print(f"  {'Games archived':<28} {games:>12,} ({games / written:,.0f} games/s)")
+    print(f"  {'Binary bytes per game':<28} {size / games:>12.1f}")
+    print(f"  {'JSON history bytes per game':<28} {json_bytes * moves / games:>12.1f}")
+    print(f"  {'Read (chunked)':<28} {games / reads[False]:>12,.0f} games/s")
+    print(f"  {'Read (mmap)':<28} {games / reads[True]:>12,.0f} games/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=1_000_000, help="games to archive")
+    args = parser.parse_args()
+    run(args.games)
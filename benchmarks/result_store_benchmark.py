@@ -0,0 +1,90 @@
+"""
+Result store benchmark.
+
+Fills a fresh store with synthetic games through the batching writer, then
+times the sidebar's reads from the pre-aggregated tables against the same
+aggregates computed with GROUP BY over the games table. Writes include the
+incremental rating updates; the full vectorized rating recompute is timed
+separately.
+
+Usage:
+    python -m benchmarks.result_store_benchmark [--games 1000000] [--models 20]
+"""
+
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+
+from src.config.settings import settings
+from src.game.match_runner import MatchResult
+from src.game.result_store import ResultStore
+from src.utils.logger import logger
+
+
+def best_ms(func, repeats: int = 20) -> float:
+    """Fastest of several runs of func, in milliseconds."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+def run(games: int, models: int) -> None:
+    """
+    Fill a store and print write throughput and read latencies.
+
+    Args:
+        games: Games to insert
+        models: Distinct model strings to pair up
+    """
+    # The writer logs per batch only on errors, but keep the console quiet anyway
+    logger.setLevel(logging.WARNING)
+    rng = random.Random(0)
+    names = [f"mock:model-{i}" for i in range(models)]
+    outcomes = [settings.PLAYER_X, settings.PLAYER_O, None]
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = ResultStore(os.path.join(directory, "results.sqlite3"), batch_size=5000)
+        start = time.perf_counter()
+        for _ in range(games):
+            model_x, model_o = rng.sample(names, 2)
+            store.record(MatchResult(model_x, model_o, 3, 3, winner=rng.choice(outcomes)), "benchmark")
+        store.flush()
+        written = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store.recompute_ratings()
+        recomputed = (time.perf_counter() - start) * 1000
+
+        conn = store._connect()
+        leaderboard = best_ms(lambda: store.model_records())
+        ratings = best_ms(lambda: store.ratings())
+        totals = best_ms(lambda: store.totals())
+        scan = best_ms(
+            lambda: conn.execute(
+                "SELECT model_x, SUM(outcome = 'X') FROM games GROUP BY model_x ORDER BY 2 DESC"
+            ).fetchall(),
+            repeats=3,
+        )
+        conn.close()
+        store.close()
+
+    print(f"  {'Games written':<28} {games:>12,} ({games / written:,.0f} games/s)")
+    print(f"  {'Totals (aggregate)':<28} {totals:>12.3f} ms")
+    print(f"  {'Leaderboard (aggregate)':<28} {leaderboard:>12.3f} ms")
+    print(f"  {'Leaderboard (GROUP BY scan)':<28} {scan:>12.3f} ms")
+    print(f"  {'Ratings (stored)':<28} {ratings:>12.3f} ms")
+    print(f"  {'Ratings (full recompute)':<28} {recomputed:>12.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=1_000_000, help="games to insert")
+    parser.add_argument("--models", type=int, default=20, help="distinct models")
+    args = parser.parse_args()
+    run(args.games, args.models)
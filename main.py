@@ -2,30 +2,42 @@
 Main entry point for the Tic Tac Toe Agent Game application.
 """
 
-import re
+from typing import Optional
 import nest_asyncio
 import streamlit as st
-from agno.run.agent import RunOutput
 
 # Apply nest_asyncio for proper async handling
 nest_asyncio.apply()
 
 # Import application modules
 from src.config.settings import settings
-from src.game.board import TicTacToeBoard
-from src.agents.tic_tac_toe_agent import TicTacToeAgentFactory
+from src.game.game_record import GameRecord, get_game_archive
+from src.game.match_runner import MatchRunner
+from src.game.result_store import get_result_store
+from src.agents.hedging import get_hedger
+from src.agents.move_cache import get_move_cache
+from src.agents.move_resolver import MoveStats, get_move_resolver
+from src.agents.prompts import PROMPT_FORMATS, player_prompt_format
+from src.agents.speculation import get_speculator
+from src.agents.agent_pool import AgentPool
 from src.ui.styles import CUSTOM_CSS
 from src.ui.components import UIComponents
 from src.utils.logger import logger
 
 
+@st.cache_resource(show_spinner=False)
+def get_shared_agent_pool() -> AgentPool:
+    """Agent pool shared by every browser session served by this process."""
+    return AgentPool()
+
+
 class TicTacToeGame:
     """Main game controller for Tic Tac Toe."""
 
     def __init__(self):
         """Initialize the game controller."""
         self.ui = UIComponents()
-        self.agent_factory = TicTacToeAgentFactory()
+        self.agent_pool = get_shared_agent_pool()
 
     def configure_page(self):
         """Configure Streamlit page settings."""
@@ -46,19 +58,17 @@ class TicTacToeGame:
             st.session_state.move_history = []
             logger.info("Session state initialized")
 
-        # Initialize statistics tracking
-        if "session_stats" not in st.session_state:
-            st.session_state.session_stats = {
-                "total_games": 0,
-                "x_wins": 0,
-                "o_wins": 0,
-                "draws": 0,
-                "model_wins": {},  # Track wins per model
-            }
+        # Stats are read from the result store; "Reset Stats" only moves this session's baseline
+        if "stats_baseline" not in st.session_state:
+            st.session_state.stats_baseline = None
 
         if "current_streak" not in st.session_state:
             st.session_state.current_streak = {"player": None, "count": 0}
 
+        # Last failed move, shown until the game is resumed or restarted
+        if "move_error" not in st.session_state:
+            st.session_state.move_error = None
+
     def render_header(self):
         """Render the main application header."""
         st.markdown(
@@ -114,6 +124,49 @@ class TicTacToeGame:
 
             st.markdown("---")
 
+            # 🧩 BOARD VARIANT
+            st.markdown("### 🧩 BOARD")
+            variants = list(settings.BOARD_VARIANTS.keys())
+            st.selectbox(
+                "Board Variant",
+                variants,
+                index=variants.index(settings.DEFAULT_BOARD_VARIANT),
+                key="board_variant",
+                label_visibility="collapsed",
+            )
+
+            # 📝 PROMPT FORMAT
+            st.markdown("### 📝 PROMPT FORMAT")
+            st.selectbox(
+                "Prompt Format",
+                PROMPT_FORMATS,
+                index=PROMPT_FORMATS.index(settings.PROMPT_FORMAT),
+                key="prompt_format",
+                label_visibility="collapsed",
+                help="compact sends the board as one character per cell and the legal moves as cell indices",
+            )
+            st.toggle(
+                "⚡ Stream moves",
+                value=settings.STREAM_MOVES,
+                key="stream_moves",
+                help="Read replies as they stream in and cancel them as soon as a legal move has arrived",
+            )
+            st.toggle(
+                "🔮 Speculative prefetch",
+                value=settings.SPECULATIVE_PREFETCH,
+                key="speculate",
+                help="Request the opponent's reply to the likeliest moves while the current player is thinking",
+            )
+            st.toggle(
+                "🏁 Hedge slow requests",
+                value=settings.HEDGE_REQUESTS,
+                key="hedge_requests",
+                help=f"Send a duplicate request once a move takes longer than the model's "
+                f"p{settings.HEDGE_PERCENTILE:g} latency, and keep the first answer",
+            )
+
+            st.markdown("---")
+
             # API Key validation
             missing_keys = settings.get_missing_keys([selected_p_x, selected_p_o])
 
@@ -134,6 +187,26 @@ class TicTacToeGame:
 
             st.markdown("---")
 
+            # 🗃️ MOVE CACHE
+            if get_move_cache() is not None:
+                self._render_move_cache_stats()
+                st.markdown("---")
+
+            # 🛟 MOVE RETRIES
+            if any(stats.wasted for stats in get_move_resolver().stats.values()):
+                self._render_move_retry_stats()
+                st.markdown("---")
+
+            # 🔮 SPECULATION
+            if st.session_state.speculate:
+                self._render_speculation_stats()
+                st.markdown("---")
+
+            # 🏁 HEDGING
+            if st.session_state.hedge_requests:
+                self._render_hedging_stats()
+                st.markdown("---")
+
             # 🏆 TOP PERFORMERS
             self._render_leaderboard()
 
@@ -160,6 +233,7 @@ class TicTacToeGame:
                         use_container_width=True
                     ):
                         st.session_state.game_paused = not st.session_state.game_paused
+                        st.session_state.move_error = None
                         st.rerun()
 
         with col2:
@@ -171,15 +245,26 @@ class TicTacToeGame:
         """Start a new game."""
         model_x = settings.MODEL_OPTIONS[st.session_state.model_p1]
         model_o = settings.MODEL_OPTIONS[st.session_state.model_p2]
-
-        st.session_state.player_x, st.session_state.player_o = (
-            self.agent_factory.get_tic_tac_toe_players(
-                model_x=model_x,
-                model_o=model_o,
-                debug_mode=settings.DEBUG_MODE,
-            )
+        board_size, win_length = settings.BOARD_VARIANTS[st.session_state.board_variant]
+
+        # Cancel the previous game's prefetches and hand its players back to the pool
+        previous = st.session_state.get("match")
+        if previous is not None:
+            previous.close()
+
+        # The runner checks out warm players for this game; the app only renders it
+        match = MatchRunner(
+            model_x,
+            model_o,
+            board_size,
+            win_length,
+            st.session_state.prompt_format,
+            settings.DEBUG_MODE,
+            pool=self.agent_pool,
         )
-        st.session_state.game_board = TicTacToeBoard()
+        st.session_state.match = match
+        st.session_state.game_board = match.board
+        st.session_state.move_error = None
         st.session_state.game_started = True
         st.session_state.game_paused = False
         st.session_state.move_history = []
@@ -222,23 +307,24 @@ class TicTacToeGame:
                 st.rerun()
 
         with col2:
-            if st.button("📊 Reset Stats", help="Clear session statistics", use_container_width=True):
-                st.session_state.session_stats = {
-                    "total_games": 0,
-                    "x_wins": 0,
-                    "o_wins": 0,
-                    "draws": 0,
-                    "model_wins": {},
-                }
+            if st.button("📊 Reset Stats", help="Count statistics from now on (stored games are kept)", use_container_width=True):
+                # The store is append-only, so count from the current totals onwards; ratings keep all games
+                store = get_result_store()
+                st.session_state.stats_baseline = {"totals": store.totals("app")}
                 st.session_state.current_streak = {"player": None, "count": 0}
                 st.rerun()
 
     def _render_session_stats(self):
-        """Render session statistics."""
-        stats = st.session_state.session_stats
-        total = stats["total_games"]
+        """Render statistics of the games played in the app from the result store's pre-aggregated totals."""
+        # CLI and tournament games share the store but not this panel
+        totals = get_result_store().totals("app")
+        baseline = st.session_state.stats_baseline
+        if baseline:
+            totals = {outcome: games - baseline["totals"].get(outcome, 0) for outcome, games in totals.items()}
+        stats = {"x_wins": totals[settings.PLAYER_X], "o_wins": totals[settings.PLAYER_O], "draws": totals["draw"]}
+        total = stats["x_wins"] + stats["o_wins"] + stats["draws"]
 
-        st.markdown("### 📊 SESSION STATS")
+        st.markdown("### 📊 SESSION STATS" if baseline else "### 📊 ALL-TIME STATS")
 
         if total > 0:
             x_pct = (stats["x_wins"] / total) * 100
@@ -265,6 +351,90 @@ class TicTacToeGame:
         else:
             st.info("🎮 No games played yet. Start your first match!")
 
+    def _render_move_cache_stats(self):
+        """Render move cache hit/miss counters."""
+        cache = get_move_cache()
+        stats = cache.stats
+
+        st.markdown("### 🗃️ MOVE CACHE")
+        st.markdown(f"""
+        <div style='background: rgba(255,255,255,0.05); padding: 16px; border-radius: 12px;'>
+            <div style='margin-bottom: 8px;'>
+                ✅ Hits: <strong>{stats.hits}</strong> ({stats.hit_rate * 100:.1f}%)
+            </div>
+            <div style='margin-bottom: 8px;'>
+                ❌ Misses: <strong>{stats.misses}</strong>
+            </div>
+            <div style='font-size: 0.85em; color: #888;'>
+                {len(cache)} entries · {cache.policy} policy
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    def _render_move_retry_stats(self):
+        """Render wasted requests and fallback moves per model."""
+        resolver = get_move_resolver()
+        model_names = {model_str: name for name, model_str in settings.MODEL_OPTIONS.items()}
+
+        st.markdown("### 🛟 MOVE RETRIES")
+        rows = "".join(
+            f"<div style='margin-bottom: 8px;'><strong>{model_names.get(model_str, model_str)}</strong><br>"
+            f"<span style='font-size: 0.85em; color: #888;'>{stats.wasted}/{stats.requests} requests wasted · "
+            f"{stats.fallbacks} fallback moves ({stats.fallback_rate * 100:.1f}%)</span></div>"
+            for model_str, stats in sorted(resolver.stats.items())
+            if stats.wasted
+        )
+        st.markdown(f"""
+        <div style='background: rgba(255,255,255,0.05); padding: 16px; border-radius: 12px;'>
+            {rows}
+            <div style='font-size: 0.85em; color: #888;'>
+                {resolver.max_attempts} attempts per move · {resolver.fallback_policy} fallback
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    def _render_speculation_stats(self):
+        """Render the speculative prefetch hit rate and the extra requests it cost."""
+        speculator = get_speculator()
+        stats = speculator.stats
+
+        st.markdown("### 🔮 SPECULATION")
+        st.markdown(f"""
+        <div style='background: rgba(255,255,255,0.05); padding: 16px; border-radius: 12px;'>
+            <div style='margin-bottom: 8px;'>
+                🎯 Hits: <strong>{stats.hits}/{stats.turns}</strong> ({stats.hit_rate * 100:.1f}%)
+            </div>
+            <div style='margin-bottom: 8px;'>
+                💸 Extra calls: <strong>{stats.extra_calls}</strong>
+            </div>
+            <div style='font-size: 0.85em; color: #888;'>
+                {stats.saved_ms / 1000:.1f}s of replies overlapped · {speculator.width} moves per turn
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    def _render_hedging_stats(self):
+        """Render hedge rate, duplicate wins and estimated latency saved per model."""
+        hedger = get_hedger()
+        model_names = {model_str: name for name, model_str in settings.MODEL_OPTIONS.items()}
+
+        st.markdown("### 🏁 HEDGING")
+        rows = "".join(
+            f"<div style='margin-bottom: 8px;'><strong>{model_names.get(model_str, model_str)}</strong><br>"
+            f"<span style='font-size: 0.85em; color: #888;'>{stats.hedged}/{stats.requests} requests hedged "
+            f"({stats.hedge_rate * 100:.1f}%) · {stats.backup_wins} won by the duplicate · "
+            f"~{stats.saved_ms / 1000:.1f}s saved</span></div>"
+            for model_str, stats in sorted(hedger.stats.items())
+        )
+        st.markdown(f"""
+        <div style='background: rgba(255,255,255,0.05); padding: 16px; border-radius: 12px;'>
+            {rows}
+            <div style='font-size: 0.85em; color: #888;'>
+                p{hedger.percentile:g} threshold · {hedger.budget:.0%} budget · {hedger.target} model
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
     def _get_streak_display(self):
         """Get current streak display."""
         streak = st.session_state.current_streak
@@ -274,24 +444,35 @@ class TicTacToeGame:
         return ""
 
     def _render_leaderboard(self):
-        """Render top performing models leaderboard."""
+        """Render the top rated models with their colour ratings and 95% intervals."""
         st.markdown("### 🏆 TOP PERFORMERS")
 
-        model_wins = st.session_state.session_stats["model_wins"]
-
-        if model_wins:
-            # Sort models by win count
-            sorted_models = sorted(model_wins.items(), key=lambda x: x[1], reverse=True)[:3]
+        # Glicko ratings kept up to date by the result store as games are written
+        store = get_result_store()
+        model_names = {model_str: name for name, model_str in settings.MODEL_OPTIONS.items()}
+        colour_ratings = {(r.model, r.colour): r for r in store.ratings(by_colour=True)}
+        ratings = store.ratings()
 
+        if ratings:
             medals = ["🥇", "🥈", "🥉"]
-            for i, (model, wins) in enumerate(sorted_models):
+            for i, rating in enumerate(ratings[:3]):
                 medal = medals[i] if i < len(medals) else "🏅"
+                low, high = rating.interval
+                by_colour = " · ".join(
+                    f"{emoji} {colour_ratings[(rating.model, colour)].rating:.0f}"
+                    for colour, emoji in ((settings.PLAYER_X, "🔵"), (settings.PLAYER_O, "🔴"))
+                    if (rating.model, colour) in colour_ratings
+                )
                 st.markdown(f"""
                 <div style='background: rgba(255,255,255,0.05); padding: 10px;
                             border-radius: 8px; margin: 6px 0;'>
-                    {medal} <strong>{model}</strong>: {wins} wins
+                    {medal} <strong>{model_names.get(rating.model, rating.model)}</strong>: {rating.rating:.0f}
+                    <br><span style='font-size: 0.85em; color: #888;'>
+                        95% {low:.0f}–{high:.0f} · {by_colour} · {rating.games} games
+                    </span>
                 </div>
                 """, unsafe_allow_html=True)
+            st.caption("Glicko ratings, ranked by the low end of the 95% interval")
         else:
             st.info("🎮 Play some games to see top performers!")
 
@@ -342,6 +523,7 @@ class TicTacToeGame:
 
         # Display board
         self.ui.display_board(st.session_state.game_board)
+        self.ui.show_perfect_play_hint(st.session_state.game_board)
 
         # Show game status
         if game_over:
@@ -353,8 +535,12 @@ class TicTacToeGame:
             current_model_name = selected_p_x if current_player == "X" else selected_p_o
             self.ui.show_agent_status(f"Player {player_num} ({current_model_name})", "It's your turn")
 
+        # A failed move paused the game; show why until it is resumed
+        if st.session_state.move_error:
+            st.error(f"{st.session_state.move_error}. Press ▶️ Resume to retry.")
+
         # Display move history BEFORE processing next move
-        self.ui.display_move_history()
+        self.ui.display_move_history(st.session_state.game_board)
 
         # Process agent move if game is active and not paused
         if not game_over and not st.session_state.game_paused:
@@ -385,77 +571,92 @@ class TicTacToeGame:
         # Show thinking indicator
         self.ui.show_thinking_indicator(player_num, current_model_name)
 
-        valid_moves = st.session_state.game_board.get_valid_moves()
-        current_agent = (
-            st.session_state.player_x if current_player == "X" else st.session_state.player_o
-        )
-
+        # Toggles apply from the next move on, even mid-game
+        match = st.session_state.match
+        match.stream = st.session_state.stream_moves
+        match.speculate = st.session_state.speculate
+        match.hedge = st.session_state.hedge_requests
         try:
-            # Get agent response
-            response: RunOutput = current_agent.run(
-                f"""\
-Current board state:\n{st.session_state.game_board.get_board_state()}\n
-Available valid moves (row, col): {valid_moves}\n
-Choose your next move from the valid moves above.
-Respond with ONLY two numbers for row and column, e.g. "1 2".""",
-                stream=False,
-            )
-
-            # Parse and execute move
-            numbers = re.findall(r"\d+", response.content if response else "")
-            row, col = map(int, numbers[:2])
-            success, message = st.session_state.game_board.make_move(row, col)
-
-            if success:
-                self._record_move(player_num, current_model_name, row, col)
-                self._check_game_end()
-                st.rerun()
-            else:
-                logger.error(f"Invalid move attempt: {message}")
-                st.rerun()
+            agent = match.players[current_player]
+            (row, col), stats = match.play_move()
+            prompt_format = player_prompt_format(agent, match.prompt_format)
+            self._record_move(player_num, current_model_name, row, col, stats, prompt_format)
+            self._check_game_end()
+            st.rerun()
 
         except Exception as e:
+            # Failed requests land here: the resolver only retries bad replies, and the limiter has already backed
+            # off any 429. Pause instead of rerunning straight into the same failure; the error shows on the next run
             logger.error(f"Error processing move: {str(e)}")
-            st.error(f"Error processing move: {str(e)}")
+            st.session_state.move_error = f"Error processing move: {str(e)}"
+            st.session_state.game_paused = True
             st.rerun()
 
-    def _record_move(self, player_num: str, model_name: str, row: int, col: int):
-        """Record a move in the history."""
+    def _record_move(
+        self,
+        player_num: str,
+        model_name: str,
+        row: int,
+        col: int,
+        stats: Optional[MoveStats] = None,
+        prompt_format: Optional[str] = None,
+    ):
+        """Record a move in the history, with the requests, tokens and time it took."""
+        stats = stats or MoveStats()
         move_number = len(st.session_state.move_history) + 1
         st.session_state.move_history.append(
             {
                 "number": move_number,
                 "player": f"Player {player_num} ({model_name})",
                 "move": f"{row},{col}",
+                "prompt_format": prompt_format,
+                "input_tokens": stats.input_tokens,
+                "output_tokens": stats.output_tokens,
+                "latency_ms": stats.latency_ms,
+                "time_to_move_ms": stats.time_to_move_ms,
+                "tokens_saved": stats.tokens_saved,
+                "cancelled": stats.cancelled,
+                "requests": stats.requests,
+                "wasted": stats.wasted,
+                "fallback": stats.fallback,
             }
         )
-        logger.info(f"Move {move_number}: Player {player_num} ({model_name}) -> ({row}, {col})")
+        logger.info(
+            f"Move {move_number}: Player {player_num} ({model_name}) -> ({row}, {col}) "
+            f"[{stats.requests} requests, {stats.input_tokens} prompt + {stats.output_tokens} completion tokens, "
+            f"{stats.latency_ms:.0f}ms, move after {stats.time_to_move_ms:.0f}ms"
+            f"{f', cancelled saving ~{stats.tokens_saved} tokens' if stats.cancelled else ''}"
+            f"{', fallback' if stats.fallback else ''}]"
+        )
 
     def _check_game_end(self):
-        """Check if game has ended and update statistics."""
+        """Check if game has ended, store the result and update the streak."""
         game_over, status = st.session_state.game_board.get_game_state()
         if game_over:
             logger.info(f"Game ended: {status}")
 
-            # Update statistics
-            stats = st.session_state.session_stats
-            stats["total_games"] += 1
+            # Queue the game for the result store's writer and have it written right away, off this thread
+            store = get_result_store()
+            result = st.session_state.match.result
+            store.record(result, "app")
+            store.flush(wait=False)
+
+            # Archive the game in compact form, as seen in the move history
+            get_game_archive().write(
+                GameRecord.from_move_history(
+                    st.session_state.move_history,
+                    result.model_x,
+                    result.model_o,
+                    result.board_size,
+                    result.win_length,
+                    result.outcome,
+                    result.elapsed,
+                )
+            )
 
             if "wins" in status:
                 winner = "X" if "X wins" in status else "O"
-
-                # Update win counters
-                if winner == "X":
-                    stats["x_wins"] += 1
-                    winner_model = st.session_state.model_p1
-                else:
-                    stats["o_wins"] += 1
-                    winner_model = st.session_state.model_p2
-
-                # Track model performance for leaderboard
-                if winner_model not in stats["model_wins"]:
-                    stats["model_wins"][winner_model] = 0
-                stats["model_wins"][winner_model] += 1
+                winner_model = st.session_state.model_p1 if winner == "X" else st.session_state.model_p2
 
                 # Update winning streak
                 streak = st.session_state.current_streak
@@ -467,7 +668,6 @@ Respond with ONLY two numbers for row and column, e.g. "1 2".""",
 
                 logger.info(f"Winner: {winner} ({winner_model}), Streak: {streak['count']}")
             else:
-                stats["draws"] += 1
                 st.session_state.current_streak = {"player": None, "count": 0}
 
             st.session_state.game_paused = True
@@ -1,5 +1,6 @@
 """Agent module for Tic Tac Toe players."""
 
+from src.agents.engine_player import EnginePlayer
 from src.agents.tic_tac_toe_agent import TicTacToeAgentFactory
 
-__all__ = ["TicTacToeAgentFactory"]
+__all__ = ["EnginePlayer", "TicTacToeAgentFactory"]
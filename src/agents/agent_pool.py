@@ -0,0 +1,178 @@
+"""
+Process-wide pool of ready players.
+
+Building an Agent also builds its Nvidia/Groq model and, on first use, an
+HTTP client with its own connection pool and TLS session. The pool keeps
+released players idle per (model, symbol, board variant, prompt format) so the next game
+reuses them, including their warm keep-alive connections. Conversation
+state is reset on release, so a reused agent starts every game fresh.
+"""
+
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from src.agents.engine_player import EnginePlayer
+from src.agents.tic_tac_toe_agent import Player, TicTacToeAgentFactory
+from src.config.settings import settings
+from src.game.board import TicTacToeBoard
+from src.utils.logger import logger
+
+# (model string, player symbol, board size, win length, debug mode, prompt format)
+PoolKey = Tuple[str, str, int, int, bool, str]
+
+
+@dataclass
+class PoolStats:
+    """Counters since the pool was created."""
+
+    created: int = 0
+    reused: int = 0
+    released: int = 0
+
+    @property
+    def reuse_rate(self) -> float:
+        """Share of checkouts served by an idle player."""
+        checkouts = self.created + self.reused
+        return self.reused / checkouts if checkouts else 0.0
+
+
+class AgentPool:
+    """Hands out players and takes them back for reuse in later games."""
+
+    def __init__(self, factory: Optional[TicTacToeAgentFactory] = None, max_idle: Optional[int] = None):
+        """
+        Initialize an empty pool.
+
+        Args:
+            factory: Factory used to build new players
+            max_idle: Idle players kept per key (default: settings.AGENT_POOL_MAX_IDLE)
+        """
+        self.factory = factory or TicTacToeAgentFactory()
+        self.max_idle = max_idle or settings.AGENT_POOL_MAX_IDLE
+        self.stats = PoolStats()
+        self._idle: Dict[PoolKey, List[Player]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def acquire(
+        self,
+        player_name: str,
+        player_symbol: str,
+        model_str: str,
+        board: TicTacToeBoard,
+        debug_mode: bool = False,
+        prompt_format: Optional[str] = None,
+    ) -> Player:
+        """
+        Check out a player for a game, reusing an idle one when possible.
+
+        Args:
+            player_name: Name of the player (e.g., "Player X")
+            player_symbol: Symbol used by the player ("X" or "O")
+            model_str: Model string in format "provider:model_name"
+            board: Board of the game; engine players are bound to it
+            debug_mode: Enable debug logging
+            prompt_format: "verbose" or "compact" system prompt (default: settings.PROMPT_FORMAT)
+
+        Returns:
+            Player: Agent or EnginePlayer ready for its first move
+        """
+        prompt_format = prompt_format or settings.PROMPT_FORMAT
+        key = (model_str, player_symbol, board.size, board.win_length, debug_mode, prompt_format)
+        with self._lock:
+            idle = self._idle.get(key)
+            player = idle.pop() if idle else None
+            if player is None:
+                self.stats.created += 1
+            else:
+                self.stats.reused += 1
+
+        if player is None:
+            player = self.factory.create_player_agent(
+                player_name, player_symbol, model_str, debug_mode, board.size, board.win_length, board, prompt_format
+            )
+        elif isinstance(player, EnginePlayer):
+            player.board = board
+        player._pool_key = key
+        return player
+
+    def acquire_players(
+        self,
+        model_x: str,
+        model_o: str,
+        board: TicTacToeBoard,
+        debug_mode: bool = False,
+        prompt_format: Optional[str] = None,
+    ) -> Tuple[Player, Player]:
+        """
+        Check out both players of a game.
+
+        Args:
+            model_x: Model string for player X (format: "provider:model_name")
+            model_o: Model string for player O (format: "provider:model_name")
+            board: Board of the game
+            debug_mode: Enable debug logging
+            prompt_format: "verbose" or "compact" system prompt (default: settings.PROMPT_FORMAT)
+
+        Returns:
+            Tuple[Player, Player]: (player_x, player_o)
+        """
+        return (
+            self.acquire("Player X", settings.PLAYER_X, model_x, board, debug_mode, prompt_format),
+            self.acquire("Player O", settings.PLAYER_O, model_o, board, debug_mode, prompt_format),
+        )
+
+    @staticmethod
+    def _reset(player: Player):
+        """Drop per-game state so the player starts the next game fresh."""
+        if isinstance(player, EnginePlayer):
+            player.board = None
+            player.last_result = None
+            return
+        player.session_id = None
+        player.session_state = None
+        if hasattr(player, "_cached_session"):
+            player._cached_session = None
+
+    def release(self, *players: Optional[Player]):
+        """
+        Return players after their game, keeping up to max_idle per key.
+
+        Players the pool did not hand out are ignored.
+
+        Args:
+            players: Players to return
+        """
+        for player in players:
+            key = getattr(player, "_pool_key", None)
+            if key is None:
+                continue
+            self._reset(player)
+            player._pool_key = None
+            with self._lock:
+                self.stats.released += 1
+                idle = self._idle[key]
+                if len(idle) < self.max_idle:
+                    idle.append(player)
+
+    def idle_count(self) -> int:
+        """Number of players waiting for reuse."""
+        with self._lock:
+            return sum(len(idle) for idle in self._idle.values())
+
+
+_pool: Optional[AgentPool] = None
+
+
+def get_agent_pool() -> AgentPool:
+    """
+    Get the process-wide pool.
+
+    Returns:
+        AgentPool: The shared pool
+    """
+    global _pool
+    if _pool is None:
+        _pool = AgentPool()
+        logger.info("Created agent pool")
+    return _pool
@@ -0,0 +1,63 @@
+"""
+Local engine players that stand in for LLM agents.
+
+An EnginePlayer exposes the same ``run(...) -> RunOutput`` interface as an
+agno Agent, answering with "row col" text, so the game loop can drive it
+exactly like an LLM player at zero API cost.
+"""
+
+import time
+from typing import Any, Optional
+from agno.run.agent import RunOutput
+from src.game.board import TicTacToeBoard
+from src.utils.logger import logger
+
+
+class EnginePlayer:
+    """Deterministic move provider with an agent-compatible interface."""
+
+    def __init__(self, name: str, engine: Any, engine_name: str, board: Optional[TicTacToeBoard] = None):
+        """
+        Initialize the player.
+
+        Args:
+            name: Name of the player (e.g., "Player X")
+            engine: Object with a ``search(board)`` method returning a result with a ``move``
+            engine_name: Identifier reported as the model id
+            board: Board of the game being played
+        """
+        self.name = name
+        self.engine = engine
+        self.engine_name = engine_name
+        self.board = board
+        self.last_result = None
+
+    def run(self, input: Any = None, stream: bool = False, **kwargs: Any) -> RunOutput:
+        """
+        Choose a move for the bound board.
+
+        The prompt is ignored: the engine reads the position directly from the board.
+
+        Args:
+            input: Prompt sent to LLM players (unused)
+            stream: Accepted for interface compatibility; engines never stream
+
+        Returns:
+            RunOutput: Response whose content is "row col"
+
+        Raises:
+            ValueError: If no board is bound to the player
+        """
+        if self.board is None:
+            raise ValueError(f"{self.name} has no board bound; pass board= when creating the players")
+
+        start = time.perf_counter()
+        self.last_result = self.engine.search(self.board)
+        row, col = self.last_result.move
+        logger.info(f"{self.name} ({self.engine_name}) answered in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return RunOutput(
+            agent_name=self.name,
+            content=f"{row} {col}",
+            model=self.engine_name,
+            model_provider="engine",
+        )
@@ -0,0 +1,318 @@
+"""
+Hedged move requests for tail-latency reduction.
+
+Provider latency has a long tail, and one slow move stalls its whole game.
+A hedged request is sent once; if it has not answered after the model's
+rolling p90 latency (settings.HEDGE_PERCENTILE), a duplicate goes to the
+same model or to its equivalent on the other provider
+(settings.HEDGE_EQUIVALENTS). The first successful answer wins and the
+other request is cancelled.
+
+Hedges are capped at settings.HEDGE_BUDGET of a model's requests so a
+provider that is slow across the board is not sent twice the traffic.
+The latency a winning duplicate saved cannot be measured, since the
+original is cancelled; it is estimated as the mean of the model's recorded
+latencies beyond the moment the duplicate answered, minus that moment.
+"""
+
+import asyncio
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+from src.config.settings import settings
+from src.utils.logger import logger
+
+T = TypeVar("T")
+
+HEDGE_TARGETS = ("same", "equivalent")
+
+
+@dataclass
+class HedgeStats:
+    """Per-model hedging counters since the hedger was created."""
+
+    requests: int = 0
+    hedged: int = 0
+    backup_wins: int = 0
+    saved_ms: float = 0.0
+
+    @property
+    def hedge_rate(self) -> float:
+        """Share of requests that were duplicated."""
+        return self.hedged / self.requests if self.requests else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        """Share of duplicates that answered first."""
+        return self.backup_wins / self.hedged if self.hedged else 0.0
+
+
+class Hedger:
+    """Duplicates move requests that run past a model's tail latency."""
+
+    def __init__(
+        self,
+        percentile: Optional[float] = None,
+        window: Optional[int] = None,
+        min_samples: Optional[int] = None,
+        budget: Optional[float] = None,
+        target: Optional[str] = None,
+        equivalents: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Initialize the hedger.
+
+        Args:
+            percentile: Latency percentile after which a duplicate is sent (default: settings.HEDGE_PERCENTILE)
+            window: Recent latencies kept per model (default: settings.HEDGE_WINDOW)
+            min_samples: Latencies needed before a model is hedged (default: settings.HEDGE_MIN_SAMPLES)
+            budget: Maximum share of a model's requests that are duplicated (default: settings.HEDGE_BUDGET)
+            target: "same" model or its "equivalent" on the other provider (default: settings.HEDGE_TARGET)
+            equivalents: Model string -> equivalent model string (default: settings.HEDGE_EQUIVALENTS)
+
+        Raises:
+            ValueError: If the target is not supported
+        """
+        self.percentile = percentile or settings.HEDGE_PERCENTILE
+        self.window = window or settings.HEDGE_WINDOW
+        self.min_samples = min_samples or settings.HEDGE_MIN_SAMPLES
+        self.budget = settings.HEDGE_BUDGET if budget is None else budget
+        self.target = target or settings.HEDGE_TARGET
+        self.equivalents = settings.HEDGE_EQUIVALENTS if equivalents is None else equivalents
+        if self.target not in HEDGE_TARGETS:
+            error_msg = f"Unsupported hedge target: {self.target}. Supported targets: {', '.join(HEDGE_TARGETS)}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        self.stats: Dict[str, HedgeStats] = defaultdict(HedgeStats)
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def backup_model(self, model_str: str) -> str:
+        """
+        Model the duplicate of a request goes to.
+
+        Args:
+            model_str: Model string of the original request
+
+        Returns:
+            str: The equivalent model when the target is "equivalent", one is configured
+                and its API key is set; otherwise the same model
+        """
+        equivalent = self.equivalents.get(model_str)
+        if self.target == "equivalent" and equivalent and not settings.get_missing_keys([equivalent]):
+            return equivalent
+        return model_str
+
+    def threshold_ms(self, model_str: str) -> Optional[float]:
+        """
+        Current hedging delay of a model.
+
+        Args:
+            model_str: Model string in format "provider:model_name"
+
+        Returns:
+            Optional[float]: The percentile of recent latencies, or None before min_samples were recorded
+        """
+        with self._lock:
+            latencies = sorted(self._latencies[model_str])
+        if len(latencies) < self.min_samples:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * self.percentile / 100))]
+
+    def record(self, model_str: str, latency_ms: float):
+        """
+        Add a completed request's latency to the model's window.
+
+        Args:
+            model_str: Model string in format "provider:model_name"
+            latency_ms: Time from sending the request to its answer
+        """
+        with self._lock:
+            self._latencies[model_str].append(latency_ms)
+
+    def _plan(self, model_str: str) -> Optional[float]:
+        """Count a request and return the delay after which to duplicate it, or None to not hedge it."""
+        threshold = self.threshold_ms(model_str)
+        with self._lock:
+            stats = self.stats[model_str]
+            stats.requests += 1
+            if threshold is None or stats.hedged + 1 > self.budget * stats.requests:
+                return None
+            return threshold
+
+    def _settle(
+        self,
+        model_str: str,
+        backup_model: str,
+        backup_won: bool,
+        elapsed_ms: float,
+        backup_ms: float,
+        primary_pending: bool = False,
+    ):
+        """Record the outcome of a hedged request."""
+        if not backup_won:
+            self.record(model_str, elapsed_ms)
+            return
+        self.record(backup_model, backup_ms)
+        with self._lock:
+            slower = [latency for latency in self._latencies[model_str] if latency > elapsed_ms]
+            stats = self.stats[model_str]
+            stats.backup_wins += 1
+            stats.saved_ms += sum(slower) / len(slower) - elapsed_ms if slower else 0.0
+            # The original would have taken at least this long. Without this censored sample the
+            # window only keeps requests that beat the threshold, the percentile drifts down and
+            # ever more requests are hedged.
+            if primary_pending:
+                self._latencies[model_str].append(elapsed_ms)
+
+    def _count_hedge(self, model_str: str, backup_model: str, threshold: float):
+        """Count a duplicate being sent."""
+        with self._lock:
+            self.stats[model_str].hedged += 1
+        logger.info(f"{model_str} slower than {threshold:.0f}ms, hedging on {backup_model}")
+
+    async def arequest(
+        self,
+        model_str: str,
+        primary: Callable[[], Awaitable[T]],
+        backup_model: str,
+        backup: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Await a request, duplicating it once it runs past the model's threshold.
+
+        Args:
+            model_str: Model string of the original request
+            primary: Starts the original request
+            backup_model: Model string the duplicate goes to
+            backup: Starts the duplicate
+
+        Returns:
+            T: The first successful answer
+
+        Raises:
+            Exception: The original request's error when it fails before the threshold, or the
+                first error when both requests fail
+        """
+        threshold = self._plan(model_str)
+        start = time.perf_counter()
+        tasks: List[asyncio.Future] = [asyncio.ensure_future(primary())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=None if threshold is None else threshold / 1000)
+            if done:
+                result = tasks[0].result()
+                self.record(model_str, (time.perf_counter() - start) * 1000)
+                return result
+
+            self._count_hedge(model_str, backup_model, threshold)
+            backup_start = time.perf_counter()
+            tasks.append(asyncio.ensure_future(backup()))
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in tasks if task in done and task.exception() is None), None)
+                if winner is not None:
+                    now = time.perf_counter()
+                    self._settle(
+                        model_str,
+                        backup_model,
+                        winner is tasks[1],
+                        (now - start) * 1000,
+                        (now - backup_start) * 1000,
+                        not tasks[0].done(),
+                    )
+                    return winner.result()
+                error = error or next(iter(done)).exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def request(self, model_str: str, primary: Callable[[], T], backup_model: str, backup: Callable[[], T]) -> T:
+        """
+        Blocking variant of arequest; both requests run in worker threads.
+
+        A request already running in a thread cannot be interrupted, so the
+        losing request finishes in the background and its answer is dropped.
+
+        Args:
+            model_str: Model string of the original request
+            primary: Sends the original request
+            backup_model: Model string the duplicate goes to
+            backup: Sends the duplicate
+
+        Returns:
+            T: The first successful answer
+
+        Raises:
+            Exception: The original request's error when it fails before the threshold, or the
+                first error when both requests fail
+        """
+        threshold = self._plan(model_str)
+        if threshold is None:
+            start = time.perf_counter()
+            result = primary()
+            self.record(model_str, (time.perf_counter() - start) * 1000)
+            return result
+
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(settings.HEDGE_MAX_WORKERS, thread_name_prefix="hedging")
+        start = time.perf_counter()
+        futures: List[Future] = [self._executor.submit(primary)]
+        try:
+            done, _ = wait(futures, timeout=threshold / 1000)
+            if done:
+                result = futures[0].result()
+                self.record(model_str, (time.perf_counter() - start) * 1000)
+                return result
+
+            self._count_hedge(model_str, backup_model, threshold)
+            backup_start = time.perf_counter()
+            futures.append(self._executor.submit(backup))
+            pending, error = set(futures), None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                winner = next((future for future in futures if future in done and future.exception() is None), None)
+                if winner is not None:
+                    now = time.perf_counter()
+                    self._settle(
+                        model_str,
+                        backup_model,
+                        winner is futures[1],
+                        (now - start) * 1000,
+                        (now - backup_start) * 1000,
+                        not futures[0].done(),
+                    )
+                    return winner.result()
+                error = error or next(iter(done)).exception()
+            raise error
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+_hedger: Optional[Hedger] = None
+
+
+def get_hedger() -> Hedger:
+    """
+    Get the process-wide hedger, so latency windows are shared by every game and session.
+
+    Returns:
+        Hedger: The shared hedger
+    """
+    global _hedger
+    if _hedger is None:
+        _hedger = Hedger()
+        logger.info(
+            f"Created hedger (p{_hedger.percentile:g} of the last {_hedger.window} requests, "
+            f"{_hedger.budget:.0%} budget, {_hedger.target} model)"
+        )
+    return _hedger
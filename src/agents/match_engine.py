@@ -0,0 +1,261 @@
+"""
+Asyncio match engine that plays many games concurrently.
+
+Every game is a MatchRunner (src/game/match_runner.py) driven as a
+coroutine. LLM players are queried through ``Agent.arun``,
+so a move request yields the event loop for its whole HTTP round trip and
+one process can keep hundreds of moves in flight. A semaphore per provider
+(settings.PROVIDER_CONCURRENCY) caps how many requests each provider sees
+at once. Local engine players have no async API and run in worker threads
+under their own "engine" limit.
+
+With speculation on, the opponent's requests for the likeliest replies
+run while a player is thinking (see src/agents/speculation.py). With
+hedging on, a move request that runs past its model's tail latency is
+duplicated (see src/agents/hedging.py).
+"""
+
+import asyncio
+import contextlib
+import time
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from src.agents.agent_pool import AgentPool, get_agent_pool
+from src.agents.hedging import Hedger, get_hedger
+from src.agents.move_resolver import MoveResolver, get_move_resolver
+from src.agents.rate_limiter import RateLimiter, get_rate_limiter
+from src.agents.speculation import Speculator, get_speculator
+from src.config.settings import settings
+from src.game.match_runner import MatchResult, MatchRunner
+from src.utils.logger import logger
+
+__all__ = ["AsyncMatchEngine", "MatchResult", "run_matches"]
+
+
+class AsyncMatchEngine:
+    """Plays games between model strings with bounded per-provider concurrency."""
+
+    def __init__(
+        self,
+        concurrency: Optional[Dict[str, int]] = None,
+        resolver: Optional[MoveResolver] = None,
+        limiter: Optional[RateLimiter] = None,
+        pool: Optional[AgentPool] = None,
+        stream: Optional[bool] = None,
+        speculator: Optional[Speculator] = None,
+        speculate: Optional[bool] = None,
+        hedger: Optional[Hedger] = None,
+        hedge: Optional[bool] = None,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            concurrency: Max in-flight requests per provider (default: settings.PROVIDER_CONCURRENCY)
+            resolver: Retry and fallback policy for moves (default: the process-wide resolver)
+            limiter: Rate limiter shared with other callers (default: the process-wide limiter)
+            pool: Pool players are checked out from (default: the process-wide pool)
+            stream: Stream replies and stop at the first legal move (default: settings.STREAM_MOVES)
+            speculator: Predicts moves and prefetches replies (default: the process-wide speculator)
+            speculate: Prefetch the opponent's replies while a player thinks (default: settings.SPECULATIVE_PREFETCH)
+            hedger: Duplicates slow requests and tracks latencies (default: the process-wide hedger)
+            hedge: Duplicate requests that run past their model's tail latency (default: settings.HEDGE_REQUESTS)
+        """
+        self.concurrency = concurrency or settings.PROVIDER_CONCURRENCY
+        self.limiter = limiter or get_rate_limiter()
+        self.resolver = resolver or get_move_resolver()
+        self.pool = pool or get_agent_pool()
+        self.stream = settings.STREAM_MOVES if stream is None else stream
+        self.speculate = settings.SPECULATIVE_PREFETCH if speculate is None else speculate
+        self.speculator = speculator or (get_speculator() if self.speculate else None)
+        self.hedge = settings.HEDGE_REQUESTS if hedge is None else hedge
+        self.hedger = hedger or (get_hedger() if self.hedge else None)
+        self.in_flight: Dict[str, int] = defaultdict(int)
+        self.peak_in_flight: Dict[str, int] = defaultdict(int)
+        self.requests: Dict[str, int] = defaultdict(int)
+        # Seconds of slot time used per provider, for utilisation against the concurrency caps
+        self.busy_seconds: Dict[str, float] = defaultdict(float)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        """
+        Get the provider's semaphore for the running event loop.
+
+        Args:
+            provider: Provider prefix of a model string
+
+        Returns:
+            asyncio.Semaphore: Limit shared by every game on this loop
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Semaphores are bound to the loop that first waits on them
+            self._semaphores = {}
+            self._loop = loop
+        if provider not in self._semaphores:
+            limit = self.concurrency.get(provider, settings.DEFAULT_PROVIDER_CONCURRENCY)
+            self._semaphores[provider] = asyncio.Semaphore(limit)
+        return self._semaphores[provider]
+
+    @contextlib.asynccontextmanager
+    async def _slot(self, provider: str) -> AsyncIterator[None]:
+        """
+        Hold one of the provider's concurrency slots for a request.
+
+        Args:
+            provider: Provider prefix of a model string
+        """
+        async with self._semaphore(provider):
+            self.in_flight[provider] += 1
+            self.requests[provider] += 1
+            self.peak_in_flight[provider] = max(self.peak_in_flight[provider], self.in_flight[provider])
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.in_flight[provider] -= 1
+                self.busy_seconds[provider] += time.perf_counter() - start
+
+    async def play_game(
+        self,
+        model_x: str,
+        model_o: str,
+        board_size: Optional[int] = None,
+        win_length: Optional[int] = None,
+        debug_mode: bool = False,
+        prompt_format: Optional[str] = None,
+    ) -> MatchResult:
+        """
+        Play one game to completion.
+
+        Args:
+            model_x: Model string for player X (format: "provider:model_name")
+            model_o: Model string for player O (format: "provider:model_name")
+            board_size: Width and height of the board (default: settings.BOARD_SIZE)
+            win_length: Marks in a row needed to win (default: settings.WIN_LENGTH)
+            debug_mode: Enable agent debug logging
+            prompt_format: "verbose" or "compact" prompts (default: settings.PROMPT_FORMAT)
+
+        Returns:
+            MatchResult: Winner, moves, and per-move token usage, retries and fallbacks
+        """
+        try:
+            runner = MatchRunner(
+                model_x,
+                model_o,
+                board_size,
+                win_length,
+                prompt_format,
+                debug_mode,
+                stream=self.stream,
+                speculate=self.speculate,
+                hedge=self.hedge,
+                pool=self.pool,
+                resolver=self.resolver,
+                limiter=self.limiter,
+                speculator=self.speculator,
+                hedger=self.hedger,
+                slot=self._slot,
+            )
+        except Exception as e:
+            # Players could not be created, e.g. an unsupported provider
+            logger.error(f"Game {model_x} vs {model_o} failed: {e}")
+            return MatchResult(
+                model_x,
+                model_o,
+                board_size or settings.BOARD_SIZE,
+                win_length or settings.WIN_LENGTH,
+                prompt_format or settings.PROMPT_FORMAT,
+                error=str(e),
+            )
+        return await runner.aplay()
+
+    async def play_games(
+        self,
+        pairings: Iterable[Tuple[str, str]],
+        board_size: Optional[int] = None,
+        win_length: Optional[int] = None,
+        prompt_format: Optional[str] = None,
+    ) -> List[MatchResult]:
+        """
+        Play every pairing concurrently.
+
+        Args:
+            pairings: (model_x, model_o) model strings, one game each
+            board_size: Width and height of the board (default: settings.BOARD_SIZE)
+            win_length: Marks in a row needed to win (default: settings.WIN_LENGTH)
+            prompt_format: "verbose" or "compact" prompts (default: settings.PROMPT_FORMAT)
+
+        Returns:
+            List[MatchResult]: Results in pairing order
+        """
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(
+                self.play_game(model_x, model_o, board_size, win_length, prompt_format=prompt_format)
+                for model_x, model_o in pairings
+            )
+        )
+        logger.info(
+            f"Played {len(results)} games in {time.perf_counter() - start:.1f}s "
+            f"(peak in flight: {dict(self.peak_in_flight)})"
+        )
+        requested = [stats for result in results for stats in result.move_stats if stats.requests]
+        if requested:
+            logger.info(
+                f"Per requested move: {sum(s.input_tokens for s in requested) / len(requested):.0f} prompt tokens, "
+                f"{sum(s.output_tokens for s in requested) / len(requested):.1f} completion tokens, "
+                f"{sum(s.latency_ms for s in requested) / len(requested):.0f}ms, "
+                f"{sum(s.time_to_move_ms for s in requested) / len(requested):.0f}ms to move, "
+                f"{sum(s.tokens_saved for s in requested)} completion tokens saved by "
+                f"{sum(s.cancelled for s in requested)} cancelled streams"
+            )
+        if self.speculate:
+            stats = self.speculator.stats
+            logger.info(
+                f"Speculation: {stats.hits}/{stats.turns} turns prefetched ({stats.hit_rate:.1%}), "
+                f"{stats.extra_calls} extra calls, {stats.saved_ms / 1000:.1f}s of opponent latency overlapped"
+            )
+        if self.hedge:
+            for model_str, stats in self.hedger.stats.items():
+                logger.info(
+                    f"{model_str} hedging: {stats.hedged}/{stats.requests} requests hedged ({stats.hedge_rate:.1%}), "
+                    f"{stats.backup_wins} won by the duplicate, ~{stats.saved_ms / 1000:.1f}s saved"
+                )
+        for model_str, stats in self.resolver.stats.items():
+            logger.info(
+                f"{model_str} moves: {stats.wasted}/{stats.requests} requests wasted, "
+                f"{stats.fallbacks}/{stats.moves} moves by fallback ({stats.fallback_rate:.1%})"
+            )
+        for provider, stats in self.limiter.stats.items():
+            logger.info(
+                f"{provider} rate limits: {stats.throttled}/{stats.requests} requests throttled, "
+                f"avg wait {stats.avg_wait:.2f}s, max wait {stats.max_wait:.2f}s, "
+                f"peak queue {stats.peak_queue_depth}, {stats.rate_limit_errors} 429s"
+            )
+        return list(results)
+
+
+def run_matches(
+    pairings: Iterable[Tuple[str, str]],
+    board_size: Optional[int] = None,
+    win_length: Optional[int] = None,
+    concurrency: Optional[Dict[str, int]] = None,
+    prompt_format: Optional[str] = None,
+) -> List[MatchResult]:
+    """
+    Synchronous entry point: play the pairings on a fresh event loop.
+
+    Args:
+        pairings: (model_x, model_o) model strings, one game each
+        board_size: Width and height of the board (default: settings.BOARD_SIZE)
+        win_length: Marks in a row needed to win (default: settings.WIN_LENGTH)
+        concurrency: Max in-flight requests per provider (default: settings.PROVIDER_CONCURRENCY)
+        prompt_format: "verbose" or "compact" prompts (default: settings.PROMPT_FORMAT)
+
+    Returns:
+        List[MatchResult]: Results in pairing order
+    """
+    engine = AsyncMatchEngine(concurrency)
+    return asyncio.run(engine.play_games(pairings, board_size, win_length, prompt_format))
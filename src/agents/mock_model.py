@@ -0,0 +1,180 @@
+"""
+Offline mock model for load testing.
+
+``mock:`` model strings build a MockModel, an agno Model that answers move
+prompts locally, so the whole game loop (agents, rate limiter, retries,
+streaming, speculation, match engine) runs without network access or keys.
+The model name picks the policy, with an optional mean latency in ms:
+
+    mock:random             a uniformly random legal move
+    mock:heuristic@50       win, block, else the cell on the most open lines
+    mock:solver             perfect play on 3x3, a short search on larger boards
+    mock:script=4,0,8       the first legal cell of the list, else random
+
+Each reply waits for a latency drawn from settings.MOCK_LATENCY_DISTRIBUTION
+and may fail (MOCK_ERROR_RATE) or answer an occupied cell (MOCK_INVALID_RATE)
+to exercise the error and retry paths. Token usage is estimated from the
+message lengths.
+"""
+
+import asyncio
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Iterator, List, Optional
+from agno.exceptions import ModelProviderError
+from agno.models.base import Model
+from agno.models.message import Message
+from agno.models.response import ModelResponse
+from src.agents.move_resolver import FALLBACK_POLICIES, MoveResolver
+from src.agents.prompts import board_from_prompt
+from src.config.settings import settings
+from src.utils.logger import logger
+
+try:
+    from agno.metrics import MessageMetrics
+except ImportError:  # agno 2.x
+    from agno.models.metrics import Metrics as MessageMetrics
+
+MOCK_POLICIES = FALLBACK_POLICIES + ("script",)
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+# "k in a row" in either system prompt format
+WIN_LENGTH = re.compile(r"(\d+) (?:[XO]'s )?in a row")
+
+
+@dataclass
+class MockModel(Model):
+    """Model that answers move prompts with a local policy after a simulated delay."""
+
+    id: str = "random"
+    name: str = "Mock"
+    provider: str = "Mock"
+
+    # Parsed from the id
+    policy: str = field(init=False, default="random")
+    script: List[int] = field(init=False, default_factory=list)
+    latency_ms: float = field(default_factory=lambda: settings.MOCK_LATENCY_MS)
+    latency_jitter_ms: float = field(default_factory=lambda: settings.MOCK_LATENCY_JITTER_MS)
+    latency_distribution: str = field(default_factory=lambda: settings.MOCK_LATENCY_DISTRIBUTION)
+    error_rate: float = field(default_factory=lambda: settings.MOCK_ERROR_RATE)
+    invalid_rate: float = field(default_factory=lambda: settings.MOCK_INVALID_RATE)
+    seed: Optional[int] = field(default_factory=lambda: settings.MOCK_SEED)
+    temperature: Optional[float] = None
+
+    def __post_init__(self):
+        """Parse the policy from the model id and validate the options."""
+        super().__post_init__()
+        spec, _, latency = self.id.partition("@")
+        self.policy, _, script = spec.partition("=")
+        if self.policy not in MOCK_POLICIES:
+            error_msg = f"Unsupported mock policy: {self.policy}. Supported policies: {', '.join(MOCK_POLICIES)}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            error_msg = (
+                f"Unsupported latency distribution: {self.latency_distribution}. "
+                f"Supported distributions: {', '.join(LATENCY_DISTRIBUTIONS)}"
+            )
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        if script:
+            self.script = [int(cell) for cell in script.split(",")]
+        if latency:
+            self.latency_ms = float(latency)
+        self._rng = random.Random(self.seed)
+        fallback_policy = "random" if self.policy == "script" else self.policy
+        self._resolver = MoveResolver(fallback_policy=fallback_policy, seed=self.seed)
+
+    def _delay(self) -> float:
+        """Draw the simulated latency of one request, in seconds."""
+        if self.latency_distribution == "uniform":
+            delay_ms = self._rng.uniform(self.latency_ms - self.latency_jitter_ms, self.latency_ms + self.latency_jitter_ms)
+        elif self.latency_distribution == "lognormal" and self.latency_ms > 0:
+            # Median latency_ms, with a spread of about latency_jitter_ms
+            delay_ms = self.latency_ms * self._rng.lognormvariate(0, self.latency_jitter_ms / self.latency_ms)
+        else:
+            delay_ms = self.latency_ms
+        return max(0.0, delay_ms) / 1000
+
+    def _reply(self, messages: List[Message]) -> ModelResponse:
+        """
+        Answer the last user message.
+
+        Args:
+            messages: Conversation sent to the model
+
+        Returns:
+            ModelResponse: The move, with estimated token usage
+
+        Raises:
+            ModelProviderError: For the simulated share of failed requests
+        """
+        if self._rng.random() < self.error_rate:
+            raise ModelProviderError("Simulated provider error", 503, self.name, self.id)
+
+        system = next((str(m.content) for m in messages if m.role == "system"), "")
+        prompt = next((str(m.content) for m in reversed(messages) if m.role == "user"), "")
+        win_length = WIN_LENGTH.search(system)
+        board = board_from_prompt(prompt, int(win_length.group(1)) if win_length else None)
+
+        if board is None or not board.get_valid_moves():
+            content = "I need a board to move on."
+        else:
+            legal = [row * board.size + col for row, col in board.get_valid_moves()]
+            if self._rng.random() < self.invalid_rate and len(legal) < board.size * board.size:
+                index = self._rng.choice([i for i in range(board.size * board.size) if i not in legal])
+            elif self.policy == "script":
+                index = next((cell for cell in self.script if cell in legal), None)
+                if index is None:
+                    row, col = self._resolver.fallback_move(board)
+                    index = row * board.size + col
+            else:
+                row, col = self._resolver.fallback_move(board)
+                index = row * board.size + col
+            # Answer in the format the prompt asked for
+            content = str(index) if "\nLegal:" in prompt else "%d %d" % divmod(index, board.size)
+
+        response = ModelResponse(role="assistant", content=content)
+        input_tokens = -(-sum(len(str(m.content or "")) for m in messages) // 4)
+        output_tokens = -(-len(content) // 4)
+        response.response_usage = MessageMetrics(
+            input_tokens=input_tokens, output_tokens=output_tokens, total_tokens=input_tokens + output_tokens
+        )
+        return response
+
+    def invoke(self, messages: List[Message], assistant_message: Message, **kwargs) -> ModelResponse:
+        """Answer after a blocking simulated delay."""
+        assistant_message.metrics.start_timer()
+        time.sleep(self._delay())
+        response = self._reply(messages)
+        assistant_message.metrics.stop_timer()
+        return response
+
+    async def ainvoke(self, messages: List[Message], assistant_message: Message, **kwargs) -> ModelResponse:
+        """Answer after a non-blocking simulated delay."""
+        assistant_message.metrics.start_timer()
+        await asyncio.sleep(self._delay())
+        response = self._reply(messages)
+        assistant_message.metrics.stop_timer()
+        return response
+
+    def invoke_stream(self, messages: List[Message], assistant_message: Message, **kwargs) -> Iterator[ModelResponse]:
+        """Stream the answer as a single chunk after the delay."""
+        yield self.invoke(messages, assistant_message)
+
+    async def ainvoke_stream(
+        self, messages: List[Message], assistant_message: Message, **kwargs
+    ) -> AsyncIterator[ModelResponse]:
+        """Async variant of invoke_stream."""
+        yield await self.ainvoke(messages, assistant_message)
+
+    def _parse_provider_response(self, response: Any, **kwargs) -> ModelResponse:
+        """Responses are built as ModelResponse already."""
+        return response
+
+    def _parse_provider_response_delta(self, response: Any) -> ModelResponse:
+        """Stream chunks are built as ModelResponse already."""
+        return response
@@ -0,0 +1,303 @@
+"""
+Persistent cache of LLM move choices.
+
+Entries are keyed by the model (including its temperature), a hash of the
+agent's system prompt and the canonical form of the position, so all 8
+symmetric variants of a position share one entry. Moves are stored in the
+canonical frame and mapped back through the symmetry on lookup. The cache
+lives in SQLite with LRU and TTL eviction, so it survives restarts and is
+shared by every Streamlit session of the process.
+
+Policies:
+    off            never cache
+    deterministic  only temperature-0 models; replay the recorded answer
+    sample         any temperature; once enough answers are recorded, sample
+                   one in proportion to how often the model gave it
+"""
+
+import hashlib
+import os
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+from src.config.settings import settings
+from src.game.board import TicTacToeBoard
+from src.utils.logger import logger
+
+CACHE_POLICIES = ("off", "deterministic", "sample")
+
+# Stores between eviction passes
+PRUNE_INTERVAL = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS moves (
+    model TEXT NOT NULL,
+    prompt_hash TEXT NOT NULL,
+    position TEXT NOT NULL,
+    move INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (model, prompt_hash, position, move)
+);
+CREATE INDEX IF NOT EXISTS moves_last_used ON moves (last_used);
+"""
+
+
+@dataclass
+class CacheStats:
+    """Counters since the cache was opened."""
+
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class MoveCache:
+    """SQLite-backed cache of moves chosen by LLM players."""
+
+    def __init__(
+        self,
+        path: str,
+        policy: str = "deterministic",
+        max_entries: int = 50_000,
+        ttl_seconds: float = 7 * 24 * 3600,
+        min_samples: int = 5,
+        seed: Optional[int] = None,
+    ):
+        """
+        Open (or create) a cache database.
+
+        Args:
+            path: SQLite file, or ":memory:"
+            policy: "deterministic" or "sample" ("off" is handled by get_move_cache)
+            max_entries: Rows kept before the least recently used are evicted
+            ttl_seconds: Age after which an entry is ignored and evicted
+            min_samples: Answers needed for a position before the sample policy serves it
+            seed: Seed for the sample policy
+
+        Raises:
+            ValueError: If the policy is not supported
+        """
+        if policy not in CACHE_POLICIES:
+            error_msg = f"Unsupported move cache policy: {policy}. Supported policies: {', '.join(CACHE_POLICIES)}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        self.path = path
+        self.policy = policy
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.min_samples = min_samples
+        self.stats = CacheStats()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stores_since_prune = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Streamlit reruns a session on different threads; access is serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._prune()
+
+    @staticmethod
+    def prompt_hash(system_prompt: str) -> str:
+        """
+        Short, stable digest of an agent's system prompt.
+
+        Args:
+            system_prompt: The prompt text
+
+        Returns:
+            str: Hex digest identifying the prompt version
+        """
+        return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+
+    def agent_key(self, agent: Any, model_str: str) -> Optional[Tuple[str, str]]:
+        """
+        Cache namespace for an agent, if the policy allows caching it.
+
+        Args:
+            agent: Player about to be asked for a move
+            model_str: Model string in format "provider:model_name"
+
+        Returns:
+            Optional[Tuple[str, str]]: (model key, prompt hash), or None for uncacheable players
+        """
+        model = getattr(agent, "model", None)
+        description = getattr(agent, "description", None)
+        if model is None or not description:
+            return None
+        temperature = getattr(model, "temperature", None)
+        if self.policy == "off" or (self.policy == "deterministic" and temperature != 0):
+            return None
+        return f"{model_str}@t={temperature}", self.prompt_hash(description)
+
+    @staticmethod
+    def _position(board: TicTacToeBoard) -> Tuple[str, Tuple[int, ...]]:
+        """
+        Canonical position key and the symmetry that maps the board onto it.
+
+        Args:
+            board: Position to look up
+
+        Returns:
+            Tuple[str, Tuple[int, ...]]: (position key, cell permutation into the canonical frame)
+        """
+        geometry = board.geometry
+        own, opp = (board.x_bits, board.o_bits) if board.current_player == settings.PLAYER_X \
+            else (board.o_bits, board.x_bits)
+        key, symmetry = geometry.canonical(own, opp)
+        return f"{board.size}/{board.win_length}/{key:x}", geometry.symmetries[symmetry]
+
+    def lookup(self, model_key: str, prompt_hash: str, board: TicTacToeBoard) -> Optional[Tuple[int, int]]:
+        """
+        Find a cached move for the board.
+
+        Args:
+            model_key: Model namespace from agent_key
+            prompt_hash: Prompt namespace from agent_key
+            board: Current position
+
+        Returns:
+            Optional[Tuple[int, int]]: (row, col) in the board's own frame, or None on a miss
+        """
+        position, perm = self._position(board)
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT move, count FROM moves WHERE model = ? AND prompt_hash = ? AND position = ? AND created > ?",
+                (model_key, prompt_hash, position, now - self.ttl_seconds),
+            ).fetchall()
+
+            move = None
+            if rows and self.policy == "deterministic":
+                move = max(rows, key=lambda row: row[1])[0]
+            elif rows and sum(count for _, count in rows) >= self.min_samples:
+                moves, counts = zip(*rows)
+                move = self._rng.choices(moves, weights=counts)[0]
+
+            # Map the canonical cell back through the inverse symmetry
+            index = perm.index(move) if move is not None else -1
+            if index < 0 or board.occupied >> index & 1:
+                self.stats.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE moves SET last_used = ? WHERE model = ? AND prompt_hash = ? AND position = ?",
+                (now, model_key, prompt_hash, position),
+            )
+            self._conn.commit()
+            self.stats.hits += 1
+        return board.geometry.coords[index]
+
+    def top_moves(self, model_key: str, prompt_hash: str, board: TicTacToeBoard, limit: int) -> List[Tuple[int, int]]:
+        """
+        Moves recorded most often for the board, without counting as a lookup.
+
+        Args:
+            model_key: Model namespace from agent_key
+            prompt_hash: Prompt namespace from agent_key
+            board: Current position
+            limit: Maximum number of moves
+
+        Returns:
+            List[Tuple[int, int]]: Legal (row, col) moves in the board's own frame, most frequent first
+        """
+        position, perm = self._position(board)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT move FROM moves WHERE model = ? AND prompt_hash = ? AND position = ? AND created > ? "
+                "ORDER BY count DESC",
+                (model_key, prompt_hash, position, time.time() - self.ttl_seconds),
+            ).fetchall()
+        indices = [perm.index(move) for move, in rows]
+        return [board.geometry.coords[index] for index in indices if not board.occupied >> index & 1][:limit]
+
+    def store(self, model_key: str, prompt_hash: str, board: TicTacToeBoard, row: int, col: int):
+        """
+        Record the move a model chose, before it is played.
+
+        Args:
+            model_key: Model namespace from agent_key
+            prompt_hash: Prompt namespace from agent_key
+            board: Position the move was chosen in
+            row: Row of the move
+            col: Column of the move
+        """
+        position, perm = self._position(board)
+        move = perm[row * board.size + col]
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO moves (model, prompt_hash, position, move, count, created, last_used)
+                VALUES (?, ?, ?, ?, 1, ?, ?)
+                ON CONFLICT (model, prompt_hash, position, move)
+                DO UPDATE SET count = count + 1, last_used = excluded.last_used
+                """,
+                (model_key, prompt_hash, position, move, now, now),
+            )
+            self._conn.commit()
+            self.stats.stores += 1
+            self._stores_since_prune += 1
+            if self._stores_since_prune >= PRUNE_INTERVAL:
+                self._prune()
+
+    def _prune(self):
+        """Drop expired entries, then the least recently used beyond max_entries."""
+        expired = self._conn.execute("DELETE FROM moves WHERE created <= ?", (time.time() - self.ttl_seconds,))
+        overflow = self._conn.execute(
+            "DELETE FROM moves WHERE rowid IN (SELECT rowid FROM moves ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self._conn.commit()
+        evicted = expired.rowcount + overflow.rowcount
+        if evicted:
+            self.stats.evictions += evicted
+            logger.info(f"Evicted {evicted} move cache entries")
+        self._stores_since_prune = 0
+
+    def __len__(self) -> int:
+        """Number of cached (position, move) rows."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM moves").fetchone()[0]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[MoveCache] = None
+
+
+def get_move_cache() -> Optional[MoveCache]:
+    """
+    Get the process-wide cache, opening it on first use.
+
+    Returns:
+        Optional[MoveCache]: The shared cache, or None when MOVE_CACHE_POLICY is "off"
+    """
+    global _cache
+    if _cache is None and settings.MOVE_CACHE_POLICY != "off":
+        _cache = MoveCache(
+            settings.MOVE_CACHE_PATH,
+            settings.MOVE_CACHE_POLICY,
+            settings.MOVE_CACHE_MAX_ENTRIES,
+            settings.MOVE_CACHE_TTL_SECONDS,
+            settings.MOVE_CACHE_MIN_SAMPLES,
+        )
+        logger.info(f"Opened move cache at {settings.MOVE_CACHE_PATH} ({settings.MOVE_CACHE_POLICY} policy)")
+    return _cache
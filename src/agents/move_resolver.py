@@ -0,0 +1,394 @@
+"""
+Turns player replies into legal moves.
+
+A player gets up to settings.MOVE_MAX_ATTEMPTS requests per move. A reply
+that cannot be parsed, names an off-board cell or an occupied one is
+rejected, and the next request tells the model what was wrong with its
+last answer. Once the attempts are used up a local fallback policy moves
+instead, so a game never stalls on a model:
+
+    random     a uniformly random legal move
+    heuristic  win if possible, else block, else the cell on the most lines
+    solver     perfect play (the 3x3 table or solver), or a time-boxed
+               alpha-beta search on larger boards
+
+Per model the resolver counts requests, wasted requests (ones that did not
+produce the played move) and fallback moves. With streamed requests it
+also records the time until a legal move had arrived and the completion
+tokens saved by cancelling the rest of the reply, estimated against the
+model's average completion.
+
+Only replies are retried. A request that fails (connection refused,
+authentication, still rate limited after the limiter's own backoff) raises
+out of the resolver, so the game ends as an error instead of being won by
+the fallback policy under the model's name.
+"""
+
+import random
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from src.agents.move_stream import StreamedReply
+from src.agents.prompts import build_move_prompt, parse_move, player_prompt_format
+from src.agents.rate_limiter import response_token_usage
+from src.config.settings import settings
+from src.game.board import TicTacToeBoard
+from src.game.search import IterativeDeepeningSearch
+from src.utils.logger import logger
+
+FALLBACK_POLICIES = ("random", "heuristic", "solver")
+
+Move = Tuple[int, int]
+
+
+@dataclass
+class MoveStats:
+    """Cost of one played move, summed over every request made for it."""
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency_ms: float = 0.0
+    time_to_move_ms: float = 0.0
+    tokens_saved: int = 0
+    requests: int = 0
+    wasted: int = 0
+    cancelled: bool = False
+    cached: bool = False
+    fallback: bool = False
+
+
+@dataclass
+class ModelMoveStats:
+    """Move resolution counters of one model since the process started."""
+
+    moves: int = 0
+    requests: int = 0
+    wasted: int = 0
+    fallbacks: int = 0
+    cancelled: int = 0
+    tokens_saved: int = 0
+    time_to_move_ms: float = 0.0
+    # Replies that ran to completion, for the expected length of a reply
+    completions: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def fallback_rate(self) -> float:
+        """Share of moves played by the fallback policy."""
+        return self.fallbacks / self.moves if self.moves else 0.0
+
+    @property
+    def waste_rate(self) -> float:
+        """Share of requests whose answer was not played."""
+        return self.wasted / self.requests if self.requests else 0.0
+
+    @property
+    def avg_time_to_move_ms(self) -> float:
+        """Mean time until a legal move had arrived, over moves the model played."""
+        played = self.moves - self.fallbacks
+        return self.time_to_move_ms / played if played else 0.0
+
+    @property
+    def avg_completion_tokens(self) -> float:
+        """Mean completion tokens of replies that ran to completion."""
+        return self.completion_tokens / self.completions if self.completions else 0.0
+
+
+def rank_moves(board: TicTacToeBoard, rng: Optional[random.Random] = None) -> List[Move]:
+    """
+    Order the legal moves by the heuristic policy.
+
+    Winning moves come first, then blocks, then cells on the most lines the
+    opponent has not entered; ties are broken at random.
+
+    Args:
+        board: Current position
+        rng: Random source for tie-breaks
+
+    Returns:
+        List[Move]: Legal (row, col) moves, best first
+    """
+    rng = rng or random
+    geometry = board.geometry
+    own, opp = (board.x_bits, board.o_bits) if board.current_player == settings.PLAYER_X \
+        else (board.o_bits, board.x_bits)
+
+    def score(move: Move) -> Tuple[bool, bool, int, float]:
+        index = move[0] * board.size + move[1]
+        masks = geometry.cell_win_masks[index]
+        wins = any((own | 1 << index) & mask == mask for mask in masks)
+        blocks = any((opp | 1 << index) & mask == mask for mask in masks)
+        open_lines = sum(1 for mask in masks if not opp & mask)
+        return wins, blocks, open_lines, rng.random()
+
+    return sorted(board.get_valid_moves(), key=score, reverse=True)
+
+
+class MoveResolver:
+    """Requests moves with bounded retries and falls back to a local policy."""
+
+    def __init__(
+        self,
+        max_attempts: Optional[int] = None,
+        fallback_policy: Optional[str] = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize the resolver.
+
+        Args:
+            max_attempts: Requests per move (default: settings.MOVE_MAX_ATTEMPTS)
+            fallback_policy: "random", "heuristic" or "solver" (default: settings.MOVE_FALLBACK_POLICY)
+            seed: Seed for random choices of the fallback policies
+
+        Raises:
+            ValueError: If the fallback policy is not supported
+        """
+        fallback_policy = fallback_policy or settings.MOVE_FALLBACK_POLICY
+        if fallback_policy not in FALLBACK_POLICIES:
+            error_msg = (
+                f"Unsupported fallback policy: {fallback_policy}. "
+                f"Supported policies: {', '.join(FALLBACK_POLICIES)}"
+            )
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        self.max_attempts = max(1, max_attempts or settings.MOVE_MAX_ATTEMPTS)
+        self.fallback_policy = fallback_policy
+        self.stats: Dict[str, ModelMoveStats] = defaultdict(ModelMoveStats)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def check(content: Optional[str], board: TicTacToeBoard, prompt_format: str) -> Tuple[Optional[Move], str]:
+        """
+        Validate a reply against the position.
+
+        Args:
+            content: Reply text
+            board: Position the move was requested in
+            prompt_format: Format the move was requested in
+
+        Returns:
+            Tuple[Optional[Move], str]: (legal move, "") or (None, reason the reply was rejected)
+        """
+        move = parse_move(content, prompt_format, board.size)
+        compact = prompt_format == "compact"
+        if move is None:
+            return None, "no cell index found" if compact else "expected two numbers, row and column"
+
+        row, col = move
+        name = f"cell {row * board.size + col}" if compact else f"({row}, {col})"
+        if not (0 <= row < board.size and 0 <= col < board.size):
+            return None, f"{name} is off the board"
+        if move not in board.get_valid_moves():
+            return None, f"{name} is already taken"
+        return move, ""
+
+    @staticmethod
+    def retry_prompt(board: TicTacToeBoard, prompt_format: str, content: Optional[str], reason: str) -> str:
+        """
+        Build the prompt of a retry, telling the model why its answer was rejected.
+
+        Args:
+            board: Current position
+            prompt_format: Format the move is requested in
+            content: The rejected reply
+            reason: Why it was rejected
+
+        Returns:
+            str: Move prompt preceded by the error
+        """
+        reply = " ".join((content or "").split())[:40]
+        return f'Your answer "{reply}" was rejected: {reason}.\n\n{build_move_prompt(board, prompt_format)}'
+
+    def fallback_move(self, board: TicTacToeBoard) -> Move:
+        """
+        Choose a move with the local fallback policy.
+
+        Args:
+            board: Current position, with the game still in progress
+
+        Returns:
+            Move: A legal (row, col) move
+        """
+        if self.fallback_policy == "solver":
+            if (board.size, board.win_length) == (3, 3):
+                return self._rng.choice(board.best_moves())
+            return IterativeDeepeningSearch(settings.MOVE_FALLBACK_SEARCH_MS).search(board).move
+        if self.fallback_policy == "random":
+            return self._rng.choice(board.get_valid_moves())
+        return rank_moves(board, self._rng)[0]
+
+    def _attempt(
+        self,
+        model_str: str,
+        board: TicTacToeBoard,
+        prompt_format: str,
+        stats: MoveStats,
+        sent: float,
+        response: Any,
+    ) -> Tuple[Optional[Move], str]:
+        """
+        Account for one request and check its answer.
+
+        Args:
+            model_str: Model string in format "provider:model_name"
+            board: Position the move was requested in
+            prompt_format: Format the move was requested in
+            stats: Stats of the move being resolved
+            sent: perf_counter() when the request was sent
+            response: Reply of the player
+
+        Returns:
+            Tuple[Optional[Move], str]: (legal move, "") or (None, prompt for the next attempt)
+        """
+        elapsed_ms = stats.latency_ms
+        stats.requests += 1
+        stats.latency_ms += (time.perf_counter() - sent) * 1000
+        input_tokens, output_tokens = response_token_usage(response)
+        stats.input_tokens += input_tokens
+        stats.output_tokens += output_tokens
+
+        streamed = isinstance(response, StreamedReply)
+        with self._lock:
+            model_stats = self.stats[model_str]
+            if streamed and response.cancelled:
+                expected = model_stats.avg_completion_tokens
+                stats.tokens_saved += max(0, round(expected - output_tokens)) if expected else 0
+            elif output_tokens:
+                model_stats.completions += 1
+                model_stats.completion_tokens += output_tokens
+
+        content = response.content if response else None
+        move, reason = self.check(content, board, prompt_format)
+        if move is None:
+            logger.warning(f"Rejected move reply {content!r}: {reason}")
+            stats.wasted += 1
+            return None, self.retry_prompt(board, prompt_format, content, reason)
+
+        stats.cancelled = streamed and response.cancelled
+        if streamed and response.found_at is not None:
+            # A prefetched reply can have found its move before this turn started
+            stats.time_to_move_ms = elapsed_ms + max(0.0, response.found_at - sent) * 1000
+        else:
+            stats.time_to_move_ms = stats.latency_ms
+        return move, ""
+
+    def _finish(self, model_str: str, board: TicTacToeBoard, move: Optional[Move], stats: MoveStats) -> Move:
+        """Fall back if no attempt succeeded and update the per-model counters."""
+        if move is None:
+            move = self.fallback_move(board)
+            stats.fallback = True
+            logger.warning(
+                f"{model_str} gave no legal move in {stats.requests} requests; "
+                f"{self.fallback_policy} fallback plays {move}"
+            )
+        with self._lock:
+            model_stats = self.stats[model_str]
+            model_stats.moves += 1
+            model_stats.requests += stats.requests
+            model_stats.wasted += stats.wasted
+            model_stats.fallbacks += stats.fallback
+            model_stats.cancelled += stats.cancelled
+            model_stats.tokens_saved += stats.tokens_saved
+            if not stats.fallback:
+                model_stats.time_to_move_ms += stats.time_to_move_ms
+        return move
+
+    def resolve(
+        self,
+        player: Any,
+        model_str: str,
+        board: TicTacToeBoard,
+        prompt_format: str,
+        request: Callable[[str], Any],
+        prefetched: Any = None,
+    ) -> Tuple[Move, MoveStats]:
+        """
+        Get a legal move from a player, retrying with feedback and falling back.
+
+        Args:
+            player: Agent or EnginePlayer to move
+            model_str: Model string in format "provider:model_name"
+            board: Current position, with the game still in progress
+            prompt_format: Format chosen for the game
+            request: Sends a prompt to the player and returns its RunOutput or StreamedReply
+            prefetched: Future already running the first request (speculative prefetch)
+
+        Returns:
+            Tuple[Move, MoveStats]: The move to play and what it cost
+
+        Raises:
+            Exception: Whatever a request raised; failed requests are not retried
+        """
+        prompt_format = player_prompt_format(player, prompt_format)
+        stats = MoveStats()
+        prompt = build_move_prompt(board, prompt_format)
+        move = None
+        for attempt in range(self.max_attempts):
+            sent = time.perf_counter()
+            response = prefetched.result() if prefetched is not None and attempt == 0 else request(prompt)
+            move, prompt = self._attempt(model_str, board, prompt_format, stats, sent, response)
+            if move is not None:
+                break
+        return self._finish(model_str, board, move, stats), stats
+
+    async def resolve_async(
+        self,
+        player: Any,
+        model_str: str,
+        board: TicTacToeBoard,
+        prompt_format: str,
+        request: Callable[[str], Awaitable[Any]],
+        prefetched: Any = None,
+    ) -> Tuple[Move, MoveStats]:
+        """
+        Async variant of resolve for coroutine requests.
+
+        Args:
+            player: Agent or EnginePlayer to move
+            model_str: Model string in format "provider:model_name"
+            board: Current position, with the game still in progress
+            prompt_format: Format chosen for the game
+            request: Coroutine function sending a prompt to the player and returning its RunOutput or StreamedReply
+            prefetched: Task already running the first request (speculative prefetch)
+
+        Returns:
+            Tuple[Move, MoveStats]: The move to play and what it cost
+
+        Raises:
+            Exception: Whatever a request raised; failed requests are not retried
+        """
+        prompt_format = player_prompt_format(player, prompt_format)
+        stats = MoveStats()
+        prompt = build_move_prompt(board, prompt_format)
+        move = None
+        for attempt in range(self.max_attempts):
+            sent = time.perf_counter()
+            response = await (prefetched if prefetched is not None and attempt == 0 else request(prompt))
+            move, prompt = self._attempt(model_str, board, prompt_format, stats, sent, response)
+            if move is not None:
+                break
+        return self._finish(model_str, board, move, stats), stats
+
+
+_resolver: Optional[MoveResolver] = None
+
+
+def get_move_resolver() -> MoveResolver:
+    """
+    Get the process-wide resolver, so its per-model counters cover every game.
+
+    Returns:
+        MoveResolver: The shared resolver
+    """
+    global _resolver
+    if _resolver is None:
+        _resolver = MoveResolver()
+        logger.info(
+            f"Created move resolver ({_resolver.max_attempts} attempts, {_resolver.fallback_policy} fallback)"
+        )
+    return _resolver
@@ -0,0 +1,154 @@
+"""
+Streaming move requests with early cancellation.
+
+Reasoning-style models can write long explanations around the two numbers
+we need. In streaming mode the reply is read event by event through an
+IncrementalMoveParser and the stream is closed as soon as a legal move has
+arrived, which stops the rest of the generation from being downloaded.
+Local engine players do not stream and are called as usual.
+
+Providers only report token usage at the end of a stream, so a cancelled
+reply carries an estimate instead: the prompt at about 4 characters per
+token, and the content and reasoning text received before the cut.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+from agno.run.agent import RunCompletedEvent, RunContentEvent, RunErrorEvent, RunOutput
+from src.agents.engine_player import EnginePlayer
+from src.agents.prompts import IncrementalMoveParser
+from src.agents.rate_limiter import AgentRunError, estimate_tokens
+from src.game.board import TicTacToeBoard
+
+
+@dataclass
+class StreamedReply:
+    """A reply read from a stream, possibly cut short once it held a move."""
+
+    content: Optional[str] = None
+    text: str = ""
+    move: Optional[Tuple[int, int]] = None
+    metrics: Any = None
+    streamed_chars: int = 0
+    cancelled: bool = False
+    found_at: Optional[float] = None
+
+
+def _absorb(reply: StreamedReply, parser: IncrementalMoveParser, event: Any) -> bool:
+    """
+    Feed one stream event into the reply.
+
+    Args:
+        reply: Reply being assembled
+        parser: Parser of the reply's content
+        event: RunOutput event from the agent
+
+    Returns:
+        bool: True once a legal move has been received
+
+    Raises:
+        AgentRunError: If the agent reports an error in the stream
+    """
+    if isinstance(event, RunErrorEvent):
+        raise AgentRunError(event.content or "Agent run failed", event.error_id == "model_rate_limit_error")
+    if isinstance(event, (RunCompletedEvent, RunOutput)):
+        # Usage is only reported at the end of a stream that ran to completion
+        reply.metrics = event.metrics
+        return False
+    if not isinstance(event, RunContentEvent):
+        return False
+    reply.streamed_chars += len(event.reasoning_content or "")
+    if isinstance(event.content, str):
+        reply.streamed_chars += len(event.content)
+        reply.move = parser.feed(event.content)
+        if reply.move is not None:
+            reply.found_at = time.perf_counter()
+            return True
+    return False
+
+
+def _settle(
+    reply: StreamedReply, parser: IncrementalMoveParser, prompt_format: str, player: Any, prompt: str
+) -> StreamedReply:
+    """Finish a reply: pick up a trailing number, set the content the resolver checks and the usage."""
+    if reply.move is None:
+        reply.move = parser.finish()
+        if reply.move is not None:
+            reply.found_at = time.perf_counter()
+    reply.text = parser.text
+    if reply.metrics is None:
+        reply.metrics = {
+            "input_tokens": estimate_tokens(getattr(player, "description", None), prompt, completion=0),
+            "output_tokens": -(-reply.streamed_chars // 4),
+        }
+    if reply.move is None:
+        reply.content = parser.text
+    elif prompt_format == "compact":
+        reply.content = str(reply.move[0] * parser.size + reply.move[1])
+    else:
+        reply.content = f"{reply.move[0]} {reply.move[1]}"
+    return reply
+
+
+def stream_move(player: Any, prompt: str, board: TicTacToeBoard, prompt_format: str = "verbose") -> Any:
+    """
+    Request a move, reading the reply as a stream and stopping at the first legal move.
+
+    Args:
+        player: Agent or EnginePlayer
+        prompt: Move prompt
+        board: Position the move is requested in
+        prompt_format: Format the move is requested in
+
+    Returns:
+        Any: StreamedReply, or the RunOutput of a local engine player
+    """
+    if isinstance(player, EnginePlayer):
+        return player.run(prompt, stream=False)
+
+    parser = IncrementalMoveParser(board, prompt_format)
+    reply = StreamedReply()
+    stream = player.run(prompt, stream=True)
+    try:
+        for event in stream:
+            if _absorb(reply, parser, event):
+                reply.cancelled = True
+                break
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    return _settle(reply, parser, prompt_format, player, prompt)
+
+
+async def astream_move(player: Any, prompt: str, board: TicTacToeBoard, prompt_format: str = "verbose") -> Any:
+    """
+    Async variant of stream_move.
+
+    Args:
+        player: Agent or EnginePlayer
+        prompt: Move prompt
+        board: Position the move is requested in
+        prompt_format: Format the move is requested in
+
+    Returns:
+        Any: StreamedReply, or the RunOutput of a local engine player
+    """
+    if isinstance(player, EnginePlayer):
+        return await asyncio.to_thread(player.run, prompt, stream=False)
+
+    parser = IncrementalMoveParser(board, prompt_format)
+    reply = StreamedReply()
+    stream = player.arun(prompt, stream=True)
+    try:
+        async for event in stream:
+            if _absorb(reply, parser, event):
+                reply.cancelled = True
+                break
+    finally:
+        aclose = getattr(stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    return _settle(reply, parser, prompt_format, player, prompt)
@@ -0,0 +1,261 @@
+"""
+Prompts sent to LLM players and parsing of their replies.
+
+Two formats are supported:
+    verbose  the original prompts: a long system prompt, the ASCII grid and
+             the legal moves as a list of (row, col) tuples
+    compact  a short static system prompt, the board as one character per
+             cell and the legal moves as cell indices; the reply is an index
+
+The system prompt only depends on the symbol and the board variant, so
+providers that cache prompt prefixes can reuse it across every move.
+"""
+
+import math
+import re
+from textwrap import dedent
+from typing import Any, List, Optional, Tuple
+from src.agents.engine_player import EnginePlayer
+from src.config.settings import settings
+from src.game.board import TicTacToeBoard
+from src.utils.logger import logger
+
+PROMPT_FORMATS = ("verbose", "compact")
+
+NUMBER = re.compile(r"\d+")
+
+
+def validate_prompt_format(prompt_format: str) -> str:
+    """
+    Check that a prompt format is supported.
+
+    Args:
+        prompt_format: Format name
+
+    Returns:
+        str: The format name
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    if prompt_format not in PROMPT_FORMATS:
+        error_msg = f"Unsupported prompt format: {prompt_format}. Supported formats: {', '.join(PROMPT_FORMATS)}"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    return prompt_format
+
+
+def player_prompt_format(player: Any, prompt_format: str) -> str:
+    """
+    Format to use with a given player.
+
+    Local engine players read their bound board and always answer "row col",
+    so they keep the verbose format whatever the game uses.
+
+    Args:
+        player: Agent or EnginePlayer
+        prompt_format: Format chosen for the game
+
+    Returns:
+        str: The format to build this player's prompts and parse its replies with
+    """
+    return "verbose" if isinstance(player, EnginePlayer) else prompt_format
+
+
+def build_system_prompt(
+    player_name: str, player_symbol: str, size: int, k: int, prompt_format: str = "verbose"
+) -> str:
+    """
+    Build the system prompt (agent description) of an LLM player.
+
+    Args:
+        player_name: Name of the player (e.g., "Player X")
+        player_symbol: Symbol used by the player ("X" or "O")
+        size: Width and height of the board
+        k: Marks in a row needed to win
+        prompt_format: "verbose" or "compact"
+
+    Returns:
+        str: The system prompt
+    """
+    if validate_prompt_format(prompt_format) == "compact":
+        return (
+            f"You play {player_symbol} in {size}x{size} tic-tac-toe; {k} in a row wins.\n"
+            f"Board: {size * size} chars, row by row, X/O/. (.=empty); cell i is row i//{size}, col i%{size}.\n"
+            f"Reply with one legal cell index only."
+        )
+
+    last = size - 1
+    return dedent(f"""\
+    You are {player_name} in a Tic Tac Toe game. Your goal is to win by placing {k} {player_symbol}'s in a row (horizontally, vertically, or diagonally).
+
+    BOARD LAYOUT:
+    - The board is a {size}x{size} grid with coordinates from (0,0) to ({last},{last})
+    - Top-left is (0,0), bottom-right is ({last},{last})
+
+    RULES:
+    - You can only place {player_symbol} in empty spaces (shown as " " on the board)
+    - Players take turns placing their marks
+    - First to get {k} marks in a row (horizontal, vertical, or diagonal) wins
+    - If all spaces are filled with no winner, the game is a draw
+
+    YOUR RESPONSE:
+    - Provide ONLY two numbers separated by a space (row column)
+    - Example: "1 2" places your {player_symbol} in row 1, column 2
+    - Choose only from the valid moves list provided to you
+
+    STRATEGY TIPS:
+    - Study the board carefully and make strategic moves
+    - Block your opponent's potential winning moves
+    - Create opportunities for multiple winning paths
+    - Pay attention to the valid moves and avoid illegal moves
+    """)
+
+
+def build_move_prompt(board: TicTacToeBoard, prompt_format: str = "verbose") -> str:
+    """
+    Build the user prompt asking the player to move.
+
+    Args:
+        board: Current position
+        prompt_format: "verbose" or "compact"
+
+    Returns:
+        str: Prompt with the board and the legal moves
+    """
+    if validate_prompt_format(prompt_format) == "compact":
+        cells = "".join(cell if cell != settings.EMPTY_CELL else "." for cell in board.cells())
+        legal = ",".join(str(row * board.size + col) for row, col in board.get_valid_moves())
+        return f"{cells}\nLegal: {legal}"
+
+    return f"""\
+Current board state:\n{board.get_board_state()}\n
+Available valid moves (row, col): {board.get_valid_moves()}\n
+Choose your next move from the valid moves above.
+Respond with ONLY two numbers for row and column, e.g. "1 2"."""
+
+
+def board_from_prompt(prompt: str, win_length: Optional[int] = None) -> Optional[TicTacToeBoard]:
+    """
+    Rebuild the position a move prompt was built from, in either format.
+
+    Only the cells are recovered, not the move order, which is all a local
+    policy needs to pick a move.
+
+    Args:
+        prompt: Move prompt, possibly preceded by retry feedback
+        win_length: Marks in a row needed to win (default: settings.WIN_LENGTH, capped at the board size)
+
+    Returns:
+        Optional[TicTacToeBoard]: The position, or None if the prompt holds no board
+    """
+    compact = re.search(r"^([XO.]+)\nLegal:", prompt, re.MULTILINE)
+    if compact:
+        cells = [cell if cell != "." else settings.EMPTY_CELL for cell in compact.group(1)]
+    else:
+        rows = [line.strip("|").split("|") for line in prompt.splitlines() if line.startswith("|")]
+        cells = [cell.strip() or settings.EMPTY_CELL for row in rows for cell in row]
+    size = math.isqrt(len(cells))
+    if not cells or size * size != len(cells):
+        return None
+
+    board = TicTacToeBoard(size, min(win_length or settings.WIN_LENGTH, size))
+    x_cells = [index for index, cell in enumerate(cells) if cell == settings.PLAYER_X]
+    o_cells = [index for index, cell in enumerate(cells) if cell == settings.PLAYER_O]
+    # X moves first, so replaying both lists alternately restores the side to move
+    for ply in range(len(x_cells) + len(o_cells)):
+        board.push((o_cells if ply % 2 else x_cells)[ply // 2])
+    return board
+
+
+def parse_move(
+    content: Optional[str], prompt_format: str = "verbose", size: Optional[int] = None
+) -> Optional[Tuple[int, int]]:
+    """
+    Extract a (row, col) pair from a model reply.
+
+    Args:
+        content: Reply text
+        prompt_format: Format the move was requested in
+        size: Width of the board, needed to decode compact cell indices (default: settings.BOARD_SIZE)
+
+    Returns:
+        Optional[Tuple[int, int]]: The move, or None if the reply holds too few numbers
+    """
+    numbers = NUMBER.findall(content or "")
+    if prompt_format == "compact":
+        # An out-of-range index decodes to an off-board move and is rejected as illegal
+        return divmod(int(numbers[0]), size or settings.BOARD_SIZE) if numbers else None
+    if len(numbers) < 2:
+        return None
+    return int(numbers[0]), int(numbers[1])
+
+
+class IncrementalMoveParser:
+    """
+    Finds the first legal move in a reply while it streams in.
+
+    A number is read as soon as it is complete: followed by a non-digit, or
+    already too large to grow into a coordinate (a cell index in compact
+    format), so "1 2" on a 3x3 board is recognised at the "2". Verbose
+    replies are read as consecutive (row, col) pairs, compact replies as
+    single cell indices; pairs that are not legal are skipped.
+    """
+
+    def __init__(self, board: TicTacToeBoard, prompt_format: str = "verbose"):
+        """
+        Initialize the parser for one reply.
+
+        Args:
+            board: Position the move was requested in
+            prompt_format: Format the move was requested in
+        """
+        self.size = board.size
+        self.compact = prompt_format == "compact"
+        self.limit = board.size * board.size if self.compact else board.size
+        self.legal = set(board.get_valid_moves())
+        self.text = ""
+        self._scanned = 0
+        self._numbers: List[int] = []
+
+    def feed(self, chunk: Optional[str]) -> Optional[Tuple[int, int]]:
+        """
+        Add the next piece of the reply.
+
+        Args:
+            chunk: Newly received text
+
+        Returns:
+            Optional[Tuple[int, int]]: The first legal move, once it has been received
+        """
+        self.text += chunk or ""
+        return self._scan(final=False)
+
+    def finish(self) -> Optional[Tuple[int, int]]:
+        """
+        Read a number left at the very end of the reply.
+
+        Returns:
+            Optional[Tuple[int, int]]: The first legal move, or None if the reply holds none
+        """
+        return self._scan(final=True)
+
+    def _scan(self, final: bool) -> Optional[Tuple[int, int]]:
+        """Consume the complete numbers received since the last scan."""
+        for match in NUMBER.finditer(self.text, self._scanned):
+            value = int(match.group())
+            if not final and match.end() == len(self.text) and value * 10 < self.limit:
+                break  # More digits may follow in the next chunk
+            self._scanned = match.end()
+            self._numbers.append(value)
+
+            if self.compact:
+                move = divmod(self._numbers.pop(), self.size)
+            elif len(self._numbers) == 2:
+                move = (self._numbers[0], self._numbers[1])
+                self._numbers.clear()
+            else:
+                continue
+            if move in self.legal:
+                return move
+        return None
@@ -0,0 +1,466 @@
+"""
+Provider-aware rate limiting for LLM move requests.
+
+Every request draws from token buckets for requests/minute and
+tokens/minute, at both the provider level (account-wide limits) and the
+model level (Groq limits each model separately); limits come from
+settings.RATE_LIMITS and settings.MODEL_RATE_LIMITS. A request waits until
+all of its buckets can pay, instead of firing and collecting a 429.
+
+When a provider still answers 429, its ``Retry-After`` (header or "try
+again in Xs" message) blocks the whole provider until then, and the request
+is retried with jittered exponential backoff. Both sync (Streamlit) and
+async (match engine) callers share the same buckets.
+
+agno does not raise model errors out of a run: it returns them as the
+content of a run with status "ERROR". The limiter raises those as
+AgentRunError, so a 429 is backed off and any other failure reaches the
+caller instead of being read as a reply.
+"""
+
+import asyncio
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+from agno.run.agent import RunStatus
+from src.config.settings import settings
+from src.utils.logger import logger
+
+T = TypeVar("T")
+
+# Groq/OpenAI style hints such as "Please try again in 1m2.5s" or "in 350ms"
+RETRY_HINT = re.compile(r"try again in (?:(\d+)m)?(\d+(?:\.\d+)?)(ms|s)", re.IGNORECASE)
+# Error texts of runs that were rate limited, where agno kept only the message
+RATE_LIMIT_HINT = re.compile(r"\b429\b|rate.?limit", re.IGNORECASE)
+
+
+class TokenBucket:
+    """Continuously refilled bucket holding up to one minute of allowance."""
+
+    def __init__(self, per_minute: int):
+        """
+        Initialize a full bucket.
+
+        Args:
+            per_minute: Allowance refilled per minute (also the burst capacity)
+        """
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        """Add the allowance accrued since the last update."""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """
+        Seconds until ``amount`` can be drawn.
+
+        Args:
+            amount: Units needed (capped at the capacity so oversized requests still pass)
+            now: Current monotonic time
+
+        Returns:
+            float: 0 if the bucket can pay now
+        """
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def consume(self, amount: float):
+        """Draw ``amount`` units; the level may go negative to settle under-estimates."""
+        self.level -= amount
+
+
+@dataclass
+class LimiterStats:
+    """Per-provider rate limiter metrics."""
+
+    requests: int = 0
+    throttled: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    rate_limit_errors: int = 0
+    retries: int = 0
+    queue_depth: int = 0
+    peak_queue_depth: int = 0
+
+    @property
+    def avg_wait(self) -> float:
+        """Mean seconds a request waited for its buckets."""
+        return self.total_wait / self.requests if self.requests else 0.0
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request is still rate limited after the last retry."""
+
+
+class AgentRunError(RuntimeError):
+    """An agent run that reported an error instead of raising it."""
+
+    def __init__(self, message: str, rate_limited: bool = False):
+        """
+        Initialize the error.
+
+        Args:
+            message: Error reported by the run
+            rate_limited: Whether the run is known to have been rate limited; also inferred from the message
+        """
+        super().__init__(message)
+        self.status_code = 429 if rate_limited or RATE_LIMIT_HINT.search(message) else None
+
+
+def raise_for_run_error(response: Any):
+    """
+    Raise the error an agent run returned as its result.
+
+    Args:
+        response: RunOutput, StreamedReply or engine reply
+
+    Raises:
+        AgentRunError: If the run ended with status "ERROR"
+    """
+    if getattr(response, "status", None) == RunStatus.error:
+        raise AgentRunError(str(response.content or "Agent run failed"))
+
+
+def response_token_usage(response: Any) -> Tuple[int, int]:
+    """
+    Prompt and completion token counts reported on a run response.
+
+    Args:
+        response: RunOutput (or None)
+
+    Returns:
+        Tuple[int, int]: (input tokens, output tokens), zeros when not reported
+    """
+    metrics = getattr(response, "metrics", None)
+    if metrics is None:
+        return 0, 0
+    if isinstance(metrics, dict):
+        # Older agno releases report per-message lists
+        input_tokens, output_tokens = metrics.get("input_tokens", 0), metrics.get("output_tokens", 0)
+        return (
+            sum(input_tokens) if isinstance(input_tokens, list) else input_tokens or 0,
+            sum(output_tokens) if isinstance(output_tokens, list) else output_tokens or 0,
+        )
+    return getattr(metrics, "input_tokens", 0) or 0, getattr(metrics, "output_tokens", 0) or 0
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    Whether an exception is a provider 429.
+
+    Args:
+        error: Exception raised by a model call
+
+    Returns:
+        bool: True for rate limit responses
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or type(error).__name__ in ("ModelRateLimitError", "RateLimitError")
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    Seconds the provider asked us to wait, if it said.
+
+    Args:
+        error: Rate limit exception
+
+    Returns:
+        Optional[float]: Delay from the Retry-After header or the error message
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or getattr(error, "headers", None)
+    if headers:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            pass
+    match = RETRY_HINT.search(str(getattr(error, "message", None) or error))
+    if match:
+        minutes, amount, unit = match.groups()
+        seconds = float(amount) / 1000 if unit.lower() == "ms" else float(amount)
+        return int(minutes or 0) * 60 + seconds
+    return None
+
+
+class RateLimiter:
+    """Token buckets per provider and model, shared by sync and async callers."""
+
+    def __init__(
+        self,
+        provider_limits: Optional[Dict[str, Dict[str, int]]] = None,
+        model_limits: Optional[Dict[str, Dict[str, int]]] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_cap: Optional[float] = None,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            provider_limits: {"provider": {"rpm": n, "tpm": n}} (default: settings.RATE_LIMITS)
+            model_limits: {"provider:model": {"rpm": n, "tpm": n}} (default: settings.MODEL_RATE_LIMITS)
+            max_retries: Retries after a 429 (default: settings.RATE_LIMIT_MAX_RETRIES)
+            backoff_base: First backoff ceiling in seconds (default: settings.RATE_LIMIT_BACKOFF_BASE)
+            backoff_cap: Largest backoff ceiling in seconds (default: settings.RATE_LIMIT_BACKOFF_CAP)
+        """
+        self.provider_limits = settings.RATE_LIMITS if provider_limits is None else provider_limits
+        self.model_limits = settings.MODEL_RATE_LIMITS if model_limits is None else model_limits
+        self.max_retries = settings.RATE_LIMIT_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base or settings.RATE_LIMIT_BACKOFF_BASE
+        self.backoff_cap = backoff_cap or settings.RATE_LIMIT_BACKOFF_CAP
+        self.stats: Dict[str, LimiterStats] = defaultdict(LimiterStats)
+        self._buckets: Dict[str, Tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self._blocked_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _buckets_for(self, scope: str, limits: Dict[str, int]) -> Tuple[Optional[TokenBucket], Optional[TokenBucket]]:
+        """Get (request bucket, token bucket) for a provider or model; 0 or missing disables one."""
+        if scope not in self._buckets:
+            rpm, tpm = limits.get("rpm", 0), limits.get("tpm", 0)
+            self._buckets[scope] = (TokenBucket(rpm) if rpm else None, TokenBucket(tpm) if tpm else None)
+        return self._buckets[scope]
+
+    def _reserve(self, model_str: str, tokens: int) -> float:
+        """
+        Draw one request and ``tokens`` from every bucket of the model, if all can pay.
+
+        Args:
+            model_str: Model string in format "provider:model_name"
+            tokens: Estimated tokens of the request
+
+        Returns:
+            float: 0 if the request was admitted, otherwise seconds to wait before trying again
+        """
+        provider = model_str.split(":")[0]
+        scopes = [(provider, self.provider_limits.get(provider, {})), (model_str, self.model_limits.get(model_str, {}))]
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self._blocked_until.get(provider, 0.0) - now, 0.0)
+            pairs: List[Tuple[TokenBucket, float]] = []
+            for scope, limits in scopes:
+                requests_bucket, tokens_bucket = self._buckets_for(scope, limits)
+                if requests_bucket:
+                    pairs.append((requests_bucket, 1))
+                if tokens_bucket and tokens:
+                    pairs.append((tokens_bucket, tokens))
+            for bucket, amount in pairs:
+                wait = max(wait, bucket.wait_time(amount, now))
+            if wait == 0.0:
+                for bucket, amount in pairs:
+                    bucket.consume(amount)
+            return wait
+
+    def record_usage(self, model_str: str, extra_tokens: int):
+        """
+        Settle the difference between estimated and reported tokens.
+
+        Args:
+            model_str: Model string in format "provider:model_name"
+            extra_tokens: Reported minus estimated tokens (negative refunds)
+        """
+        provider = model_str.split(":")[0]
+        with self._lock:
+            for scope in (provider, model_str):
+                _, tokens_bucket = self._buckets.get(scope, (None, None))
+                if tokens_bucket:
+                    tokens_bucket.consume(extra_tokens)
+
+    def _backoff(self, provider: str, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Decide whether and how long to back off after an error.
+
+        Args:
+            provider: Provider prefix of the model string
+            error: Exception raised by the call
+            attempt: Zero-based attempt number that failed
+
+        Returns:
+            Optional[float]: Seconds to sleep before retrying, or None to re-raise
+        """
+        if not is_rate_limit_error(error):
+            return None
+        with self._lock:
+            stats = self.stats[provider]
+            stats.rate_limit_errors += 1
+            if attempt >= self.max_retries:
+                return None
+
+            # Full jitter, but never sooner than the provider asked for
+            delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+            hinted = retry_after(error)
+            if hinted is not None:
+                delay = max(delay, hinted)
+                self._blocked_until[provider] = max(self._blocked_until.get(provider, 0.0), time.monotonic() + hinted)
+            stats.retries += 1
+        logger.warning(f"{provider} rate limited (attempt {attempt + 1}); retrying in {delay:.1f}s")
+        return delay
+
+    def _admitted(self, provider: str, waited: float):
+        """Update metrics once a request leaves the queue."""
+        with self._lock:
+            stats = self.stats[provider]
+            stats.requests += 1
+            stats.queue_depth -= 1
+            if waited > 0:
+                stats.throttled += 1
+                stats.total_wait += waited
+                stats.max_wait = max(stats.max_wait, waited)
+
+    def _enqueued(self, provider: str):
+        """Update metrics when a request starts waiting for its buckets."""
+        with self._lock:
+            stats = self.stats[provider]
+            stats.queue_depth += 1
+            stats.peak_queue_depth = max(stats.peak_queue_depth, stats.queue_depth)
+
+    def _settle(self, model_str: str, response: Any, estimated_tokens: int):
+        """Correct the token buckets with the usage the provider reported."""
+        input_tokens, output_tokens = response_token_usage(response)
+        if input_tokens or output_tokens:
+            self.record_usage(model_str, input_tokens + output_tokens - estimated_tokens)
+
+    def acquire(self, model_str: str, estimated_tokens: int = 0):
+        """
+        Block until the model's buckets admit one request.
+
+        Args:
+            model_str: Model string in format "provider:model_name"
+            estimated_tokens: Expected prompt plus completion tokens
+        """
+        provider = model_str.split(":")[0]
+        start, throttled = time.monotonic(), False
+        self._enqueued(provider)
+        while True:
+            wait = self._reserve(model_str, estimated_tokens)
+            if wait == 0.0:
+                break
+            throttled = True
+            time.sleep(wait)
+        self._admitted(provider, time.monotonic() - start if throttled else 0.0)
+
+    async def acquire_async(self, model_str: str, estimated_tokens: int = 0):
+        """
+        Wait, without blocking the event loop, until the model's buckets admit one request.
+
+        Args:
+            model_str: Model string in format "provider:model_name"
+            estimated_tokens: Expected prompt plus completion tokens
+        """
+        provider = model_str.split(":")[0]
+        start, throttled = time.monotonic(), False
+        self._enqueued(provider)
+        while True:
+            wait = self._reserve(model_str, estimated_tokens)
+            if wait == 0.0:
+                break
+            throttled = True
+            await asyncio.sleep(wait)
+        self._admitted(provider, time.monotonic() - start if throttled else 0.0)
+
+    def call(self, model_str: str, func: Callable[[], T], estimated_tokens: int = 0) -> T:
+        """
+        Run a blocking model call under the rate limits, retrying 429s.
+
+        Args:
+            model_str: Model string in format "provider:model_name"
+            func: Zero-argument callable performing the request
+            estimated_tokens: Expected prompt plus completion tokens
+
+        Returns:
+            T: The callable's result
+
+        Raises:
+            RateLimitExceeded: If the provider still rate limits after the last retry
+        """
+        provider = model_str.split(":")[0]
+        for attempt in range(self.max_retries + 1):
+            self.acquire(model_str, estimated_tokens)
+            try:
+                response = func()
+                raise_for_run_error(response)
+            except Exception as e:
+                delay = self._backoff(provider, e, attempt)
+                if delay is None:
+                    if is_rate_limit_error(e):
+                        raise RateLimitExceeded(f"{model_str} still rate limited after {attempt + 1} attempts") from e
+                    raise
+                time.sleep(delay)
+                continue
+            self._settle(model_str, response, estimated_tokens)
+            return response
+        raise RateLimitExceeded(f"{model_str} still rate limited after {self.max_retries + 1} attempts")
+
+    async def call_async(self, model_str: str, func: Callable[[], Awaitable[T]], estimated_tokens: int = 0) -> T:
+        """
+        Await a model call under the rate limits, retrying 429s.
+
+        Args:
+            model_str: Model string in format "provider:model_name"
+            func: Zero-argument callable returning the request coroutine
+            estimated_tokens: Expected prompt plus completion tokens
+
+        Returns:
+            T: The coroutine's result
+
+        Raises:
+            RateLimitExceeded: If the provider still rate limits after the last retry
+        """
+        provider = model_str.split(":")[0]
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async(model_str, estimated_tokens)
+            try:
+                response = await func()
+                raise_for_run_error(response)
+            except Exception as e:
+                delay = self._backoff(provider, e, attempt)
+                if delay is None:
+                    if is_rate_limit_error(e):
+                        raise RateLimitExceeded(f"{model_str} still rate limited after {attempt + 1} attempts") from e
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self._settle(model_str, response, estimated_tokens)
+            return response
+        raise RateLimitExceeded(f"{model_str} still rate limited after {self.max_retries + 1} attempts")
+
+
+def estimate_tokens(*texts: str, completion: int = 16) -> int:
+    """
+    Rough token count of a request (about 4 characters per token) plus its reply.
+
+    Args:
+        texts: Prompt parts sent with the request
+        completion: Tokens expected in the reply
+
+    Returns:
+        int: Estimated total tokens
+    """
+    return sum(len(text or "") for text in texts) // 4 + completion
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get the process-wide limiter, so every session and game shares one set of buckets.
+
+    Returns:
+        RateLimiter: The shared limiter
+    """
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter()
+    return _limiter
@@ -0,0 +1,249 @@
+"""
+Speculative prefetch of the opponent's reply.
+
+Moves are serial, so a game's wall time is the sum of both models'
+latencies. While a player is thinking nothing needs the opponent, so its
+request for the positions the current move most likely leads to can
+already be in flight. Likely moves come from the move cache when it has
+recorded the current model in this position, else from the 3x3
+perfect-play table, else from the heuristic fallback ranking. When the
+real move lands, the prefetch for that position answers the opponent's
+first attempt and the other prefetches are cancelled.
+
+Local engine opponents read their bound board rather than the prompt and
+are never prefetched.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+from src.agents.engine_player import EnginePlayer
+from src.agents.move_cache import get_move_cache
+from src.agents.move_resolver import Move, rank_moves
+from src.agents.prompts import build_move_prompt, player_prompt_format
+from src.config.settings import settings
+from src.game.board import TicTacToeBoard
+from src.utils.logger import logger
+
+# Builds the request function for the opponent in a given position
+RequestFactory = Callable[[TicTacToeBoard], Callable[[str], Any]]
+
+
+@dataclass
+class Prefetch:
+    """An opponent request started for a predicted move."""
+
+    move: Move
+    board: TicTacToeBoard  # Position after the move, the one the opponent answers
+    prompt: str
+    started: float
+    handle: Any = None  # asyncio.Task or concurrent.futures.Future
+    done_at: Optional[float] = None
+
+
+@dataclass
+class SpeculationStats:
+    """Counters since the speculator was created."""
+
+    turns: int = 0
+    hits: int = 0
+    launched: int = 0
+    saved_ms: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of speculated turns whose real move had been prefetched."""
+        return self.hits / self.turns if self.turns else 0.0
+
+    @property
+    def extra_calls(self) -> int:
+        """Prefetched requests whose answer was never used."""
+        return self.launched - self.hits
+
+
+class Speculator:
+    """Predicts the current move and prefetches the opponent's replies."""
+
+    def __init__(self, width: Optional[int] = None, max_workers: Optional[int] = None):
+        """
+        Initialize the speculator.
+
+        Args:
+            width: Predicted moves prefetched per turn (default: settings.SPECULATION_WIDTH)
+            max_workers: Threads for blocking prefetches (default: 4 per predicted move)
+        """
+        self.width = width or settings.SPECULATION_WIDTH
+        self.max_workers = max_workers or 4 * self.width
+        self.stats = SpeculationStats()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def predict(self, player: Any, model_str: str, board: TicTacToeBoard) -> List[Move]:
+        """
+        Most likely moves of the player to move.
+
+        Args:
+            player: Agent or EnginePlayer about to move
+            model_str: Model string in format "provider:model_name"
+            board: Current position
+
+        Returns:
+            List[Move]: Up to width legal moves, most likely first
+        """
+        cache = get_move_cache()
+        cache_key = cache.agent_key(player, model_str) if cache is not None else None
+        moves = cache.top_moves(*cache_key, board, self.width) if cache_key else []
+        if (board.size, board.win_length) == (3, 3):
+            moves += [move for move in board.best_moves() if move not in moves]
+        moves += [move for move in rank_moves(board) if move not in moves]
+        return moves[:self.width]
+
+    def _prepare(
+        self, player: Any, model_str: str, board: TicTacToeBoard, opponent: Any, prompt_format: str
+    ) -> List[Prefetch]:
+        """Prefetches to start for the opponent, one per predicted move that does not end the game."""
+        if isinstance(opponent, EnginePlayer):
+            return []
+        prompt_format = player_prompt_format(opponent, prompt_format)
+        prefetches = []
+        for move in self.predict(player, model_str, board):
+            after = board.copy()
+            after.push(move[0] * board.size + move[1])
+            if after.winner or not after.get_valid_moves():
+                continue
+            prefetches.append(Prefetch(move, after, build_move_prompt(after, prompt_format), time.perf_counter()))
+        return prefetches
+
+    def _mark_done(self, prefetch: Prefetch):
+        """Record when a prefetch finished and retrieve its error so it is not reported as unhandled."""
+        prefetch.done_at = time.perf_counter()
+        handle = prefetch.handle
+        if not handle.cancelled():
+            handle.exception()
+
+    def launch(
+        self,
+        player: Any,
+        model_str: str,
+        board: TicTacToeBoard,
+        opponent: Any,
+        prompt_format: str,
+        request_factory: RequestFactory,
+    ) -> List[Prefetch]:
+        """
+        Start the opponent's requests in worker threads while the player thinks.
+
+        Args:
+            player: Agent or EnginePlayer about to move
+            model_str: Model string of the player
+            board: Current position
+            opponent: Player moving next
+            prompt_format: Format chosen for the game
+            request_factory: Builds the opponent's request function for a position
+
+        Returns:
+            List[Prefetch]: Started prefetches, to be passed to claim() once the move lands
+        """
+        prefetches = self._prepare(player, model_str, board, opponent, prompt_format)
+        if prefetches and self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="speculation")
+        for prefetch in prefetches:
+            request = request_factory(prefetch.board)
+            prefetch.handle = self._executor.submit(request, prefetch.prompt)
+            prefetch.handle.add_done_callback(lambda _, prefetch=prefetch: self._mark_done(prefetch))
+        with self._lock:
+            self.stats.launched += len(prefetches)
+        return prefetches
+
+    def launch_async(
+        self,
+        player: Any,
+        model_str: str,
+        board: TicTacToeBoard,
+        opponent: Any,
+        prompt_format: str,
+        request_factory: RequestFactory,
+    ) -> List[Prefetch]:
+        """
+        Start the opponent's requests as tasks on the running loop while the player thinks.
+
+        Args:
+            player: Agent or EnginePlayer about to move
+            model_str: Model string of the player
+            board: Current position
+            opponent: Player moving next
+            prompt_format: Format chosen for the game
+            request_factory: Builds the opponent's coroutine request function for a position
+
+        Returns:
+            List[Prefetch]: Started prefetches, to be passed to claim() once the move lands
+        """
+        prefetches = self._prepare(player, model_str, board, opponent, prompt_format)
+        for prefetch in prefetches:
+            request = request_factory(prefetch.board)
+            prefetch.handle = asyncio.ensure_future(request(prefetch.prompt))
+            prefetch.handle.add_done_callback(lambda _, prefetch=prefetch: self._mark_done(prefetch))
+        with self._lock:
+            self.stats.launched += len(prefetches)
+        return prefetches
+
+    def claim(self, prefetches: List[Prefetch], move: Move) -> Optional[Any]:
+        """
+        Keep the prefetch for the move that was played and cancel the others.
+
+        Args:
+            prefetches: Prefetches started for this turn
+            move: Move that was actually played; the game must still be in progress
+
+        Returns:
+            Optional[Any]: Task or Future answering the opponent's first request, or None on a miss
+        """
+        if not prefetches:
+            return None
+        landed = time.perf_counter()
+        hit = None
+        for prefetch in prefetches:
+            if prefetch.move == move:
+                hit = prefetch
+            else:
+                prefetch.handle.cancel()
+
+        with self._lock:
+            self.stats.turns += 1
+            if hit is not None:
+                self.stats.hits += 1
+                self.stats.saved_ms += (min(landed, hit.done_at or landed) - hit.started) * 1000
+        return hit.handle if hit is not None else None
+
+    @staticmethod
+    def cancel(prefetches: List[Prefetch]):
+        """
+        Cancel prefetches that will not be claimed, e.g. because the game ended.
+
+        Args:
+            prefetches: Prefetches started for this turn
+        """
+        for prefetch in prefetches:
+            prefetch.handle.cancel()
+
+
+_speculator: Optional[Speculator] = None
+
+
+def get_speculator() -> Speculator:
+    """
+    Get the process-wide speculator, so its counters and threads are shared by every session.
+
+    Returns:
+        Speculator: The shared speculator
+    """
+    global _speculator
+    if _speculator is None:
+        _speculator = Speculator()
+        logger.info(f"Created speculator (width {_speculator.width})")
+    return _speculator
@@ -2,14 +2,23 @@
 Tic Tac Toe agent implementation.
 """
 
-from textwrap import dedent
-from typing import Tuple
+from typing import Optional, Tuple, Union
 from agno.agent import Agent
 from agno.models.nvidia import Nvidia
 from agno.models.groq import Groq
+from agno.models.ollama import Ollama
+from src.agents.engine_player import EnginePlayer
+from src.agents.mock_model import MockModel
+from src.agents.prompts import build_system_prompt
 from src.config.settings import settings
+from src.game.board import TicTacToeBoard
+from src.game.mcts import MCTS
+from src.game.search import IterativeDeepeningSearch
 from src.utils.logger import logger
 
+# A player is either an LLM agent or a local engine with the same run() interface
+Player = Union[Agent, EnginePlayer]
+
 
 class TicTacToeAgentFactory:
     """Factory class for creating Tic Tac Toe agents."""
@@ -20,28 +29,82 @@ class TicTacToeAgentFactory:
         Creates and returns the appropriate model instance based on the provider.
 
         Args:
-            provider: The model provider ('nvidia' or 'groq')
-            model_name: The specific model name/ID
+            provider: The model provider ('nvidia', 'groq', 'ollama' or 'mock'); 'engine' players are built
+                by create_engine_player
+            model_name: The specific model name/ID; for 'mock', the policy spec (see src/agents/mock_model.py)
 
         Returns:
-            An instance of the appropriate model class (Nvidia or Groq)
+            An instance of the appropriate model class (Nvidia, Groq, Ollama or MockModel)
 
         Raises:
             ValueError: If the provider is not supported
         """
+        # The deterministic move cache only replays answers from temperature-0 models
+        temperature = 0.0 if settings.MOVE_CACHE_POLICY == "deterministic" else settings.LLM_TEMPERATURE
         if provider == "nvidia":
             logger.info(f"Creating NVIDIA model: {model_name}")
-            return Nvidia(id=model_name)
+            return Nvidia(id=model_name, temperature=temperature)
         elif provider == "groq":
             logger.info(f"Creating Groq model: {model_name}")
-            return Groq(id=model_name)
+            return Groq(id=model_name, temperature=temperature)
+        elif provider == "ollama":
+            logger.info(f"Creating Ollama model: {model_name}")
+            options = {"temperature": temperature} if temperature is not None else None
+            return Ollama(id=model_name, host=settings.OLLAMA_HOST, options=options)
+        elif provider == "mock":
+            logger.info(f"Creating mock model: {model_name}")
+            return MockModel(id=model_name, temperature=temperature)
+        else:
+            error_msg = (
+                f"Unsupported model provider: {provider}. Supported providers: 'nvidia', 'groq', 'ollama', 'mock'"
+            )
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+    @staticmethod
+    def create_engine_player(
+        player_name: str, engine_spec: str, board: Optional[TicTacToeBoard] = None
+    ) -> EnginePlayer:
+        """
+        Creates a local engine player.
+
+        Args:
+            player_name: Name of the player (e.g., "Player X")
+            engine_spec: Engine name with an optional time budget, e.g. "alphabeta", "alphabeta@250" or "mcts@1000"
+            board: Board of the game the engine will play on
+
+        Returns:
+            EnginePlayer: Player exposing the agent run() interface
+
+        Raises:
+            ValueError: If the engine is not supported
+        """
+        engine_name, _, budget = engine_spec.partition("@")
+        time_budget_ms = int(budget) if budget else None
+        if engine_name == "alphabeta":
+            engine = IterativeDeepeningSearch(time_budget_ms)
+        elif engine_name == "mcts":
+            engine = MCTS(time_budget_ms=time_budget_ms)
         else:
-            error_msg = f"Unsupported model provider: {provider}. Supported providers: 'nvidia', 'groq'"
+            error_msg = f"Unsupported engine: {engine_name}. Supported engines: 'alphabeta', 'mcts'"
             logger.error(error_msg)
             raise ValueError(error_msg)
 
+        logger.info(f"Created {player_name} engine player ({engine_spec})")
+        return EnginePlayer(player_name, engine, engine_spec, board)
+
     @classmethod
-    def create_player_agent(cls, player_name: str, player_symbol: str, model_str: str, debug_mode: bool = True) -> Agent:
+    def create_player_agent(
+        cls,
+        player_name: str,
+        player_symbol: str,
+        model_str: str,
+        debug_mode: bool = True,
+        board_size: Optional[int] = None,
+        win_length: Optional[int] = None,
+        board: Optional[TicTacToeBoard] = None,
+        prompt_format: Optional[str] = None,
+    ) -> Player:
         """
         Create a player agent for Tic Tac Toe.
 
@@ -50,40 +113,28 @@ class TicTacToeAgentFactory:
             player_symbol: Symbol used by the player ("X" or "O")
             model_str: Model string in format "provider:model_name"
             debug_mode: Enable debug logging
+            board_size: Width and height of the board (default: settings.BOARD_SIZE)
+            win_length: Marks in a row needed to win (default: settings.WIN_LENGTH)
+            board: Board of the game; required by local engine players
+            prompt_format: "verbose" or "compact" system prompt (default: settings.PROMPT_FORMAT)
 
         Returns:
-            Agent: Configured agent instance
+            Player: Configured agent instance, or an EnginePlayer for the "engine" provider
         """
         # Parse model provider and name
-        provider, model_name = model_str.split(":")
+        provider, model_name = model_str.split(":", 1)
+        if provider == "engine":
+            return cls.create_engine_player(player_name, model_name, board)
         model = cls.get_model_for_provider(provider, model_name)
 
+        size = board_size or settings.BOARD_SIZE
+        k = min(win_length or settings.WIN_LENGTH, size)
+
         agent = Agent(
             name=player_name,
-            description=dedent(f"""\
-            You are {player_name} in a Tic Tac Toe game. Your goal is to win by placing three {player_symbol}'s in a row (horizontally, vertically, or diagonally).
-
-            BOARD LAYOUT:
-            - The board is a 3x3 grid with coordinates from (0,0) to (2,2)
-            - Top-left is (0,0), bottom-right is (2,2)
-
-            RULES:
-            - You can only place {player_symbol} in empty spaces (shown as " " on the board)
-            - Players take turns placing their marks
-            - First to get 3 marks in a row (horizontal, vertical, or diagonal) wins
-            - If all spaces are filled with no winner, the game is a draw
-
-            YOUR RESPONSE:
-            - Provide ONLY two numbers separated by a space (row column)
-            - Example: "1 2" places your {player_symbol} in row 1, column 2
-            - Choose only from the valid moves list provided to you
-
-            STRATEGY TIPS:
-            - Study the board carefully and make strategic moves
-            - Block your opponent's potential winning moves
-            - Create opportunities for multiple winning paths
-            - Pay attention to the valid moves and avoid illegal moves
-            """),
+            description=build_system_prompt(
+                player_name, player_symbol, size, k, prompt_format or settings.PROMPT_FORMAT
+            ),
             model=model,
             debug_mode=debug_mode,
         )
@@ -97,7 +148,10 @@ class TicTacToeAgentFactory:
         model_x: str = None,
         model_o: str = None,
         debug_mode: bool = True,
-    ) -> Tuple[Agent, Agent]:
+        board_size: Optional[int] = None,
+        win_length: Optional[int] = None,
+        board: Optional[TicTacToeBoard] = None,
+    ) -> Tuple[Player, Player]:
         """
         Returns instances of the Tic Tac Toe Player Agents.
 
@@ -105,10 +159,16 @@ class TicTacToeAgentFactory:
             model_x: Model string for player X (format: "provider:model_name")
             model_o: Model string for player O (format: "provider:model_name")
             debug_mode: Enable logging and debug features
+            board_size: Width and height of the board the agents will play on
+            win_length: Marks in a row needed to win
+            board: Board of the game; supplies the dimensions and is bound to engine players
 
         Returns:
-            Tuple[Agent, Agent]: (player_x, player_o) agent instances
+            Tuple[Player, Player]: (player_x, player_o) agent instances
         """
+        if board is not None:
+            board_size, win_length = board.size, board.win_length
+
         # Use default models if not provided
         if model_x is None:
             model_x = settings.MODEL_OPTIONS[settings.DEFAULT_PLAYER_X_MODEL]
@@ -117,7 +177,7 @@ class TicTacToeAgentFactory:
 
         logger.info(f"Creating Tic Tac Toe players - X: {model_x}, O: {model_o}")
 
-        player_x = cls.create_player_agent("Player X", "X", model_x, debug_mode)
-        player_o = cls.create_player_agent("Player O", "O", model_o, debug_mode)
+        player_x = cls.create_player_agent("Player X", "X", model_x, debug_mode, board_size, win_length, board)
+        player_o = cls.create_player_agent("Player O", "O", model_o, debug_mode, board_size, win_length, board)
 
         return player_x, player_o
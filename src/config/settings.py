@@ -3,7 +3,8 @@ Configuration settings for the Tic Tac Toe game application.
 """
 
 import os
-from typing import Dict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -34,6 +35,16 @@ class Settings:
         "groq-llama-3.1-8b": "groq:llama-3.1-8b-instant",
         "groq-mixtral-8x7b": "groq:mixtral-8x7b-32768",
         "groq-gemma2-9b": "groq:gemma2-9b-it",
+        # Local engines (no API key)
+        "engine-alphabeta": "engine:alphabeta",
+        "engine-mcts": "engine:mcts",
+        # Local Ollama server (no API key)
+        "ollama-llama3.2": "ollama:llama3.2",
+        "ollama-qwen2.5-7b": "ollama:qwen2.5:7b",
+        # Offline mock models for load testing (no API key, no network)
+        "mock-random": "mock:random",
+        "mock-heuristic": "mock:heuristic",
+        "mock-solver": "mock:solver",
     }
 
     # API key requirements mapping
@@ -72,6 +83,16 @@ class Settings:
         "groq-llama-3.1-8b": {"provider": "GROQ", "size": "8B", "speed": "⚡⚡⚡⚡ Lightning", "badge": "🟣"},
         "groq-mixtral-8x7b": {"provider": "GROQ", "size": "8x7B", "speed": "⚡⚡⚡ Ultra Fast", "badge": "🟣"},
         "groq-gemma2-9b": {"provider": "GROQ", "size": "9B", "speed": "⚡⚡⚡ Ultra Fast", "badge": "🟣"},
+        # Local engines
+        "engine-alphabeta": {"provider": "LOCAL ENGINE", "size": "Alpha-Beta", "speed": "⏱️ Time-boxed", "badge": "⚙️"},
+        "engine-mcts": {"provider": "LOCAL ENGINE", "size": "MCTS", "speed": "⏱️ Time-boxed", "badge": "🎲"},
+        # Ollama models
+        "ollama-llama3.2": {"provider": "OLLAMA", "size": "3B", "speed": "🖥️ Local", "badge": "🦙"},
+        "ollama-qwen2.5-7b": {"provider": "OLLAMA", "size": "7B", "speed": "🖥️ Local", "badge": "🦙"},
+        # Mock models
+        "mock-random": {"provider": "MOCK", "size": "Random", "speed": "🧪 Simulated", "badge": "🧪"},
+        "mock-heuristic": {"provider": "MOCK", "size": "Heuristic", "speed": "🧪 Simulated", "badge": "🧪"},
+        "mock-solver": {"provider": "MOCK", "size": "Solver", "speed": "🧪 Simulated", "badge": "🧪"},
     }
 
     # Default model selections
@@ -85,10 +106,159 @@ class Settings:
 
     # Game constants
     BOARD_SIZE: int = 3
+    WIN_LENGTH: int = 3
     EMPTY_CELL: str = " "
     PLAYER_X: str = "X"
     PLAYER_O: str = "O"
 
+    # Board variants: display name -> (board size, marks in a row to win)
+    BOARD_VARIANTS: Dict[str, Tuple[int, int]] = {
+        "Classic 3×3": (3, 3),
+        "4×4 (4 in a row)": (4, 4),
+        "5×5 (4 in a row)": (5, 4),
+        "Gomoku 15×15 (5 in a row)": (15, 5),
+    }
+    DEFAULT_BOARD_VARIANT: str = "Classic 3×3"
+
+    # Local engine players
+    ENGINE_TIME_BUDGET_MS: int = int(os.getenv("ENGINE_TIME_BUDGET_MS", "500"))
+    # Transposition table entries kept by a search engine; pooled engines reuse theirs across games
+    ENGINE_TT_MAX_ENTRIES: int = int(os.getenv("ENGINE_TT_MAX_ENTRIES", "1000000"))
+    MCTS_ROLLOUTS: int = int(os.getenv("MCTS_ROLLOUTS", "200000"))
+    MCTS_BATCH_SIZE: int = int(os.getenv("MCTS_BATCH_SIZE", "64"))
+    MCTS_ROLLOUTS_PER_LEAF: int = int(os.getenv("MCTS_ROLLOUTS_PER_LEAF", "16"))
+
+    # Precomputed 3x3 perfect-play table (build with: python -m src.game.outcome_table)
+    OUTCOME_TABLE_PATH: str = os.getenv(
+        "OUTCOME_TABLE_PATH",
+        str(Path(__file__).resolve().parent.parent / "game" / "data" / "outcome_table_3x3.bin"),
+    )
+
+    # Async match engine: move requests in flight per provider
+    PROVIDER_CONCURRENCY: Dict[str, int] = {
+        "nvidia": int(os.getenv("NVIDIA_CONCURRENCY", "32")),
+        "groq": int(os.getenv("GROQ_CONCURRENCY", "32")),
+        "engine": int(os.getenv("ENGINE_CONCURRENCY", str(os.cpu_count() or 4))),
+        "ollama": int(os.getenv("OLLAMA_CONCURRENCY", "4")),
+        "mock": int(os.getenv("MOCK_CONCURRENCY", "256")),
+    }
+    DEFAULT_PROVIDER_CONCURRENCY: int = int(os.getenv("DEFAULT_PROVIDER_CONCURRENCY", "8"))
+
+    # Requests per LLM move before a local policy ("random", "heuristic" or "solver") moves instead
+    MOVE_MAX_ATTEMPTS: int = int(os.getenv("MOVE_MAX_ATTEMPTS", "3"))
+    MOVE_FALLBACK_POLICY: str = os.getenv("MOVE_FALLBACK_POLICY", "heuristic")
+    # Time budget of the "solver" fallback on boards without an exact table
+    MOVE_FALLBACK_SEARCH_MS: int = int(os.getenv("MOVE_FALLBACK_SEARCH_MS", "200"))
+
+    # Idle players kept per (model, symbol, board variant) for reuse across games
+    AGENT_POOL_MAX_IDLE: int = int(os.getenv("AGENT_POOL_MAX_IDLE", "4"))
+
+    # Rate limits per minute (rpm requests, tpm tokens; 0 disables a bucket).
+    # Provider entries are account-wide; Groq also limits each model separately.
+    RATE_LIMITS: Dict[str, Dict[str, int]] = {
+        "nvidia": {"rpm": int(os.getenv("NVIDIA_RPM", "40")), "tpm": int(os.getenv("NVIDIA_TPM", "0"))},
+        "groq": {"rpm": int(os.getenv("GROQ_RPM", "0")), "tpm": int(os.getenv("GROQ_TPM", "0"))},
+    }
+    MODEL_RATE_LIMITS: Dict[str, Dict[str, int]] = {
+        "groq:llama-3.3-70b-versatile": {"rpm": 30, "tpm": 12000},
+        "groq:llama-3.1-70b-versatile": {"rpm": 30, "tpm": 6000},
+        "groq:llama-3.1-8b-instant": {"rpm": 30, "tpm": 6000},
+        "groq:mixtral-8x7b-32768": {"rpm": 30, "tpm": 5000},
+        "groq:gemma2-9b-it": {"rpm": 30, "tpm": 15000},
+    }
+    RATE_LIMIT_MAX_RETRIES: int = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "5"))
+    RATE_LIMIT_BACKOFF_BASE: float = float(os.getenv("RATE_LIMIT_BACKOFF_BASE", "1.0"))
+    RATE_LIMIT_BACKOFF_CAP: float = float(os.getenv("RATE_LIMIT_BACKOFF_CAP", "60.0"))
+
+    # LLM sampling temperature (unset: provider default)
+    LLM_TEMPERATURE: Optional[float] = float(os.environ["LLM_TEMPERATURE"]) if os.getenv("LLM_TEMPERATURE") else None
+
+    # Prompt format sent to LLM players: "verbose" or "compact" (short board string and cell indices)
+    PROMPT_FORMAT: str = os.getenv("PROMPT_FORMAT", "verbose")
+
+    # Stream LLM replies and cancel them as soon as a legal move has arrived
+    STREAM_MOVES: bool = os.getenv("STREAM_MOVES", "false").lower() in ("1", "true", "yes")
+
+    # Request the opponent's reply for the likeliest moves while the current player is thinking
+    SPECULATIVE_PREFETCH: bool = os.getenv("SPECULATIVE_PREFETCH", "false").lower() in ("1", "true", "yes")
+    # Predicted moves prefetched per turn; each costs one extra request when it is not played
+    SPECULATION_WIDTH: int = int(os.getenv("SPECULATION_WIDTH", "2"))
+
+    # Send a duplicate of a move request that runs past the model's recent tail latency
+    HEDGE_REQUESTS: bool = os.getenv("HEDGE_REQUESTS", "false").lower() in ("1", "true", "yes")
+    HEDGE_PERCENTILE: float = float(os.getenv("HEDGE_PERCENTILE", "90"))
+    HEDGE_WINDOW: int = int(os.getenv("HEDGE_WINDOW", "100"))
+    HEDGE_MIN_SAMPLES: int = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+    # Maximum share of a model's requests that are duplicated
+    HEDGE_BUDGET: float = float(os.getenv("HEDGE_BUDGET", "0.1"))
+    # Duplicate to the "same" model, or to its "equivalent" on the other provider when its key is set
+    HEDGE_TARGET: str = os.getenv("HEDGE_TARGET", "equivalent")
+    HEDGE_EQUIVALENTS: Dict[str, str] = {
+        "nvidia:meta/llama-3.3-70b-instruct": "groq:llama-3.3-70b-versatile",
+        "groq:llama-3.3-70b-versatile": "nvidia:meta/llama-3.3-70b-instruct",
+        "nvidia:meta/llama-3.1-8b-instruct": "groq:llama-3.1-8b-instant",
+        "groq:llama-3.1-8b-instant": "nvidia:meta/llama-3.1-8b-instruct",
+    }
+    # Threads for hedged requests in the Streamlit app (the match engine hedges on its event loop)
+    HEDGE_MAX_WORKERS: int = int(os.getenv("HEDGE_MAX_WORKERS", "32"))
+
+    # Persistent LLM move cache: "off", "deterministic" (temperature-0 models only) or "sample"
+    MOVE_CACHE_POLICY: str = os.getenv("MOVE_CACHE_POLICY", "off")
+    MOVE_CACHE_PATH: str = os.getenv(
+        "MOVE_CACHE_PATH",
+        str(Path(__file__).resolve().parent.parent.parent / ".cache" / "move_cache.sqlite3"),
+    )
+    MOVE_CACHE_MAX_ENTRIES: int = int(os.getenv("MOVE_CACHE_MAX_ENTRIES", "50000"))
+    MOVE_CACHE_TTL_SECONDS: float = float(os.getenv("MOVE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    MOVE_CACHE_MIN_SAMPLES: int = int(os.getenv("MOVE_CACHE_MIN_SAMPLES", "5"))
+
+    # Providers that run without an API key
+    KEYLESS_PROVIDERS: Tuple[str, ...] = ("engine", "ollama", "mock")
+
+    # Ollama server (unset: the client default, http://localhost:11434)
+    OLLAMA_HOST: Optional[str] = os.getenv("OLLAMA_HOST") or None
+
+    # Mock provider: latency per request ("fixed", "uniform" within +/- jitter, or
+    # "lognormal" with the mean as median), and shares of failed and illegal replies
+    MOCK_LATENCY_MS: float = float(os.getenv("MOCK_LATENCY_MS", "200"))
+    MOCK_LATENCY_JITTER_MS: float = float(os.getenv("MOCK_LATENCY_JITTER_MS", "100"))
+    MOCK_LATENCY_DISTRIBUTION: str = os.getenv("MOCK_LATENCY_DISTRIBUTION", "lognormal")
+    MOCK_ERROR_RATE: float = float(os.getenv("MOCK_ERROR_RATE", "0"))
+    MOCK_INVALID_RATE: float = float(os.getenv("MOCK_INVALID_RATE", "0"))
+    MOCK_SEED: Optional[int] = int(os.environ["MOCK_SEED"]) if os.getenv("MOCK_SEED") else None
+
+    # Append-only SQLite store of every finished game and its moves, written in batches
+    RESULT_STORE_PATH: str = os.getenv(
+        "RESULT_STORE_PATH",
+        str(Path(__file__).resolve().parent.parent.parent / ".cache" / "results.sqlite3"),
+    )
+    RESULT_STORE_BATCH_SIZE: int = int(os.getenv("RESULT_STORE_BATCH_SIZE", "500"))
+    RESULT_STORE_FLUSH_MS: float = float(os.getenv("RESULT_STORE_FLUSH_MS", "200"))
+
+    # Compact binary archive the app appends every finished game to (src/game/game_record.py)
+    GAME_ARCHIVE_PATH: str = os.getenv(
+        "GAME_ARCHIVE_PATH",
+        str(Path(__file__).resolve().parent.parent.parent / ".cache" / "games.ttr"),
+    )
+
+    # Glicko model ratings: starting rating and rating deviation (RD), how much the RD grows
+    # back per rating period without games, and the length of a rating period
+    RATING_INITIAL: float = float(os.getenv("RATING_INITIAL", "1500"))
+    RATING_DEVIATION: float = float(os.getenv("RATING_DEVIATION", "350"))
+    RATING_DEVIATION_GROWTH: float = float(os.getenv("RATING_DEVIATION_GROWTH", "35"))
+    RATING_PERIOD_HOURS: float = float(os.getenv("RATING_PERIOD_HOURS", "24"))
+
+    # Round-robin tournaments (python -m src.tournament): games per ordered pairing, worker
+    # processes (provider caps and rate limits are split between them), games per shard,
+    # and the append-only file completed games are checkpointed to
+    TOURNAMENT_GAMES_PER_PAIRING: int = int(os.getenv("TOURNAMENT_GAMES_PER_PAIRING", "10"))
+    TOURNAMENT_WORKERS: int = int(os.getenv("TOURNAMENT_WORKERS", str(min(4, os.cpu_count() or 1))))
+    TOURNAMENT_CHUNK_SIZE: int = int(os.getenv("TOURNAMENT_CHUNK_SIZE", "50"))
+    TOURNAMENT_CHECKPOINT_PATH: str = os.getenv(
+        "TOURNAMENT_CHECKPOINT_PATH",
+        str(Path(__file__).resolve().parent.parent.parent / ".cache" / "tournament.jsonl"),
+    )
+
     # Debug mode
     DEBUG_MODE: bool = True
 
@@ -113,14 +283,18 @@ class Settings:
         """
         Get list of missing API keys for given models.
 
+        Models of keyless providers (local engines, Ollama and mock models) never need a key.
+
         Args:
-            models: List of model keys to check
+            models: List of model keys (or "provider:model_name" strings) to check
 
         Returns:
             list: List of missing API key messages
         """
         missing_keys = []
         for model in models:
+            if cls.MODEL_OPTIONS.get(model, model).split(":")[0] in cls.KEYLESS_PROVIDERS:
+                continue
             required_key = cls.REQUIRED_KEYS_INFO.get(model)
             if required_key and not os.getenv(required_key):
                 missing_keys.append(f"**{model}** requires `{required_key}`")
@@ -1,5 +1,6 @@
 """Game logic module for Tic Tac Toe."""
 
 from src.game.board import TicTacToeBoard
+from src.game.solver import Solver, get_solver
 
-__all__ = ["TicTacToeBoard"]
+__all__ = ["TicTacToeBoard", "Solver", "get_solver"]
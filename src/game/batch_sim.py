@@ -0,0 +1,283 @@
+"""
+Vectorized simulator that plays thousands of games at once.
+
+All B boards live in one ``(B, cells)`` int8 array (1 = X, -1 = O, 0 = empty)
+and advance together one ply per step. Legal-move masking, policy choice,
+win detection (a matmul against the precomputed window matrix) and terminal
+filtering are array operations, so the cost per ply is independent of B in
+Python overhead. Game rules are identical to TicTacToeBoard; use
+``verify_against_board`` to replay a sample through the scalar engine.
+
+Usage:
+    python -m src.game.batch_sim --games 1000000 --x random --o heuristic
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+from src.game.board import BoardGeometry, TicTacToeBoard, get_geometry
+from src.utils.logger import logger
+
+X, O, EMPTY = 1, -1, 0
+POLICIES = ("random", "heuristic")
+
+
+@dataclass
+class BatchResult:
+    """Outcome of a batch of simulated games."""
+
+    winners: np.ndarray  # (B,) int8: 1 X won, -1 O won, 0 draw
+    lengths: np.ndarray  # (B,) int16: plies played
+    moves: np.ndarray  # (B, cells) int16: cell index per ply, -1 after the game ended
+    elapsed: float
+
+    @property
+    def games(self) -> int:
+        """Number of games in the batch."""
+        return len(self.winners)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Aggregate win/draw rates and throughput.
+
+        Returns:
+            Dict[str, float]: Rates, average length and games per minute
+        """
+        games = max(self.games, 1)
+        return {
+            "games": self.games,
+            "x_win_rate": float(np.count_nonzero(self.winners == X)) / games,
+            "o_win_rate": float(np.count_nonzero(self.winners == O)) / games,
+            "draw_rate": float(np.count_nonzero(self.winners == EMPTY)) / games,
+            "avg_length": float(self.lengths.mean()) if self.games else 0.0,
+            "games_per_minute": self.games / self.elapsed * 60 if self.elapsed else 0.0,
+        }
+
+    def first_move_stats(self) -> Dict[int, Dict[str, float]]:
+        """
+        X/O/draw rates grouped by X's opening cell.
+
+        Returns:
+            Dict[int, Dict[str, float]]: Opening cell index -> rates and game count
+        """
+        stats = {}
+        openings = self.moves[:, 0]
+        for cell in np.unique(openings[openings >= 0]):
+            winners = self.winners[openings == cell]
+            stats[int(cell)] = {
+                "games": len(winners),
+                "x_win_rate": float(np.mean(winners == X)),
+                "o_win_rate": float(np.mean(winners == O)),
+                "draw_rate": float(np.mean(winners == EMPTY)),
+            }
+        return stats
+
+
+class BatchSimulator:
+    """Plays many games of one board variant in lockstep."""
+
+    def __init__(self, size: Optional[int] = None, win_length: Optional[int] = None, seed: Optional[int] = None):
+        """
+        Initialize the simulator.
+
+        Args:
+            size: Width and height of the board (default: settings.BOARD_SIZE)
+            win_length: Marks in a row needed to win (default: settings.WIN_LENGTH)
+            seed: Seed for the random policies
+        """
+        size = size or settings.BOARD_SIZE
+        self.geometry: BoardGeometry = get_geometry(size, min(win_length or settings.WIN_LENGTH, size))
+        self.rng = np.random.default_rng(seed)
+
+        cell_count = self.geometry.cell_count
+        # (cells, windows) incidence matrix: counts = stones @ windows
+        self.windows = np.array(
+            [[mask >> index & 1 for mask in self.geometry.win_masks] for index in range(cell_count)],
+            dtype=np.float32,
+        )
+        # Heuristic tie-break: cells on more lines first (center, then corners)
+        self.centrality = self.windows.sum(axis=1) / (self.windows.sum(axis=1).max() + 1)
+
+    def _choose(self, cells: np.ndarray, player: int, policy: str) -> np.ndarray:
+        """
+        Pick one legal cell per board.
+
+        Args:
+            cells: (n, cells) int8 boards that are still in play
+            player: X or O, the side to move
+            policy: "random" or "heuristic"
+
+        Returns:
+            np.ndarray: (n,) chosen cell indices
+        """
+        legal = cells == EMPTY
+        score = self.rng.random(cells.shape, dtype=np.float32)
+        if policy == "heuristic":
+            k = self.geometry.win_length
+            own = (cells == player).astype(np.float32) @ self.windows
+            opp = (cells == -player).astype(np.float32) @ self.windows
+            empty = legal.astype(np.float32) @ self.windows
+            # Windows one stone short with the last cell empty, projected back onto their cells
+            wins = ((own == k - 1) & (empty == 1)).astype(np.float32) @ self.windows.T
+            blocks = ((opp == k - 1) & (empty == 1)).astype(np.float32) @ self.windows.T
+            score = score * 0.5 + self.centrality + (blocks > 0) * 10.0 + (wins > 0) * 100.0
+        elif policy != "random":
+            raise ValueError(f"Unknown policy: {policy}. Supported policies: {', '.join(POLICIES)}")
+        score[~legal] = -1.0
+        return score.argmax(axis=1)
+
+    def _play(
+        self,
+        cells: np.ndarray,
+        player: int,
+        x_policy: str,
+        o_policy: str,
+        moves: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Advance every board in place until it is won or full.
+
+        Args:
+            cells: (B, cells) int8 boards, modified in place; none may already be won
+            player: Side to move on every board (X or O)
+            x_policy: Policy for X
+            o_policy: Policy for O
+            moves: Optional (B, cells) array that receives the chosen cell per ply
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (winners, plies played from the start position)
+        """
+        games, cell_count = cells.shape
+        k = self.geometry.win_length
+        winners = np.zeros(games, dtype=np.int8)
+        lengths = np.zeros(games, dtype=np.int16)
+        active = np.flatnonzero((cells == EMPTY).any(axis=1))
+
+        for ply in range(cell_count):
+            if not len(active):
+                break
+            board = cells[active]
+            choice = self._choose(board, player, x_policy if player == X else o_policy)
+            board[np.arange(len(active)), choice] = player
+            cells[active] = board
+            if moves is not None:
+                moves[active, ply] = choice
+            lengths[active] = ply + 1
+
+            # Only the side that just moved can have completed a window
+            won = ((board == player).astype(np.float32) @ self.windows == k).any(axis=1)
+            winners[active[won]] = player
+            active = active[~won]
+            active = active[(cells[active] == EMPTY).any(axis=1)]
+            player = -player
+
+        return winners, lengths
+
+    def run(self, games: int, x_policy: str = "random", o_policy: str = "random") -> BatchResult:
+        """
+        Play ``games`` games to completion.
+
+        Args:
+            games: Number of boards to simulate
+            x_policy: Policy for X ("random" or "heuristic")
+            o_policy: Policy for O ("random" or "heuristic")
+
+        Returns:
+            BatchResult: Winners, lengths and move sequences
+        """
+        start = time.perf_counter()
+        cell_count = self.geometry.cell_count
+        cells = np.zeros((games, cell_count), dtype=np.int8)
+        moves = np.full((games, cell_count), -1, dtype=np.int16)
+        winners, lengths = self._play(cells, X, x_policy, o_policy, moves)
+
+        result = BatchResult(winners, lengths, moves, time.perf_counter() - start)
+        logger.debug(f"Simulated {games} games in {result.elapsed:.3f}s")
+        return result
+
+    def rollout(self, start: np.ndarray, player: int, policy: str = "random") -> np.ndarray:
+        """
+        Finish copies of unfinished positions with the same policy for both sides.
+
+        Args:
+            start: (B, cells) int8 positions with no winner yet; copied, not modified
+            player: Side to move on every position (X or O)
+            policy: Policy for both sides
+
+        Returns:
+            np.ndarray: (B,) winners (1 X, -1 O, 0 draw)
+        """
+        winners, _ = self._play(start.copy(), player, policy, policy)
+        return winners
+
+    @staticmethod
+    def to_cells(x_bits: int, o_bits: int, cell_count: int) -> np.ndarray:
+        """
+        Convert a pair of bitboards to a simulator row.
+
+        Args:
+            x_bits: Bitboard of X marks
+            o_bits: Bitboard of O marks
+            cell_count: Number of cells on the board
+
+        Returns:
+            np.ndarray: (cells,) int8 array with 1 for X, -1 for O
+        """
+        return np.array([(x_bits >> i & 1) - (o_bits >> i & 1) for i in range(cell_count)], dtype=np.int8)
+
+    def verify_against_board(self, result: BatchResult, limit: int = 1000) -> int:
+        """
+        Replay games through TicTacToeBoard and count disagreements.
+
+        Args:
+            result: Batch to check
+            limit: Maximum number of games to replay
+
+        Returns:
+            int: Number of games whose winner or length differs from the scalar engine
+        """
+        mismatches = 0
+        symbols = {X: settings.PLAYER_X, O: settings.PLAYER_O, EMPTY: None}
+        for game in range(min(limit, result.games)):
+            board = TicTacToeBoard(self.geometry.size, self.geometry.win_length)
+            game_over = False
+            for index in result.moves[game, :result.lengths[game]]:
+                # Stop where the scalar engine ends the game, so moves played past a win show up in the length
+                if game_over:
+                    break
+                board.push(int(index))
+                game_over, _ = board.get_game_state()
+            if (
+                not game_over
+                or board.winner != symbols[int(result.winners[game])]
+                or len(board.move_stack) != result.lengths[game]
+            ):
+                mismatches += 1
+        if mismatches:
+            logger.warning(f"{mismatches} simulated games disagree with TicTacToeBoard")
+        return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate baseline games with vectorized policies.")
+    parser.add_argument("--games", type=int, default=100_000, help="number of games")
+    parser.add_argument("--size", type=int, default=settings.BOARD_SIZE, help="board size")
+    parser.add_argument("--win-length", type=int, default=settings.WIN_LENGTH, help="marks in a row to win")
+    parser.add_argument("--x", choices=POLICIES, default="random", help="policy for X")
+    parser.add_argument("--o", choices=POLICIES, default="random", help="policy for O")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    args = parser.parse_args()
+
+    simulator = BatchSimulator(args.size, args.win_length, args.seed)
+    batch = simulator.run(args.games, args.x, args.o)
+    for name, value in batch.summary().items():
+        print(f"{name:>18}: {value:,.4f}" if isinstance(value, float) else f"{name:>18}: {value:,}")
+    print("Opening cell -> X / O / draw rates")
+    for cell, stats in sorted(batch.first_move_stats().items()):
+        row, col = simulator.geometry.coords[cell]
+        print(f"  ({row}, {col}): {stats['x_win_rate']:.3f} / {stats['o_win_rate']:.3f} / {stats['draw_rate']:.3f}")
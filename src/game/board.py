@@ -1,55 +1,515 @@
 """
 Tic Tac Toe game board implementation.
+
+The board is stored as two bitboards, one integer per player, where bit
+``row * size + col`` is set when that player occupies the cell. Any square
+board size and win length (k-in-a-row) is supported.
+
+Every mutation bumps ``TicTacToeBoard.version``. Derived state that the UI
+asks for several times per rerun (game state, valid moves, rendered board)
+is computed once per version and served from a cache until the next move.
+Nothing is derived eagerly: a move only updates the bitboards, the winner
+and the plain Zobrist hash, and the rendered board and the symmetric hash
+are computed when a prompt, the UI or a cache first asks for them.
 """
 
-from typing import List, Optional, Tuple
+import random
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 from src.config.settings import settings
 from src.utils.logger import logger
 
+# Sentinel for absent cache entries (cached values may legitimately be None)
+_MISSING = object()
+
+# Row/column steps of the four line directions: horizontal, vertical, both diagonals
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def cells_of(x_bits: int, o_bits: int, cell_count: int) -> List[str]:
+    """
+    Flat, row-major list of cell values for a pair of bitboards.
+
+    Args:
+        x_bits: Bitboard of X marks
+        o_bits: Bitboard of O marks
+        cell_count: Number of cells on the board
+
+    Returns:
+        List[str]: One symbol per cell (X, O or empty)
+    """
+    symbols = (settings.EMPTY_CELL, settings.PLAYER_X, settings.PLAYER_O)
+    return [symbols[(x_bits >> index & 1) | (o_bits >> index & 1) << 1] for index in range(cell_count)]
+
+
+def popcount(bits: int) -> int:
+    """
+    Count the set bits of a bitboard.
+
+    Args:
+        bits: Bitboard to count
+
+    Returns:
+        int: Number of occupied cells in the bitboard
+    """
+    return bin(bits).count("1")
+
+
+class BoardGeometry:
+    """Precomputed masks and lookup tables for one (size, win_length) variant."""
+
+    def __init__(self, size: int, win_length: int):
+        """
+        Build the lookup tables.
+
+        Args:
+            size: Width and height of the board
+            win_length: Number of marks in a row needed to win
+        """
+        self.size = size
+        self.win_length = win_length
+        self.cell_count = size * size
+        self.full_mask = (1 << self.cell_count) - 1
+        self.coords = tuple(divmod(index, size) for index in range(self.cell_count))
+        self.win_masks = self._build_win_masks()
+        self.cell_win_masks = tuple(
+            tuple(mask for mask in self.win_masks if mask >> index & 1) for index in range(self.cell_count)
+        )
+        self.symmetries = self._build_symmetries()
+        self.zobrist_keys = self._build_zobrist_keys()
+        self._transform_tables: Optional[Tuple[Tuple[Tuple[int, ...], ...], ...]] = None
+
+        separator = "-" * (4 * size + 1)
+        self.template = f"\n{separator}\n" + "".join(
+            f"| {' | '.join(['{}'] * size)} |\n{separator}\n" for _ in range(size)
+        )
+
+    def _build_win_masks(self) -> Tuple[int, ...]:
+        """
+        Build the bit mask of every k-in-a-row window on the board.
+
+        Returns:
+            Tuple[int, ...]: One mask per winning window
+        """
+        size, k = self.size, self.win_length
+        masks = []
+        for row in range(size):
+            for col in range(size):
+                for d_row, d_col in DIRECTIONS:
+                    end_row, end_col = row + d_row * (k - 1), col + d_col * (k - 1)
+                    if 0 <= end_row < size and 0 <= end_col < size:
+                        masks.append(sum(1 << ((row + d_row * i) * size + col + d_col * i) for i in range(k)))
+        return tuple(masks)
+
+    def _build_symmetries(self) -> Tuple[Tuple[int, ...], ...]:
+        """
+        Build the 8 symmetries of the square (rotations and reflections).
+
+        Returns:
+            Tuple[Tuple[int, ...], ...]: Per symmetry, the image index of every cell
+        """
+        last = self.size - 1
+        maps = (
+            lambda r, c: (r, c),
+            lambda r, c: (c, last - r),
+            lambda r, c: (last - r, last - c),
+            lambda r, c: (last - c, r),
+            lambda r, c: (r, last - c),
+            lambda r, c: (last - r, c),
+            lambda r, c: (c, r),
+            lambda r, c: (last - c, last - r),
+        )
+        symmetries = []
+        for mapping in maps:
+            images = (mapping(row, col) for row, col in self.coords)
+            symmetries.append(tuple(row * self.size + col for row, col in images))
+        return tuple(symmetries)
+
+    def _build_zobrist_keys(self) -> Tuple[Tuple[Tuple[int, ...], ...], ...]:
+        """
+        Build 64-bit Zobrist keys, seeded per board size so hashes are stable across processes.
+
+        Returns:
+            Tuple[Tuple[Tuple[int, ...], ...], ...]: ``keys[player][cell][symmetry]``, the key of
+            a stone on ``cell`` as seen through each symmetry (player 0 is X, 1 is O)
+        """
+        rng = random.Random(f"zobrist-{self.size}")
+        base = [[rng.getrandbits(64) for _ in range(self.cell_count)] for _ in range(2)]
+        return tuple(
+            tuple(tuple(base[player][perm[index]] for perm in self.symmetries) for index in range(self.cell_count))
+            for player in range(2)
+        )
+
+    def transform(self, bits: int, symmetry: int) -> int:
+        """
+        Apply one of the 8 board symmetries to a bitboard.
+
+        Uses per-byte lookup tables, so the cost is one lookup per 8 cells.
+
+        Args:
+            bits: Bitboard to transform
+            symmetry: Index into ``symmetries``
+
+        Returns:
+            int: Transformed bitboard
+        """
+        if self._transform_tables is None:
+            self._transform_tables = tuple(
+                tuple(
+                    tuple(
+                        sum(1 << perm[shift + i] for i in range(8) if byte >> i & 1 and shift + i < self.cell_count)
+                        for byte in range(256)
+                    )
+                    for shift in range(0, self.cell_count, 8)
+                )
+                for perm in self.symmetries
+            )
+        result = 0
+        for table in self._transform_tables[symmetry]:
+            if not bits:
+                break
+            result |= table[bits & 0xFF]
+            bits >>= 8
+        return result
+
+    def canonical(self, own: int, opp: int) -> Tuple[int, int]:
+        """
+        Find the canonical form of a position under the board symmetries.
+
+        Args:
+            own: Bitboard of the player to move
+            opp: Bitboard of the other player
+
+        Returns:
+            Tuple[int, int]: (canonical key, index of the symmetry that produces it)
+        """
+        shift = self.cell_count
+        best_key, best_symmetry = -1, 0
+        for symmetry in range(len(self.symmetries)):
+            key = self.transform(own, symmetry) << shift | self.transform(opp, symmetry)
+            if best_key < 0 or key < best_key:
+                best_key, best_symmetry = key, symmetry
+        return best_key, best_symmetry
+
+
+@lru_cache(maxsize=None)
+def get_geometry(size: int, win_length: int) -> BoardGeometry:
+    """
+    Get the shared lookup tables for a board variant.
+
+    Args:
+        size: Width and height of the board
+        win_length: Number of marks in a row needed to win
+
+    Returns:
+        BoardGeometry: Cached geometry instance
+    """
+    return BoardGeometry(size, win_length)
+
+
+class Position(NamedTuple):
+    """Immutable snapshot of the board after some ply."""
+
+    x_bits: int
+    o_bits: int
+    size: int
+
+    def cells(self) -> List[str]:
+        """
+        Flat, row-major list of cell values.
+
+        Returns:
+            List[str]: One symbol per cell (X, O or empty)
+        """
+        return cells_of(self.x_bits, self.o_bits, self.size * self.size)
+
+    def get_cell(self, row: int, col: int) -> str:
+        """
+        Get the symbol occupying a cell.
+
+        Args:
+            row: Row index
+            col: Column index
+
+        Returns:
+            str: PLAYER_X, PLAYER_O or EMPTY_CELL
+        """
+        index = row * self.size + col
+        if self.x_bits >> index & 1:
+            return settings.PLAYER_X
+        if self.o_bits >> index & 1:
+            return settings.PLAYER_O
+        return settings.EMPTY_CELL
+
 
 class TicTacToeBoard:
     """Represents a Tic Tac Toe game board."""
 
-    def __init__(self):
-        """Initialize an empty 3x3 board."""
-        self.board = [[settings.EMPTY_CELL for _ in range(settings.BOARD_SIZE)] for _ in range(settings.BOARD_SIZE)]
+    def __init__(self, size: Optional[int] = None, win_length: Optional[int] = None):
+        """
+        Initialize an empty board.
+
+        Args:
+            size: Width and height of the board (default: settings.BOARD_SIZE)
+            win_length: Marks in a row needed to win (default: settings.WIN_LENGTH, capped at size)
+        """
+        self.size = size or settings.BOARD_SIZE
+        self.win_length = min(win_length or settings.WIN_LENGTH, self.size)
+        self.geometry = get_geometry(self.size, self.win_length)
+        self.x_bits = 0
+        self.o_bits = 0
+        self.winner: Optional[str] = None
         self.current_player = settings.PLAYER_X
-        logger.info("Initialized new Tic Tac Toe board")
+        self.move_stack: List[int] = []
+        # Bitboards after every ply; ints are immutable, so each entry costs O(1) to record
+        self._positions: List[Tuple[int, int]] = [(0, 0)]
+        self._winner_ply = 0
+        # Plain Zobrist hash, updated per move; the symmetric one is derived on demand
+        self._hash = 0
+        # Mutation counter; derived state is cached per version
+        self.version = 0
+        self._cache: Dict[str, Any] = {}
+        self._cache_version = 0
+        logger.info(f"Initialized new {self.size}x{self.size} Tic Tac Toe board ({self.win_length} in a row)")
+
+    @property
+    def board(self) -> List[List[str]]:
+        """
+        Grid view of the bitboards, built on demand for rendering.
+
+        Returns:
+            List[List[str]]: Rows of cell values (X, O or empty)
+        """
+        size = self.size
+        cells = self.cells()
+        return [cells[start:start + size] for start in range(0, self.geometry.cell_count, size)]
+
+    def cells(self) -> List[str]:
+        """
+        Flat, row-major list of cell values.
+
+        The list is cached until the next move and must not be modified.
+
+        Returns:
+            List[str]: One symbol per cell (X, O or empty)
+        """
+        return self._cached("cells", self._compute_cells)
+
+    def _compute_cells(self) -> List[str]:
+        """Decode the bitboards of the current position."""
+        return cells_of(self.x_bits, self.o_bits, self.geometry.cell_count)
+
+    def _cached(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Serve a derived value computed at most once per board version.
+
+        Args:
+            key: Name of the derived value
+            compute: Function producing the value for the current position
+
+        Returns:
+            Any: The cached or freshly computed value
+        """
+        if self._cache_version != self.version:
+            self._cache = {}
+            self._cache_version = self.version
+        value = self._cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._cache[key] = compute()
+        return value
+
+    def get_cell(self, row: int, col: int) -> str:
+        """
+        Get the symbol occupying a cell.
+
+        Args:
+            row: Row index
+            col: Column index
+
+        Returns:
+            str: PLAYER_X, PLAYER_O or EMPTY_CELL
+        """
+        bit = 1 << (row * self.size + col)
+        if self.x_bits & bit:
+            return settings.PLAYER_X
+        if self.o_bits & bit:
+            return settings.PLAYER_O
+        return settings.EMPTY_CELL
+
+    @property
+    def occupied(self) -> int:
+        """Bitboard of all occupied cells."""
+        return self.x_bits | self.o_bits
+
+    @property
+    def ply(self) -> int:
+        """Number of moves played so far."""
+        return len(self.move_stack)
+
+    @property
+    def last_move(self) -> Optional[Tuple[int, int]]:
+        """The (row, col) of the most recent move, or None on an empty board."""
+        return self.geometry.coords[self.move_stack[-1]] if self.move_stack else None
+
+    def move_at(self, ply: int) -> Tuple[int, int]:
+        """
+        The move that produced a given ply.
+
+        Args:
+            ply: Move number, starting at 1
+
+        Returns:
+            Tuple[int, int]: (row, col) of that move
+        """
+        return self.geometry.coords[self.move_stack[ply - 1]]
+
+    def position_at(self, ply: int) -> Position:
+        """
+        The board as it stood after ``ply`` moves, without replaying or copying.
+
+        Args:
+            ply: Number of moves played (0 is the empty board)
+
+        Returns:
+            Position: Snapshot of both bitboards
+        """
+        x_bits, o_bits = self._positions[ply]
+        return Position(x_bits, o_bits, self.size)
+
+    @property
+    def zobrist_hash(self) -> int:
+        """64-bit Zobrist hash of the position, maintained incrementally."""
+        return self._hash
+
+    @property
+    def symmetric_hash(self) -> int:
+        """64-bit Zobrist hash that is identical for all 8 symmetric variants of the position."""
+        return self._cached("symmetric_hash", self._compute_symmetric_hash)
+
+    def _compute_symmetric_hash(self) -> int:
+        """Hash every stone through all 8 symmetries and keep the smallest hash."""
+        hashes = [0] * len(self.geometry.symmetries)
+        for player, bits in enumerate((self.x_bits, self.o_bits)):
+            keys = self.geometry.zobrist_keys[player]
+            while bits:
+                low = bits & -bits
+                bits ^= low
+                for symmetry, key in enumerate(keys[low.bit_length() - 1]):
+                    hashes[symmetry] ^= key
+        return min(hashes)
 
     def make_move(self, row: int, col: int) -> Tuple[bool, str]:
         """
         Make a move on the board.
 
         Args:
-            row: Row index (0-2)
-            col: Column index (0-2)
+            row: Row index (0 to size - 1)
+            col: Column index (0 to size - 1)
 
         Returns:
-            Tuple[bool, str]: (Success status, Message with current board state or error)
+            Tuple[bool, str]: (Success status, "Move successful!" or the error); get_board_state()
+            renders the board when a prompt or the UI needs it
         """
         # Validate move coordinates
-        if not (0 <= row <= 2 and 0 <= col <= 2):
-            error_msg = "Invalid move: Position out of bounds. Please choose row and column between 0 and 2."
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            error_msg = (
+                "Invalid move: Position out of bounds. "
+                f"Please choose row and column between 0 and {self.size - 1}."
+            )
             logger.warning(f"{error_msg} - Attempted: ({row}, {col})")
             return False, error_msg
 
         # Check if position is already occupied
-        if self.board[row][col] != settings.EMPTY_CELL:
+        bit = 1 << (row * self.size + col)
+        if self.occupied & bit:
             error_msg = f"Invalid move: Position ({row}, {col}) is already occupied."
             logger.warning(error_msg)
             return False, error_msg
 
         # Make the move
-        self.board[row][col] = self.current_player
         logger.info(f"Player {self.current_player} placed at position ({row}, {col})")
+        self.push(row * self.size + col)
+        return True, "Move successful!"
+
+    def push(self, index: int):
+        """
+        Play the current player's mark on an empty cell, without validation or logging.
+
+        This is the O(1) make half of make/unmake for search code; pair it with undo_move().
+
+        Args:
+            index: Cell index (row * size + col), which must be empty
+        """
+        bit = 1 << index
+        player = self.current_player
+        if player == settings.PLAYER_X:
+            self.x_bits |= bit
+            own_bits = self.x_bits
+        else:
+            self.o_bits |= bit
+            own_bits = self.o_bits
+        self.move_stack.append(index)
+        self._positions.append((self.x_bits, self.o_bits))
+        self.version += 1
+        self._hash ^= self.geometry.zobrist_keys[0 if player == settings.PLAYER_X else 1][index][0]
 
-        # Get board state
-        board_state = self.get_board_state()
+        # Only lines through the new stone can have been completed
+        if self.winner is None and self._completes_line(own_bits, *self.geometry.coords[index]):
+            self.winner = player
+            self._winner_ply = len(self.move_stack)
 
         # Switch player
-        self.current_player = settings.PLAYER_O if self.current_player == settings.PLAYER_X else settings.PLAYER_X
+        self.current_player = settings.PLAYER_O if player == settings.PLAYER_X else settings.PLAYER_X
+
+    def undo_move(self) -> Optional[Tuple[int, int]]:
+        """
+        Take back the last move in O(1).
 
-        return True, f"Move successful!\n{board_state}"
+        Returns:
+            Optional[Tuple[int, int]]: The (row, col) that was removed, or None if no move was played
+        """
+        if not self.move_stack:
+            return None
+
+        index = self.move_stack.pop()
+        self._positions.pop()
+        player = settings.PLAYER_X if self.x_bits >> index & 1 else settings.PLAYER_O
+        self.x_bits, self.o_bits = self._positions[-1]
+        self.version += 1
+        self._hash ^= self.geometry.zobrist_keys[0 if player == settings.PLAYER_X else 1][index][0]
+        if self.winner is not None and len(self.move_stack) < self._winner_ply:
+            self.winner = None
+        self.current_player = player
+        return self.geometry.coords[index]
+
+    def _completes_line(self, bits: int, row: int, col: int) -> bool:
+        """
+        Check whether the stone at (row, col) is part of a winning line.
+
+        Walks outwards along the four lines through the cell, so the cost is
+        O(win_length) regardless of the board size.
+
+        Args:
+            bits: Bitboard of the player who owns the stone
+            row: Row of the stone
+            col: Column of the stone
+
+        Returns:
+            bool: True if the player has win_length or more in a row through the cell
+        """
+        size, k = self.size, self.win_length
+        if k <= 1:
+            return True
+        for d_row, d_col in DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                r, c = row + sign * d_row, col + sign * d_col
+                while 0 <= r < size and 0 <= c < size and bits >> (r * size + c) & 1:
+                    count += 1
+                    if count >= k:
+                        return True
+                    r, c = r + sign * d_row, c + sign * d_col
+        return False
 
     def get_board_state(self) -> str:
         """
@@ -58,43 +518,29 @@ class TicTacToeBoard:
         Returns:
             str: Board state as a formatted string
         """
-        board_str = "\n-------------\n"
-        for row in self.board:
-            board_str += f"| {' | '.join(row)} |\n-------------\n"
-        return board_str
+        return self._cached("board_state", self._render_board_state)
+
+    def _render_board_state(self) -> str:
+        """Render the current position as text."""
+        return self.geometry.template.format(*self.cells())
 
     def check_winner(self) -> Optional[str]:
         """
         Check if there's a winner.
 
+        The winner is detected incrementally by make_move, so this is O(1)
+        and the result is logged once per position.
+
         Returns:
             Optional[str]: The winning player (X or O) or None if no winner
         """
-        # Check rows
-        for row in self.board:
-            if row.count(row[0]) == settings.BOARD_SIZE and row[0] != settings.EMPTY_CELL:
-                logger.info(f"Winner found: Player {row[0]} (row victory)")
-                return row[0]
+        return self._cached("winner", self._announce_winner)
 
-        # Check columns
-        for col in range(settings.BOARD_SIZE):
-            column = [self.board[row][col] for row in range(settings.BOARD_SIZE)]
-            if column.count(column[0]) == settings.BOARD_SIZE and column[0] != settings.EMPTY_CELL:
-                logger.info(f"Winner found: Player {column[0]} (column victory)")
-                return column[0]
-
-        # Check diagonals
-        diagonal1 = [self.board[i][i] for i in range(settings.BOARD_SIZE)]
-        if diagonal1.count(diagonal1[0]) == settings.BOARD_SIZE and diagonal1[0] != settings.EMPTY_CELL:
-            logger.info(f"Winner found: Player {diagonal1[0]} (diagonal victory)")
-            return diagonal1[0]
-
-        diagonal2 = [self.board[i][settings.BOARD_SIZE - 1 - i] for i in range(settings.BOARD_SIZE)]
-        if diagonal2.count(diagonal2[0]) == settings.BOARD_SIZE and diagonal2[0] != settings.EMPTY_CELL:
-            logger.info(f"Winner found: Player {diagonal2[0]} (diagonal victory)")
-            return diagonal2[0]
-
-        return None
+    def _announce_winner(self) -> Optional[str]:
+        """Log and return the winner of the current position."""
+        if self.winner:
+            logger.info(f"Winner found: Player {self.winner}")
+        return self.winner
 
     def is_board_full(self) -> bool:
         """
@@ -103,24 +549,40 @@ class TicTacToeBoard:
         Returns:
             bool: True if board is full, False otherwise
         """
-        is_full = all(cell != settings.EMPTY_CELL for row in self.board for cell in row)
+        return self._cached("full", self._announce_full)
+
+    def _announce_full(self) -> bool:
+        """Log and return whether every cell of the current position is taken."""
+        is_full = popcount(self.occupied) == self.geometry.cell_count
         if is_full:
             logger.info("Board is full - game ends in a draw")
         return is_full
 
+    def is_board_empty(self) -> bool:
+        """
+        Check if no move has been played yet.
+
+        Returns:
+            bool: True if board is empty, False otherwise
+        """
+        return self.occupied == 0
+
     def get_valid_moves(self) -> List[Tuple[int, int]]:
         """
         Get a list of valid moves (empty positions).
 
+        The list is cached until the next move and must not be modified.
+
         Returns:
             List[Tuple[int, int]]: List of (row, col) tuples representing valid moves
         """
-        valid_moves = []
-        for row in range(settings.BOARD_SIZE):
-            for col in range(settings.BOARD_SIZE):
-                if self.board[row][col] == settings.EMPTY_CELL:
-                    valid_moves.append((row, col))
-        return valid_moves
+        return self._cached("valid_moves", self._compute_valid_moves)
+
+    def _compute_valid_moves(self) -> List[Tuple[int, int]]:
+        """List the empty cells of the current position."""
+        occupied = self.occupied
+        coords = self.geometry.coords
+        return [coords[index] for index in range(self.geometry.cell_count) if not occupied >> index & 1]
 
     def get_game_state(self) -> Tuple[bool, str]:
         """
@@ -129,6 +591,10 @@ class TicTacToeBoard:
         Returns:
             Tuple[bool, str]: (is_game_over, status_message)
         """
+        return self._cached("game_state", self._compute_game_state)
+
+    def _compute_game_state(self) -> Tuple[bool, str]:
+        """Derive the game-over flag and status message of the current position."""
         winner = self.check_winner()
         if winner:
             return True, f"Player {winner} wins!"
@@ -138,8 +604,78 @@ class TicTacToeBoard:
 
         return False, "Game in progress"
 
+    def outcome_entry(self):
+        """
+        Look the position up in the precomputed 3x3 table, if it applies.
+
+        Returns:
+            Optional[OutcomeEntry]: Table record, or None for other variants or a missing table
+        """
+        if (self.size, self.win_length) != (3, 3):
+            return None
+        from src.game.outcome_table import get_outcome_table
+
+        table = get_outcome_table()
+        return table.lookup(self) if table else None
+
+    def evaluate(self) -> int:
+        """
+        Perfect-play value of the position for the player to move.
+
+        Returns:
+            int: 1 if the player to move can force a win, 0 for a draw, -1 for a loss
+        """
+        entry = self.outcome_entry()
+        if entry and entry.reachable:
+            from src.game.outcome_table import OUTCOME_DRAW, OUTCOME_X_WINS
+
+            if entry.outcome == OUTCOME_DRAW:
+                return 0
+            x_wins = entry.outcome == OUTCOME_X_WINS
+            return 1 if x_wins == (self.current_player == settings.PLAYER_X) else -1
+
+        from src.game.solver import get_solver
+
+        return get_solver(self.size, self.win_length).evaluate(self)
+
+    def best_moves(self) -> List[Tuple[int, int]]:
+        """
+        Moves that achieve the best outcome under perfect play.
+
+        Returns:
+            List[Tuple[int, int]]: Optimal (row, col) moves, empty if the game is over
+        """
+        entry = self.outcome_entry()
+        if entry and entry.reachable:
+            return entry.optimal_moves
+
+        from src.game.solver import get_solver
+
+        return get_solver(self.size, self.win_length).best_moves(self)
+
+    def copy(self) -> "TicTacToeBoard":
+        """
+        Independent copy of the board, including its move history.
+
+        Returns:
+            TicTacToeBoard: Board in the same position that can be played on separately
+        """
+        board = object.__new__(TicTacToeBoard)
+        board.__dict__.update(self.__dict__)
+        board.move_stack = list(self.move_stack)
+        board._positions = list(self._positions)
+        board._cache = {}
+        return board
+
     def reset(self):
         """Reset the board to initial state."""
-        self.board = [[settings.EMPTY_CELL for _ in range(settings.BOARD_SIZE)] for _ in range(settings.BOARD_SIZE)]
+        self.x_bits = 0
+        self.o_bits = 0
+        self.winner = None
         self.current_player = settings.PLAYER_X
+        self.move_stack = []
+        self._positions = [(0, 0)]
+        self._winner_ply = 0
+        self._hash = 0
+        self.version += 1
         logger.info("Board reset to initial state")
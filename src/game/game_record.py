@@ -0,0 +1,453 @@
+"""
+Compact binary archive of played games.
+
+An archive is a file header (``MAGIC`` and a format version byte) followed by
+length-prefixed records, one per game, and is only ever appended to:
+
+    uint32   payload length
+    float64  played_at (Unix time the game finished)
+    float32  elapsed (seconds)
+    int64    seed (0 when the flags say there is none)
+    uint8    board size
+    uint8    win length
+    uint8    flags: outcome in bits 0-1 (draw, X, O, error), bit 2 set when there is a seed
+    uint16   number of moves
+    3 x (uint8 length, UTF-8)  model_x, model_o, prompt format
+    moves    one cell index per nibble, first ply in the high nibble, on boards of up
+             to 16 cells; one cell index per byte on larger boards
+
+A 3x3 game between two mock models takes about 70 bytes, against ~1.5 KB
+for its session move history as JSON. All integers are little-endian.
+
+``read_records`` is a generator, so an archive of millions of games is
+streamed one record at a time; large archives are memory-mapped instead of
+read in chunks.
+
+Usage:
+    python -m src.game.game_record games.ttr
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.config.settings import settings
+from src.game.match_runner import MatchResult
+from src.utils.logger import logger
+
+MAGIC = b"TTTG"
+VERSION = 1
+FILE_HEADER = MAGIC + bytes([VERSION])
+
+_LENGTH = struct.Struct("<I")
+_HEAD = struct.Struct("<dfqBBBH")
+OUTCOME_CODES = {"draw": 0, settings.PLAYER_X: 1, settings.PLAYER_O: 2, "error": 3}
+_OUTCOMES = {code: outcome for outcome, code in OUTCOME_CODES.items()}
+_HAS_SEED = 0b100
+
+# Archives at least this large are memory-mapped by default
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+
+def _pack_string(value: str) -> bytes:
+    """A UTF-8 string behind its one-byte length."""
+    data = value.encode()
+    if len(data) > 255:
+        error_msg = f"String too long for a game record: {value[:40]}..."
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    return bytes([len(data)]) + data
+
+
+def _mock_seed(model_x: str, model_o: str) -> Optional[int]:
+    """settings.MOCK_SEED when a mock model played (the only models it seeds), else None."""
+    if any(model.split(":")[0] == "mock" for model in (model_x, model_o)):
+        return settings.MOCK_SEED
+    return None
+
+
+@dataclass
+class GameRecord:
+    """One archived game: who played, how it was set up, and its moves as cell indices."""
+
+    model_x: str
+    model_o: str
+    board_size: int
+    win_length: int
+    moves: List[int] = field(default_factory=list)
+    outcome: str = "draw"
+    prompt_format: str = "verbose"
+    seed: Optional[int] = None
+    played_at: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def nibbles(self) -> bool:
+        """Whether moves are packed two per byte (boards of up to 16 cells)."""
+        return self.board_size * self.board_size <= 16
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the record with its length prefix.
+
+        Returns:
+            bytes: The record as appended to an archive
+        """
+        flags = OUTCOME_CODES[self.outcome] | (_HAS_SEED if self.seed is not None else 0)
+        head = _HEAD.pack(
+            self.played_at,
+            self.elapsed,
+            self.seed or 0,
+            self.board_size,
+            self.win_length,
+            flags,
+            len(self.moves),
+        )
+        if self.nibbles:
+            cells = self.moves + [0] * (len(self.moves) % 2)
+            moves = bytes(cells[i] << 4 | cells[i + 1] for i in range(0, len(cells), 2))
+        else:
+            moves = bytes(self.moves)
+        payload = b"".join(
+            (head, _pack_string(self.model_x), _pack_string(self.model_o), _pack_string(self.prompt_format), moves)
+        )
+        return _LENGTH.pack(len(payload)) + payload
+
+    @classmethod
+    def from_bytes(cls, payload) -> "GameRecord":
+        """
+        Decode a record's payload.
+
+        Args:
+            payload: Record bytes after the length prefix (bytes, memoryview or mmap slice)
+
+        Returns:
+            GameRecord: The decoded game
+        """
+        played_at, elapsed, seed, board_size, win_length, flags, count = _HEAD.unpack_from(payload)
+        offset = _HEAD.size
+        strings = []
+        for _ in range(3):
+            length = payload[offset]
+            strings.append(bytes(payload[offset + 1:offset + 1 + length]).decode())
+            offset += 1 + length
+        packed = bytes(payload[offset:])
+        if board_size * board_size <= 16:
+            moves = [cell for byte in packed for cell in (byte >> 4, byte & 0x0F)][:count]
+        else:
+            moves = list(packed[:count])
+        return cls(
+            strings[0],
+            strings[1],
+            board_size,
+            win_length,
+            moves,
+            _OUTCOMES[flags & 0b11],
+            strings[2],
+            seed if flags & _HAS_SEED else None,
+            played_at,
+            elapsed,
+        )
+
+    @classmethod
+    def from_result(
+        cls, result: MatchResult, played_at: Optional[float] = None, seed: Optional[int] = None
+    ) -> "GameRecord":
+        """
+        Build a record from a finished MatchResult.
+
+        Args:
+            result: The game
+            played_at: Unix time the game finished (default: now)
+            seed: Seed the game was played with (default: settings.MOCK_SEED if a mock model played, else none)
+
+        Returns:
+            GameRecord: The game's record
+        """
+        return cls(
+            result.model_x,
+            result.model_o,
+            result.board_size,
+            result.win_length,
+            [row * result.board_size + col for row, col in result.moves],
+            result.outcome,
+            result.prompt_format,
+            _mock_seed(result.model_x, result.model_o) if seed is None else seed,
+            played_at or time.time(),
+            result.elapsed,
+        )
+
+    @classmethod
+    def from_move_history(
+        cls,
+        history: List[Dict[str, Any]],
+        model_x: str,
+        model_o: str,
+        board_size: int,
+        win_length: int,
+        outcome: str,
+        elapsed: float = 0.0,
+        played_at: Optional[float] = None,
+        seed: Optional[int] = None,
+    ) -> "GameRecord":
+        """
+        Build a record from the app's session move history.
+
+        Args:
+            history: st.session_state.move_history entries, each with a "row,col" "move"
+            model_x: Model string of Player 1 (X)
+            model_o: Model string of Player 2 (O)
+            board_size: Board size
+            win_length: Marks in a row to win
+            outcome: "X", "O", "draw" or "error"
+            elapsed: Game duration in seconds
+            played_at: Unix time the game finished (default: now)
+            seed: Seed the game was played with (default: settings.MOCK_SEED if a mock model played, else none)
+
+        Returns:
+            GameRecord: The game's record; per-move token and latency counters are not kept
+        """
+        moves = []
+        for entry in history:
+            row, col = map(int, entry["move"].split(","))
+            moves.append(row * board_size + col)
+        prompt_format = next(
+            (entry["prompt_format"] for entry in history if entry.get("prompt_format")), settings.PROMPT_FORMAT
+        )
+        return cls(
+            model_x,
+            model_o,
+            board_size,
+            win_length,
+            moves,
+            outcome,
+            prompt_format,
+            _mock_seed(model_x, model_o) if seed is None else seed,
+            played_at or time.time(),
+            elapsed,
+        )
+
+    def to_move_history(self) -> List[Dict[str, Any]]:
+        """
+        Rebuild the app's session move history.
+
+        Players are named after their MODEL_OPTIONS entry when there is one, as the
+        app does. The record does not keep per-move costs, so they come back as zero.
+
+        Returns:
+            List[Dict[str, Any]]: Entries shaped like st.session_state.move_history
+        """
+        model_names = {model_str: name for name, model_str in settings.MODEL_OPTIONS.items()}
+        players = [
+            f"Player 1 ({model_names.get(self.model_x, self.model_x)})",
+            f"Player 2 ({model_names.get(self.model_o, self.model_o)})",
+        ]
+        return [
+            {
+                "number": ply + 1,
+                "player": players[ply % 2],
+                "move": f"{cell // self.board_size},{cell % self.board_size}",
+                "prompt_format": self.prompt_format,
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "latency_ms": 0.0,
+                "time_to_move_ms": 0.0,
+                "tokens_saved": 0,
+                "cancelled": False,
+                "requests": 0,
+                "wasted": 0,
+                "fallback": False,
+            }
+            for ply, cell in enumerate(self.moves)
+        ]
+
+
+class GameRecordWriter:
+    """Appends records to an archive, one write per call so concurrent appenders do not interleave."""
+
+    def __init__(self, path: str):
+        """
+        Open an archive for appending, creating it (and its directory) if needed.
+
+        A last record cut short by a crash is removed first.
+
+        Args:
+            path: Archive file
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._repair()
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._lock = threading.Lock()
+        if os.fstat(self._fd).st_size == 0:
+            os.write(self._fd, FILE_HEADER)
+
+    def _repair(self):
+        """Check the file header and cut a truncated last record."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        with open(self.path, "rb+") as f:
+            if f.read(len(FILE_HEADER)) != FILE_HEADER:
+                error_msg = f"Not a version {VERSION} game archive: {self.path}"
+                logger.error(error_msg)
+                raise ValueError(error_msg)
+            size = f.seek(0, os.SEEK_END)
+            offset = len(FILE_HEADER)
+            # Hop from length prefix to length prefix without decoding the records
+            while offset + _LENGTH.size <= size:
+                f.seek(offset)
+                (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+                if offset + _LENGTH.size + length > size:
+                    break
+                offset += _LENGTH.size + length
+            if offset < size:
+                logger.warning(f"Dropping a truncated record at the end of {self.path}")
+                f.truncate(offset)
+
+    def write(self, record: GameRecord):
+        """
+        Append one game.
+
+        Args:
+            record: The game
+        """
+        self.write_all([record])
+
+    def write_all(self, records: List[GameRecord]):
+        """
+        Append several games in one write.
+
+        Args:
+            records: The games
+        """
+        if records:
+            with self._lock:
+                os.write(self._fd, b"".join(record.to_bytes() for record in records))
+
+    def flush(self):
+        """Make the appended games durable."""
+        os.fsync(self._fd)
+
+    def close(self):
+        """Flush and close the archive."""
+        if self._fd is not None:
+            self.flush()
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "GameRecordWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _iter_buffer(buffer, start: int, path: str) -> Iterator[GameRecord]:
+    """Decode the records of an in-memory or memory-mapped archive from an offset."""
+    view = memoryview(buffer)
+    try:
+        size, offset = len(view), start
+        while offset + _LENGTH.size <= size:
+            (length,) = _LENGTH.unpack_from(view, offset)
+            end = offset + _LENGTH.size + length
+            if end > size:
+                break
+            yield GameRecord.from_bytes(view[offset + _LENGTH.size:end])
+            offset = end
+        if offset < size:
+            logger.warning(f"Ignoring a truncated record at the end of {path}")
+    finally:
+        view.release()
+
+
+def read_records(path: str, use_mmap: Optional[bool] = None, chunk_size: int = 1 << 20) -> Iterator[GameRecord]:
+    """
+    Stream the games of an archive in the order they were appended.
+
+    Args:
+        path: Archive file
+        use_mmap: Memory-map the file instead of reading it in chunks (default: for files of MMAP_THRESHOLD or more)
+        chunk_size: Bytes read at a time when not memory-mapping
+
+    Yields:
+        GameRecord: One game at a time; a truncated last record is skipped
+
+    Raises:
+        ValueError: If the file is not a game archive
+    """
+    with open(path, "rb") as f:
+        if f.read(len(FILE_HEADER)) != FILE_HEADER:
+            error_msg = f"Not a version {VERSION} game archive: {path}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        size = os.fstat(f.fileno()).st_size
+        if use_mmap is None:
+            use_mmap = size >= MMAP_THRESHOLD
+
+        if use_mmap:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield from _iter_buffer(mapped, len(FILE_HEADER), path)
+            return
+
+        pending = b""
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            pending += chunk
+            offset = 0
+            while offset + _LENGTH.size <= len(pending):
+                (length,) = _LENGTH.unpack_from(pending, offset)
+                end = offset + _LENGTH.size + length
+                if end > len(pending):
+                    break
+                yield GameRecord.from_bytes(memoryview(pending)[offset + _LENGTH.size:end])
+                offset = end
+            pending = pending[offset:]
+        if pending:
+            logger.warning(f"Ignoring a truncated record at the end of {path}")
+
+
+_archive: Optional[GameRecordWriter] = None
+_archive_lock = threading.Lock()
+
+
+def get_game_archive() -> GameRecordWriter:
+    """
+    Get the process-wide archive writer, opening settings.GAME_ARCHIVE_PATH on first use.
+
+    Returns:
+        GameRecordWriter: The shared writer
+    """
+    global _archive
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = GameRecordWriter(settings.GAME_ARCHIVE_PATH)
+                logger.info(f"Opened game archive at {settings.GAME_ARCHIVE_PATH}")
+    return _archive
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a game archive.")
+    parser.add_argument("path", nargs="?", default=settings.GAME_ARCHIVE_PATH, help="archive file")
+    parser.add_argument("--mmap", action=argparse.BooleanOptionalAction, default=None, help="memory-map the file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    games, moves, outcomes = 0, 0, dict.fromkeys(OUTCOME_CODES, 0)
+    for record in read_records(args.path, args.mmap):
+        games += 1
+        moves += len(record.moves)
+        outcomes[record.outcome] += 1
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(args.path)
+    print(f"{games:,} games, {moves:,} moves, {size:,} bytes ({size / max(games, 1):.1f} bytes/game)")
+    print(f"read in {elapsed:.2f}s ({games / elapsed if elapsed else 0:,.0f} games/s)")
+    for outcome, count in outcomes.items():
+        print(f"{outcome:>6}: {count:,}")
@@ -0,0 +1,478 @@
+"""
+Headless match runner: the game loop, free of any UI.
+
+A MatchRunner owns one game between two move providers (model strings of
+LLMs, local engines or mock models). It checks out both players, and for
+every move consults the move cache, prefetches the opponent's reply when
+speculating, asks the player through the rate limiter with retries,
+fallback and optional hedging, plays the move and records what it cost.
+
+The same loop has two drivers:
+    play_move() / play()     blocking, one move per call or the whole game;
+                             the Streamlit app calls play_move() once per rerun
+    aplay_move() / aplay()   coroutines for the asyncio match engine, which
+                             plays many runners at once
+
+Players are returned to the pool as soon as the game ends (or on close()).
+"""
+
+import asyncio
+import contextlib
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, List, Optional, Tuple
+from src.agents.agent_pool import AgentPool, get_agent_pool
+from src.agents.engine_player import EnginePlayer
+from src.agents.hedging import Hedger, get_hedger
+from src.agents.move_cache import get_move_cache
+from src.agents.move_resolver import Move, MoveResolver, MoveStats, get_move_resolver
+from src.agents.move_stream import astream_move, stream_move
+from src.agents.prompts import player_prompt_format, validate_prompt_format
+from src.agents.rate_limiter import RateLimiter, estimate_tokens, get_rate_limiter
+from src.agents.speculation import Prefetch, Speculator, get_speculator
+from src.config.settings import settings
+from src.game.board import TicTacToeBoard
+from src.utils.logger import logger
+
+# Holds a provider's concurrency slot for the duration of one request
+SlotFactory = Callable[[str], AsyncContextManager]
+
+
+@dataclass
+class MatchResult:
+    """Outcome of one game."""
+
+    model_x: str
+    model_o: str
+    board_size: int
+    win_length: int
+    prompt_format: str = "verbose"
+    winner: Optional[str] = None
+    moves: List[Tuple[int, int]] = field(default_factory=list)
+    move_stats: List[MoveStats] = field(default_factory=list)
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def outcome(self) -> str:
+        """"X", "O", "draw", or "error" for a game that failed."""
+        if self.error:
+            return "error"
+        return self.winner or "draw"
+
+    @property
+    def input_tokens(self) -> int:
+        """Prompt tokens spent on the game."""
+        return sum(stats.input_tokens for stats in self.move_stats)
+
+    @property
+    def output_tokens(self) -> int:
+        """Completion tokens spent on the game."""
+        return sum(stats.output_tokens for stats in self.move_stats)
+
+    @property
+    def wasted_requests(self) -> int:
+        """Requests whose answer was not played."""
+        return sum(stats.wasted for stats in self.move_stats)
+
+    @property
+    def fallback_moves(self) -> int:
+        """Moves played by the fallback policy."""
+        return sum(stats.fallback for stats in self.move_stats)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Plain representation for JSON output.
+
+        Returns:
+            Dict[str, Any]: The fields, the outcome and the token totals
+        """
+        record = asdict(self)
+        record.update(outcome=self.outcome, input_tokens=self.input_tokens, output_tokens=self.output_tokens)
+        return record
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "MatchResult":
+        """
+        Rebuild a result from its to_dict() form, e.g. a checkpointed JSON line.
+
+        Args:
+            record: Output of to_dict(); extra keys are ignored
+
+        Returns:
+            MatchResult: The result
+        """
+        return cls(
+            record["model_x"],
+            record["model_o"],
+            record["board_size"],
+            record["win_length"],
+            record.get("prompt_format", "verbose"),
+            record.get("winner"),
+            [tuple(move) for move in record.get("moves", [])],
+            [MoveStats(**stats) for stats in record.get("move_stats", [])],
+            record.get("elapsed", 0.0),
+            record.get("error"),
+        )
+
+
+class MatchRunner:
+    """Plays one game between two move providers."""
+
+    def __init__(
+        self,
+        model_x: str,
+        model_o: str,
+        board_size: Optional[int] = None,
+        win_length: Optional[int] = None,
+        prompt_format: Optional[str] = None,
+        debug_mode: bool = False,
+        stream: Optional[bool] = None,
+        speculate: Optional[bool] = None,
+        hedge: Optional[bool] = None,
+        pool: Optional[AgentPool] = None,
+        resolver: Optional[MoveResolver] = None,
+        limiter: Optional[RateLimiter] = None,
+        speculator: Optional[Speculator] = None,
+        hedger: Optional[Hedger] = None,
+        slot: Optional[SlotFactory] = None,
+    ):
+        """
+        Set up the board and check out both players.
+
+        Args:
+            model_x: Model string for player X (format: "provider:model_name")
+            model_o: Model string for player O (format: "provider:model_name")
+            board_size: Width and height of the board (default: settings.BOARD_SIZE)
+            win_length: Marks in a row needed to win (default: settings.WIN_LENGTH)
+            prompt_format: "verbose" or "compact" prompts (default: settings.PROMPT_FORMAT)
+            debug_mode: Enable agent debug logging
+            stream: Stream replies and stop at the first legal move (default: settings.STREAM_MOVES)
+            speculate: Prefetch the opponent's replies while a player thinks (default: settings.SPECULATIVE_PREFETCH)
+            hedge: Duplicate requests that run past their model's tail latency (default: settings.HEDGE_REQUESTS)
+            pool: Pool players are checked out from (default: the process-wide pool)
+            resolver: Retry and fallback policy for moves (default: the process-wide resolver)
+            limiter: Rate limiter shared with other callers (default: the process-wide limiter)
+            speculator: Predicts moves and prefetches replies (default: the process-wide speculator)
+            hedger: Duplicates slow requests (default: the process-wide hedger)
+            slot: Async context manager per provider held around each async request, e.g. the
+                match engine's concurrency limit (default: none)
+
+        Raises:
+            ValueError: If the prompt format or a provider is not supported
+        """
+        self.prompt_format = validate_prompt_format(prompt_format or settings.PROMPT_FORMAT)
+        self.stream = settings.STREAM_MOVES if stream is None else stream
+        self.speculate = settings.SPECULATIVE_PREFETCH if speculate is None else speculate
+        self.hedge = settings.HEDGE_REQUESTS if hedge is None else hedge
+        self.pool = pool or get_agent_pool()
+        self.resolver = resolver or get_move_resolver()
+        self.limiter = limiter or get_rate_limiter()
+        self._speculator = speculator
+        self._hedger = hedger
+        self._slot = slot or (lambda provider: contextlib.nullcontext())
+
+        self.board = TicTacToeBoard(board_size, win_length)
+        self.result = MatchResult(model_x, model_o, self.board.size, self.board.win_length, self.prompt_format)
+        self.models = {settings.PLAYER_X: model_x, settings.PLAYER_O: model_o}
+        player_x, player_o = self.pool.acquire_players(model_x, model_o, self.board, debug_mode, self.prompt_format)
+        self.players = {settings.PLAYER_X: player_x, settings.PLAYER_O: player_o}
+
+        # Prefetches started for the opponent this turn, and the one claimed for the player to move
+        self._pending: List[Prefetch] = []
+        self._prefetched: Any = None
+        self._start = time.perf_counter()
+        self._closed = False
+
+    @property
+    def speculator(self) -> Speculator:
+        """Speculator in use; speculation can be switched on mid-game."""
+        return self._speculator or get_speculator()
+
+    @property
+    def hedger(self) -> Hedger:
+        """Hedger in use; hedging can be switched on mid-game."""
+        return self._hedger or get_hedger()
+
+    @property
+    def game_over(self) -> bool:
+        """Whether the game has been won or drawn."""
+        return self.board.get_game_state()[0]
+
+    def _turn(self) -> Tuple[Any, str, Any, str]:
+        """(player, model string, opponent, opponent model string) for the side to move."""
+        symbol = self.board.current_player
+        other = settings.PLAYER_O if symbol == settings.PLAYER_X else settings.PLAYER_X
+        return self.players[symbol], self.models[symbol], self.players[other], self.models[other]
+
+    def _cached_move(self, player: Any, model_str: str) -> Tuple[Optional[Tuple[str, str]], Optional[Move]]:
+        """Cache namespace of the player and the cached move for the position, if any."""
+        cache = get_move_cache()
+        cache_key = cache.agent_key(player, model_str) if cache is not None else None
+        # A claimed prefetch has already been paid for, so it takes precedence over the cache
+        move = cache.lookup(*cache_key, self.board) if cache_key and self._prefetched is None else None
+        if move is not None:
+            logger.info(f"Move cache hit for {model_str}: {move}")
+        return cache_key, move
+
+    def _backup_player(self, player: Any, backup_model: str, pool_key: tuple) -> Any:
+        """Check out a second player for a hedged request, so the two requests never share one."""
+        _, symbol, _, _, debug_mode, system_format = pool_key
+        return self.pool.acquire(player.name, symbol, backup_model, self.board, debug_mode, system_format)
+
+    def _requester(self, player: Any, model_str: str, board: TicTacToeBoard, hedge: bool) -> Callable[[str], Any]:
+        """
+        Build the blocking function that sends one move request for a position.
+
+        The function may run in a speculation or hedging worker thread, so it only
+        uses the values captured here.
+
+        Args:
+            player: Agent or EnginePlayer to ask
+            model_str: Model string of the player, for rate limiting
+            board: Position the move is requested in
+            hedge: Duplicate the request if it runs past the model's tail latency
+
+        Returns:
+            Callable[[str], Any]: Sends a prompt under the model's rate limits and returns the reply
+        """
+        prompt_format = player_prompt_format(player, self.prompt_format)
+        stream = self.stream
+
+        def ask(asked: Any, asked_model: str, prompt: str) -> Any:
+            def run() -> Any:
+                if stream:
+                    return stream_move(asked, prompt, board, prompt_format)
+                return asked.run(prompt, stream=False)
+
+            estimated = estimate_tokens(getattr(asked, "description", None), prompt)
+            return self.limiter.call(asked_model, run, estimated)
+
+        def send(prompt: str) -> Any:
+            pool_key = getattr(player, "_pool_key", None)
+            if not hedge or isinstance(player, EnginePlayer) or pool_key is None:
+                return ask(player, model_str, prompt)
+
+            hedger = self.hedger
+            backup_model = hedger.backup_model(model_str)
+
+            def backup() -> Any:
+                backup_player = self._backup_player(player, backup_model, pool_key)
+                try:
+                    return ask(backup_player, backup_model, prompt)
+                finally:
+                    self.pool.release(backup_player)
+
+            return hedger.request(model_str, lambda: ask(player, model_str, prompt), backup_model, backup)
+
+        return send
+
+    def _arequester(
+        self, player: Any, model_str: str, board: TicTacToeBoard, hedge: bool
+    ) -> Callable[[str], Awaitable[Any]]:
+        """
+        Async variant of _requester.
+
+        Requests wait for the rate limiter before taking their provider slot, so
+        throttled requests do not hold slots other models could use. A streamed
+        reply holds its slot until it is read or cancelled.
+
+        Args:
+            player: Agent or EnginePlayer to ask
+            model_str: Model string of the player, for rate limiting
+            board: Position the move is requested in
+            hedge: Duplicate the request if it runs past the model's tail latency
+
+        Returns:
+            Callable[[str], Awaitable[Any]]: Coroutine function sending a prompt and returning the reply
+        """
+        prompt_format = player_prompt_format(player, self.prompt_format)
+        stream = self.stream
+
+        async def ask(asked: Any, asked_model: str, prompt: str) -> Any:
+            async def run() -> Any:
+                async with self._slot(asked_model.split(":")[0]):
+                    if stream:
+                        return await astream_move(asked, prompt, board, prompt_format)
+                    arun = getattr(asked, "arun", None)
+                    if arun is not None:
+                        return await arun(prompt, stream=False)
+                    return await asyncio.to_thread(asked.run, prompt, stream=False)
+
+            estimated = estimate_tokens(getattr(asked, "description", None), prompt)
+            return await self.limiter.call_async(asked_model, run, estimated)
+
+        def send(prompt: str) -> Awaitable[Any]:
+            pool_key = getattr(player, "_pool_key", None)
+            if not hedge or isinstance(player, EnginePlayer) or pool_key is None:
+                return ask(player, model_str, prompt)
+
+            hedger = self.hedger
+            backup_model = hedger.backup_model(model_str)
+
+            async def backup() -> Any:
+                backup_player = self._backup_player(player, backup_model, pool_key)
+                try:
+                    return await ask(backup_player, backup_model, prompt)
+                finally:
+                    self.pool.release(backup_player)
+
+            return hedger.arequest(model_str, lambda: ask(player, model_str, prompt), backup_model, backup)
+
+        return send
+
+    def _apply(self, move: Move, stats: MoveStats, cache_key: Optional[Tuple[str, str]]):
+        """
+        Play a move, record it and hand the claimed prefetch to the next turn.
+
+        Raises:
+            ValueError: If the move is not legal
+        """
+        # Remember the model's own legal answers
+        if cache_key and not stats.cached and not stats.fallback:
+            get_move_cache().store(*cache_key, self.board, *move)
+
+        success, message = self.board.make_move(*move)
+        if not success:
+            Speculator.cancel(self._pending)
+            self._pending = []
+            logger.error(f"Invalid move attempt: {message}")
+            raise ValueError(message)
+        self.result.moves.append(move)
+        self.result.move_stats.append(stats)
+
+        if self.game_over:
+            Speculator.cancel(self._pending)
+            self.close()
+        elif self._pending:
+            self._prefetched = self.speculator.claim(self._pending, move)
+        self._pending = []
+
+    def play_move(self) -> Tuple[Move, MoveStats]:
+        """
+        Play the next move, blocking until it has been chosen.
+
+        Returns:
+            Tuple[Move, MoveStats]: The move played and what it cost
+        """
+        player, model_str, opponent, opponent_model = self._turn()
+        cache_key, move = self._cached_move(player, model_str)
+        prefetched, self._prefetched = self._prefetched, None
+        if move is not None:
+            self._apply(move, MoveStats(cached=True), cache_key)
+            return move, self.result.move_stats[-1]
+
+        try:
+            if self.speculate:
+                # Speculative requests are not hedged: a duplicate of a guess is rarely worth it
+                self._pending = self.speculator.launch(
+                    player,
+                    model_str,
+                    self.board,
+                    opponent,
+                    self.prompt_format,
+                    lambda after: self._requester(opponent, opponent_model, after, hedge=False),
+                )
+            move, stats = self.resolver.resolve(
+                player,
+                model_str,
+                self.board,
+                self.prompt_format,
+                self._requester(player, model_str, self.board, self.hedge),
+                prefetched,
+            )
+        except BaseException:
+            Speculator.cancel(self._pending)
+            self._pending = []
+            raise
+        self._apply(move, stats, cache_key)
+        return move, stats
+
+    async def aplay_move(self) -> Tuple[Move, MoveStats]:
+        """
+        Async variant of play_move.
+
+        Returns:
+            Tuple[Move, MoveStats]: The move played and what it cost
+        """
+        player, model_str, opponent, opponent_model = self._turn()
+        cache_key, move = self._cached_move(player, model_str)
+        prefetched, self._prefetched = self._prefetched, None
+        if move is not None:
+            self._apply(move, MoveStats(cached=True), cache_key)
+            return move, self.result.move_stats[-1]
+
+        try:
+            if self.speculate:
+                self._pending = self.speculator.launch_async(
+                    player,
+                    model_str,
+                    self.board,
+                    opponent,
+                    self.prompt_format,
+                    lambda after: self._arequester(opponent, opponent_model, after, hedge=False),
+                )
+            move, stats = await self.resolver.resolve_async(
+                player,
+                model_str,
+                self.board,
+                self.prompt_format,
+                self._arequester(player, model_str, self.board, self.hedge),
+                prefetched,
+            )
+        except BaseException:
+            Speculator.cancel(self._pending)
+            self._pending = []
+            raise
+        self._apply(move, stats, cache_key)
+        return move, stats
+
+    def play(self) -> MatchResult:
+        """
+        Play the game to completion.
+
+        Returns:
+            MatchResult: Winner, moves and per-move costs; a game that failed has its error set
+        """
+        try:
+            while not self.game_over:
+                self.play_move()
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self.close()
+        return self.result
+
+    async def aplay(self) -> MatchResult:
+        """
+        Async variant of play.
+
+        Returns:
+            MatchResult: Winner, moves and per-move costs; a game that failed has its error set
+        """
+        try:
+            while not self.game_over:
+                await self.aplay_move()
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self.close()
+        return self.result
+
+    def _fail(self, error: Exception):
+        """Record the error that ended the game."""
+        self.result.error = str(error)
+        logger.error(f"Game {self.result.model_x} vs {self.result.model_o} failed: {self.result.error}")
+
+    def close(self):
+        """Cancel outstanding prefetches, return the players to the pool and finalize the result."""
+        if self._closed:
+            return
+        self._closed = True
+        Speculator.cancel(self._pending)
+        if self._prefetched is not None:
+            self._prefetched.cancel()
+        self._pending, self._prefetched = [], None
+        self.pool.release(*self.players.values())
+        self.result.winner = self.board.winner
+        self.result.elapsed = time.perf_counter() - self._start
@@ -0,0 +1,342 @@
+"""
+Monte Carlo Tree Search (UCT) with batched, vectorized rollouts.
+
+Instead of one random playout per leaf, each iteration selects a batch of
+leaves (spread apart with virtual loss) and finishes all of their playouts
+in a single BatchSimulator call. The tree is walked with the board's
+push/undo_move, and the subtree under the moves actually played is kept
+between calls.
+
+On boards larger than 4x4 a node only expands cells near existing stones
+(the empty board expands the centre), like the alpha-beta search, in a
+shuffled order that tries cells touching a stone first.
+"""
+
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+from src.game.batch_sim import BatchSimulator, O, X
+from src.game.board import TicTacToeBoard
+from src.utils.logger import logger
+
+
+class Node:
+    """A position in the search tree."""
+
+    __slots__ = ("parent", "move", "children", "untried", "visits", "value", "terminal_value")
+
+    def __init__(self, parent: Optional["Node"], move: int, untried: List[int], terminal_value: Optional[float]):
+        """
+        Initialize a node.
+
+        Args:
+            parent: Parent node, or None for the root
+            move: Cell index played to reach this node (-1 for the root)
+            untried: Legal cell indices not yet expanded
+            terminal_value: Result for the player who just moved if the game is over, else None
+        """
+        self.parent = parent
+        self.move = move
+        self.children: Dict[int, "Node"] = {}
+        self.untried = untried
+        self.visits = 0
+        # Sum of results for the player who made ``move`` (1 win, 0.5 draw, 0 loss)
+        self.value = 0.0
+        self.terminal_value = terminal_value
+
+
+@dataclass
+class MCTSResult:
+    """Best move found by a search and what it cost."""
+
+    move: Optional[Tuple[int, int]]
+    visits: int
+    win_rate: float
+    nodes: int
+    rollouts: int
+    elapsed_ms: float
+
+    @property
+    def nodes_per_sec(self) -> float:
+        """Tree nodes expanded per second."""
+        return self.nodes / self.elapsed_ms * 1000 if self.elapsed_ms else 0.0
+
+    @property
+    def rollouts_per_sec(self) -> float:
+        """Playouts simulated per second."""
+        return self.rollouts / self.elapsed_ms * 1000 if self.elapsed_ms else 0.0
+
+
+class MCTS:
+    """UCT search whose leaf playouts are evaluated in NumPy batches."""
+
+    def __init__(
+        self,
+        rollouts: Optional[int] = None,
+        time_budget_ms: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        rollouts_per_leaf: Optional[int] = None,
+        exploration: float = math.sqrt(2),
+        policy: str = "random",
+        seed: Optional[int] = None,
+        neighbourhood: int = 2,
+    ):
+        """
+        Initialize the search.
+
+        Args:
+            rollouts: Playout budget per move (default: settings.MCTS_ROLLOUTS)
+            time_budget_ms: Wall-clock budget per move (default: settings.ENGINE_TIME_BUDGET_MS)
+            batch_size: Leaves selected per batch (default: settings.MCTS_BATCH_SIZE)
+            rollouts_per_leaf: Playouts per selected leaf (default: settings.MCTS_ROLLOUTS_PER_LEAF)
+            exploration: UCT exploration constant
+            policy: BatchSimulator policy used for playouts
+            seed: Seed for the playout policy and the expansion order
+            neighbourhood: Only cells within this distance of a stone are expanded on big boards
+        """
+        self.rollouts = rollouts or settings.MCTS_ROLLOUTS
+        self.time_budget_ms = time_budget_ms or settings.ENGINE_TIME_BUDGET_MS
+        self.batch_size = batch_size or settings.MCTS_BATCH_SIZE
+        self.rollouts_per_leaf = rollouts_per_leaf or settings.MCTS_ROLLOUTS_PER_LEAF
+        self.exploration = exploration
+        self.policy = policy
+        self.seed = seed
+        self.neighbourhood = neighbourhood
+        self._rng = random.Random(seed)
+        self._neighbour_masks: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+        self._simulators: Dict[Tuple[int, int], BatchSimulator] = {}
+        self._root: Optional[Node] = None
+        self._root_path: Tuple[int, ...] = ()
+        self._root_variant: Tuple[int, int] = (0, 0)
+
+    def _simulator(self, board: TicTacToeBoard) -> BatchSimulator:
+        """Get the playout simulator for the board's variant."""
+        variant = (board.size, board.win_length)
+        if variant not in self._simulators:
+            self._simulators[variant] = BatchSimulator(board.size, board.win_length, self.seed)
+        return self._simulators[variant]
+
+    def _neighbours(self, size: int, reach: int) -> Tuple[int, ...]:
+        """
+        Per cell, the bitboard of cells within ``reach`` of it (built once per size).
+
+        Args:
+            size: Width and height of the board
+            reach: Chebyshev distance
+
+        Returns:
+            Tuple[int, ...]: One mask per cell index
+        """
+        if (size, reach) not in self._neighbour_masks:
+            self._neighbour_masks[(size, reach)] = tuple(
+                sum(
+                    1 << (r * size + c)
+                    for r in range(max(0, row - reach), min(size, row + reach + 1))
+                    for c in range(max(0, col - reach), min(size, col + reach + 1))
+                )
+                for row in range(size)
+                for col in range(size)
+            )
+        return self._neighbour_masks[(size, reach)]
+
+    def _untried(self, board: TicTacToeBoard) -> List[int]:
+        """
+        Moves a new node will expand, in the order they are popped (last first).
+
+        Args:
+            board: Position of the node
+
+        Returns:
+            List[int]: Cell indices; cells touching a stone are at the end, so they are expanded first
+        """
+        occupied = board.occupied
+        free = [index for index in range(board.geometry.cell_count) if not occupied >> index & 1]
+        if board.size <= 4 or not free:
+            self._rng.shuffle(free)
+            return free
+        if not occupied:
+            centre = board.size // 2
+            return [centre * board.size + centre]
+
+        neighbours = self._neighbours(board.size, self.neighbourhood)
+        candidates = [index for index in free if occupied & neighbours[index]] or free
+        self._rng.shuffle(candidates)
+        adjacent = self._neighbours(board.size, 1)
+        candidates.sort(key=lambda index: bool(occupied & adjacent[index]))
+        return candidates
+
+    def _new_node(self, board: TicTacToeBoard, parent: Optional[Node], move: int) -> Node:
+        """Create a node for the board's current position."""
+        if board.winner:
+            return Node(parent, move, [], 1.0)
+        untried = self._untried(board)
+        return Node(parent, move, untried, None if untried else 0.5)
+
+    def _reuse_root(self, board: TicTacToeBoard) -> Node:
+        """
+        Descend the previous tree along the moves played since, or start a new one.
+
+        Args:
+            board: Position about to be searched
+
+        Returns:
+            Node: Root for this search
+        """
+        path = tuple(board.move_stack)
+        variant = (board.size, board.win_length)
+        node = self._root
+        if node is not None and variant == self._root_variant and path[:len(self._root_path)] == self._root_path:
+            for index in path[len(self._root_path):]:
+                node = node.children.get(index)
+                if node is None:
+                    break
+        else:
+            node = None
+
+        if node is None:
+            node = self._new_node(board, None, -1)
+        else:
+            logger.debug(f"MCTS reusing subtree with {node.visits} visits")
+        node.parent = None
+        self._root, self._root_path, self._root_variant = node, path, variant
+        return node
+
+    def _select(self, node: Node, board: TicTacToeBoard) -> Node:
+        """
+        Walk down by UCT until a node with untried moves or a terminal node.
+
+        Moves are pushed onto ``board``; the caller undoes them.
+        """
+        while not node.untried and node.children and node.terminal_value is None:
+            log_visits = math.log(node.visits + 1)
+            best_score, best_child = -1.0, None
+            for child in node.children.values():
+                if child.visits == 0:
+                    best_child = child
+                    break
+                score = child.value / child.visits + self.exploration * math.sqrt(log_visits / child.visits)
+                if score > best_score:
+                    best_score, best_child = score, child
+            node = best_child
+            board.push(node.move)
+        return node
+
+    def _expand(self, node: Node, board: TicTacToeBoard) -> Node:
+        """Add one untried child, pushing its move onto ``board``."""
+        if not node.untried or node.terminal_value is not None:
+            return node
+        index = node.untried.pop()
+        board.push(index)
+        child = self._new_node(board, node, index)
+        node.children[index] = child
+        return child
+
+    @staticmethod
+    def _backpropagate(node: Node, result: float):
+        """
+        Add a result (for the player who moved into ``node``) up to the root.
+
+        Visits were already counted as virtual loss during selection.
+        """
+        while node is not None:
+            node.value += result
+            result = 1.0 - result
+            node = node.parent
+
+    def search(self, board: TicTacToeBoard) -> MCTSResult:
+        """
+        Run batched MCTS from the board's position.
+
+        The board is walked in place with push/undo and restored before returning.
+
+        Args:
+            board: Position to search
+
+        Returns:
+            MCTSResult: Most visited move and search statistics
+        """
+        start = time.perf_counter()
+        deadline = start + self.time_budget_ms / 1000
+        root = self._reuse_root(board)
+        if root.terminal_value is not None:
+            return MCTSResult(None, root.visits, 0.0, 0, 0, 0.0)
+
+        simulator = self._simulator(board)
+        cell_count = board.geometry.cell_count
+        start_ply = board.ply
+        per_leaf = self.rollouts_per_leaf
+        nodes = rollouts = 0
+        # Start with a single leaf to time the playouts, then size batches to the remaining budget
+        batch_size = 1
+
+        while rollouts < self.rollouts and time.perf_counter() < deadline:
+            leaves, rows, movers = [], [], []
+            for _ in range(batch_size):
+                node = self._expand(self._select(root, board), board)
+                nodes += node.visits == 0
+
+                # Virtual loss: count the visit now so the next selection spreads out
+                walker = node
+                while walker is not None:
+                    walker.visits += 1
+                    walker = walker.parent
+
+                if node.terminal_value is not None:
+                    self._backpropagate(node, node.terminal_value)
+                    rollouts += 1
+                else:
+                    leaves.append(node)
+                    rows.append(BatchSimulator.to_cells(board.x_bits, board.o_bits, cell_count))
+                    movers.append(board.current_player)
+
+                while board.ply > start_ply:
+                    board.undo_move()
+
+            if not leaves:
+                continue
+
+            # One vectorized call finishes every playout of the batch
+            batch_start = time.perf_counter()
+            starts = np.repeat(np.stack(rows), per_leaf, axis=0)
+            to_move = np.repeat(np.array([X if mover == settings.PLAYER_X else O for mover in movers]), per_leaf)
+            winners = np.empty(len(starts), dtype=np.int8)
+            for side in (X, O):
+                selected = to_move == side
+                if selected.any():
+                    winners[selected] = simulator.rollout(starts[selected], side, self.policy)
+            rollouts += len(starts)
+            now = time.perf_counter()
+            per_leaf_seconds = (now - batch_start) / len(leaves)
+            affordable = int((deadline - now) / per_leaf_seconds) if per_leaf_seconds else self.batch_size
+            batch_size = max(1, min(self.batch_size, affordable))
+
+            # Score each leaf for the player who moved into it (the side not to move)
+            scores = (winners.reshape(len(leaves), per_leaf) * -to_move.reshape(len(leaves), per_leaf) + 1) / 2
+            for leaf, score in zip(leaves, scores.mean(axis=1)):
+                self._backpropagate(leaf, float(score))
+
+        if not root.children:
+            # Budget ran out before the first expansion
+            self._expand(root, board)
+            board.undo_move()
+        best = max(root.children.values(), key=lambda child: child.visits)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        result = MCTSResult(
+            move=board.geometry.coords[best.move],
+            visits=best.visits,
+            win_rate=best.value / best.visits if best.visits else 0.0,
+            nodes=nodes,
+            rollouts=rollouts,
+            elapsed_ms=elapsed_ms,
+        )
+        logger.info(
+            f"MCTS chose {result.move} ({result.visits} visits, win rate {result.win_rate:.2f}, "
+            f"{result.nodes_per_sec:,.0f} nodes/s, {result.rollouts_per_sec:,.0f} rollouts/s)"
+        )
+        return result
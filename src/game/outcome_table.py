@@ -0,0 +1,260 @@
+"""
+Precomputed perfect-play table for every reachable 3x3 position.
+
+The build step enumerates the ~5.5k positions reachable from the empty
+board once and writes a flat binary file with one 32-bit record per base-3
+position code (X = 1, O = 2, cell ``i`` weighted by ``3**i``):
+
+    bits 0-8    legal move mask
+    bits 9-17   optimal move mask
+    bits 18-19  perfect-play outcome (0 unreachable, 1 X wins, 2 O wins, 3 draw)
+    bit  20     game already over
+
+At runtime the file is memory-mapped read-only, so every process (including
+each Streamlit worker) shares the same physical pages and a lookup is a
+single unpack with no solving.
+
+Build:
+    python -m src.game.outcome_table [--output PATH]
+"""
+
+import argparse
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from src.config.settings import settings
+from src.game.board import TicTacToeBoard, get_geometry
+from src.game.solver import Solver
+from src.utils.logger import logger
+
+MAGIC = b"TTTO"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHBBI")  # magic, version, board size, win length, record count
+RECORD = struct.Struct("<I")
+
+SIZE = 3
+CELL_COUNT = SIZE * SIZE
+RECORD_COUNT = 3 ** CELL_COUNT
+
+OUTCOME_UNREACHABLE, OUTCOME_X_WINS, OUTCOME_O_WINS, OUTCOME_DRAW = 0, 1, 2, 3
+OUTCOME_NAMES = {
+    OUTCOME_UNREACHABLE: "unreachable",
+    OUTCOME_X_WINS: f"Player {settings.PLAYER_X} wins",
+    OUTCOME_O_WINS: f"Player {settings.PLAYER_O} wins",
+    OUTCOME_DRAW: "Draw",
+}
+
+# Base-3 weight of every 9-bit occupancy pattern, so a position code is two lookups
+_TRITS = tuple(sum(3 ** i for i in range(CELL_COUNT) if bits >> i & 1) for bits in range(1 << CELL_COUNT))
+
+
+def position_code(x_bits: int, o_bits: int) -> int:
+    """
+    Base-3 code of a 3x3 position.
+
+    Args:
+        x_bits: Bitboard of X marks
+        o_bits: Bitboard of O marks
+
+    Returns:
+        int: Index of the position in the table
+    """
+    return _TRITS[x_bits] + 2 * _TRITS[o_bits]
+
+
+def _mask_to_moves(mask: int) -> List[Tuple[int, int]]:
+    """Convert a 9-bit cell mask to (row, col) moves."""
+    return [divmod(index, SIZE) for index in range(CELL_COUNT) if mask >> index & 1]
+
+
+@dataclass(frozen=True)
+class OutcomeEntry:
+    """Decoded table record for one position."""
+
+    outcome: int
+    optimal_mask: int
+    legal_mask: int
+    terminal: bool
+
+    @property
+    def reachable(self) -> bool:
+        """Whether the position can occur in a legal game."""
+        return self.outcome != OUTCOME_UNREACHABLE
+
+    @property
+    def optimal_moves(self) -> List[Tuple[int, int]]:
+        """Moves that preserve the perfect-play outcome."""
+        return _mask_to_moves(self.optimal_mask)
+
+    @property
+    def legal_moves(self) -> List[Tuple[int, int]]:
+        """Empty cells, or none if the game is over."""
+        return _mask_to_moves(self.legal_mask)
+
+    @property
+    def outcome_name(self) -> str:
+        """Human readable outcome."""
+        return OUTCOME_NAMES[self.outcome]
+
+
+class OutcomeTable:
+    """Read-only, memory-mapped view of a built outcome table."""
+
+    def __init__(self, path: str):
+        """
+        Open and validate a table file.
+
+        Args:
+            path: Location of the binary table
+
+        Raises:
+            ValueError: If the file is not a compatible outcome table
+        """
+        self.path = path
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, size, win_length, count = HEADER.unpack_from(self._map, 0)
+        expected_length = HEADER.size + count * RECORD.size
+        if (magic, version, size, win_length, count) != (MAGIC, FORMAT_VERSION, SIZE, SIZE, RECORD_COUNT) \
+                or len(self._map) != expected_length:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} 3x3 outcome table")
+
+    def lookup_code(self, code: int) -> OutcomeEntry:
+        """
+        Fetch the record for a position code.
+
+        Args:
+            code: Base-3 position code
+
+        Returns:
+            OutcomeEntry: Decoded record
+        """
+        (record,) = RECORD.unpack_from(self._map, HEADER.size + code * RECORD.size)
+        return OutcomeEntry(
+            outcome=record >> 18 & 0b11,
+            optimal_mask=record >> 9 & 0x1FF,
+            legal_mask=record & 0x1FF,
+            terminal=bool(record >> 20 & 1),
+        )
+
+    def lookup(self, board: TicTacToeBoard) -> OutcomeEntry:
+        """
+        Fetch the record for a board position.
+
+        Args:
+            board: A 3x3 (3 in a row) board
+
+        Returns:
+            OutcomeEntry: Decoded record
+        """
+        return self.lookup_code(position_code(board.x_bits, board.o_bits))
+
+    def close(self):
+        """Release the memory map."""
+        self._map.close()
+
+
+def build(path: str) -> Dict[str, int]:
+    """
+    Enumerate every reachable position, solve it and write the table.
+
+    Args:
+        path: Destination of the binary table
+
+    Returns:
+        Dict[str, int]: Counts of reachable, terminal and X/O/draw positions
+    """
+    geometry = get_geometry(SIZE, SIZE)
+    solver = Solver(geometry)
+    records: Dict[int, int] = {}
+
+    def completes_line(bits: int) -> bool:
+        return any(bits & mask == mask for mask in geometry.win_masks)
+
+    stack = [(0, 0)]
+    while stack:
+        x_bits, o_bits = stack.pop()
+        code = position_code(x_bits, o_bits)
+        if code in records:
+            continue
+
+        x_to_move = bin(x_bits).count("1") == bin(o_bits).count("1")
+        own, opp = (x_bits, o_bits) if x_to_move else (o_bits, x_bits)
+        occupied = x_bits | o_bits
+
+        if completes_line(opp) or occupied == geometry.full_mask:
+            if completes_line(opp):
+                outcome = OUTCOME_O_WINS if x_to_move else OUTCOME_X_WINS
+            else:
+                outcome = OUTCOME_DRAW
+            records[code] = outcome << 18 | 1 << 20
+            continue
+
+        scores = solver.score_position(own, opp)
+        best = max(scores.values())
+        optimal_mask = sum(1 << index for index, value in scores.items() if value == best)
+        legal_mask = ~occupied & geometry.full_mask
+        if best == 0:
+            outcome = OUTCOME_DRAW
+        else:
+            outcome = OUTCOME_X_WINS if (best > 0) == x_to_move else OUTCOME_O_WINS
+        records[code] = outcome << 18 | optimal_mask << 9 | legal_mask
+
+        for index in range(CELL_COUNT):
+            bit = 1 << index
+            if not occupied & bit:
+                stack.append((x_bits | bit, o_bits) if x_to_move else (x_bits, o_bits | bit))
+
+    payload = bytearray(HEADER.size + RECORD_COUNT * RECORD.size)
+    HEADER.pack_into(payload, 0, MAGIC, FORMAT_VERSION, SIZE, SIZE, RECORD_COUNT)
+    for code, record in records.items():
+        RECORD.pack_into(payload, HEADER.size + code * RECORD.size, record)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(payload)
+    os.replace(tmp_path, path)
+
+    outcomes = [record >> 18 & 0b11 for record in records.values()]
+    summary = {
+        "reachable": len(records),
+        "terminal": sum(record >> 20 & 1 for record in records.values()),
+        "x_wins": outcomes.count(OUTCOME_X_WINS),
+        "o_wins": outcomes.count(OUTCOME_O_WINS),
+        "draws": outcomes.count(OUTCOME_DRAW),
+    }
+    logger.info(f"Wrote outcome table to {path}: {summary}")
+    return summary
+
+
+_table: Optional[OutcomeTable] = None
+_table_missing = False
+
+
+def get_outcome_table() -> Optional[OutcomeTable]:
+    """
+    Get the process-wide table, mapping it on first use.
+
+    Returns:
+        Optional[OutcomeTable]: The shared table, or None if the file is unavailable
+    """
+    global _table, _table_missing
+    if _table is None and not _table_missing:
+        try:
+            _table = OutcomeTable(settings.OUTCOME_TABLE_PATH)
+            logger.info(f"Mapped outcome table from {settings.OUTCOME_TABLE_PATH}")
+        except (OSError, ValueError) as e:
+            _table_missing = True
+            logger.warning(f"Outcome table unavailable, falling back to the solver: {str(e)}")
+    return _table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the 3x3 perfect-play outcome table.")
+    parser.add_argument("--output", default=settings.OUTCOME_TABLE_PATH, help="destination file")
+    print(build(parser.parse_args().output))
@@ -0,0 +1,272 @@
+"""
+Glicko ratings for models, updated incrementally or recomputed in batch.
+
+A rating is a strength estimate plus a rating deviation (RD): the standard
+deviation of that estimate, so rating +/- 1.96 RD is a 95% confidence
+interval. Draws count as half a win, and the update weighs each result by
+the opponent's rating and RD, so beating a strong, well-known model moves a
+rating more than beating a weak or new one. A model's RD grows back towards
+the initial RD for every rating period (settings.RATING_PERIOD_HOURS) it
+does not play.
+
+Every model has three ratings: overall, as X (rated only against O ratings)
+and as O (rated only against X ratings), so the first-move advantage shows
+up as the gap between a model's two colour ratings instead of distorting
+the overall one. Error games are not rated, and a model playing itself
+only updates its colour ratings.
+
+Glicko updates all ratings at the end of each rating period from the
+ratings at its start. Each player keeps those start values and running
+sums over the period's games, so ``RatingEngine.update`` folds one result
+in at O(1) and gives the same ratings as ``recompute``, which replays a
+whole history period by period with NumPy operations over each period's
+games.
+
+Usage:
+    python -m src.game.ratings [--recompute]
+"""
+
+import argparse
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+
+Q = math.log(10) / 400
+# Overall ratings are stored under this colour, next to "X" and "O"
+OVERALL = ""
+Z_95 = 1.96
+# X's score for each rated outcome; error games are not rated
+SCORES = {settings.PLAYER_X: 1.0, settings.PLAYER_O: 0.0, "draw": 0.5}
+
+# Player state: [period, start rating, start RD, sum of g^2 E (1 - E), sum of g (s - E), games]
+PlayerState = List[float]
+
+
+@dataclass
+class Rating:
+    """A model's rating with one colour, or over both when colour is None."""
+
+    model: str
+    colour: Optional[str]
+    rating: float
+    deviation: float
+    games: int
+
+    @property
+    def interval(self) -> Tuple[float, float]:
+        """95% confidence interval of the rating."""
+        return self.rating - Z_95 * self.deviation, self.rating + Z_95 * self.deviation
+
+
+def _g(deviation):
+    """Glicko's attenuation of a result by the opponent's RD (floats or arrays)."""
+    return 1 / np.sqrt(1 + 3 * Q**2 * deviation**2 / math.pi**2)
+
+
+def _expected(rating, opponent, opponent_g):
+    """Expected score against an opponent (floats or arrays)."""
+    return 1 / (1 + 10 ** (-opponent_g * (rating - opponent) / 400))
+
+
+class RatingEngine:
+    """Glicko ratings of (model, colour) players, updated one result at a time."""
+
+    def __init__(self, states: Optional[Dict[Tuple[str, str], PlayerState]] = None):
+        """
+        Create an engine.
+
+        Args:
+            states: Player states to continue from, keyed by (model, colour); empty by default
+        """
+        self.states = states if states is not None else {}
+        self.initial = settings.RATING_INITIAL
+        self.initial_deviation = settings.RATING_DEVIATION
+        self.growth = settings.RATING_DEVIATION_GROWTH
+        self.period_seconds = settings.RATING_PERIOD_HOURS * 3600
+
+    def period(self, played_at: float) -> int:
+        """Rating period of a Unix time."""
+        return int(played_at // self.period_seconds)
+
+    def _current(self, state: PlayerState) -> Tuple[float, float]:
+        """Rating and RD of a player after the games so far in its period."""
+        _, rating, deviation, variance, delta, _ = state
+        precision = 1 / deviation**2 + Q**2 * variance
+        return float(rating + Q * delta / precision), math.sqrt(1 / precision)
+
+    def _decayed(self, deviation: float, periods: float) -> float:
+        """RD after some rating periods without games."""
+        return min(math.sqrt(deviation**2 + self.growth**2 * max(periods, 0)), self.initial_deviation)
+
+    def _state(self, key: Tuple[str, str], period: int) -> PlayerState:
+        """A player's state, rolled forward to start the given period if it has not yet."""
+        state = self.states.get(key)
+        if state is None:
+            state = self.states[key] = [period, self.initial, self.initial_deviation, 0.0, 0.0, 0]
+        elif state[0] < period:
+            rating, deviation = self._current(state)
+            state[:5] = [period, rating, self._decayed(deviation, period - state[0]), 0.0, 0.0]
+        return state
+
+    def _rate(self, a: Tuple[str, str], b: Tuple[str, str], score: float, period: int):
+        """Add one game between two players, a scoring `score` against b."""
+        state_a, state_b = self._state(a, period), self._state(b, period)
+        # Games played late into a period the other side has already left count in the later one
+        period = max(state_a[0], state_b[0])
+        state_a, state_b = self._state(a, period), self._state(b, period)
+        for state, opponent, s in ((state_a, state_b, score), (state_b, state_a, 1 - score)):
+            g = float(_g(opponent[2]))
+            expected = float(_expected(state[1], opponent[1], g))
+            state[3] += g**2 * expected * (1 - expected)
+            state[4] += g * (s - expected)
+            state[5] += 1
+
+    def update(self, model_x: str, model_o: str, outcome: str, played_at: float):
+        """
+        Fold one finished game into the ratings.
+
+        Args:
+            model_x: Model that played X
+            model_o: Model that played O
+            outcome: "X", "O", "draw" or "error" (not rated)
+            played_at: Unix time the game finished
+        """
+        score = SCORES.get(outcome)
+        if score is None:
+            return
+        period = self.period(played_at)
+        if model_x != model_o:
+            self._rate((model_x, OVERALL), (model_o, OVERALL), score, period)
+        self._rate((model_x, settings.PLAYER_X), (model_o, settings.PLAYER_O), score, period)
+
+    def ratings(self, by_colour: bool = False, now: Optional[float] = None) -> List[Rating]:
+        """
+        Current ratings, with RDs grown for the periods since each player last played.
+
+        Args:
+            by_colour: Ratings as X and as O instead of overall ratings
+            now: Unix time to grow RDs to (default: now)
+
+        Returns:
+            List[Rating]: Ratings ordered by the low end of their 95% interval, highest first
+        """
+        period = self.period(now or time.time())
+        ratings = []
+        for (model, colour), state in self.states.items():
+            if (colour != OVERALL) != by_colour:
+                continue
+            rating, deviation = self._current(state)
+            ratings.append(
+                Rating(model, colour or None, rating, self._decayed(deviation, period - state[0]), int(state[5]))
+            )
+        return sorted(ratings, key=lambda r: (-r.interval[0], r.model, r.colour or ""))
+
+
+def _replay(a: np.ndarray, b: np.ndarray, score: np.ndarray, period: np.ndarray, players: int, engine: RatingEngine):
+    """
+    Glicko over a game history, vectorized over the games of each period.
+
+    Args:
+        a, b: Player indices of each game
+        score: a's score in each game
+        period: Rating period of each game, non-decreasing
+        players: Number of players
+        engine: Engine whose settings to use
+
+    Returns:
+        np.ndarray: (players, 6) states in PlayerState order; period -1 for players without games
+    """
+    state = np.zeros((players, 6))
+    state[:, 0] = -1
+    state[:, 1] = engine.initial
+    state[:, 2] = engine.initial_deviation
+    starts = np.flatnonzero(np.r_[True, period[1:] != period[:-1]])
+    for start, end in zip(starts, np.r_[starts[1:], len(period)]):
+        p = period[start]
+        pa, pb, s = a[start:end], b[start:end], score[start:end]
+
+        # Start the period for everyone who plays in it: fold in their last period and grow the RD
+        active = np.unique(np.r_[pa, pb])
+        returning = active[state[active, 0] >= 0]
+        last = state[returning]
+        precision = 1 / last[:, 2] ** 2 + Q**2 * last[:, 3]
+        grown = np.sqrt(1 / precision + engine.growth**2 * (p - last[:, 0]))
+        state[returning, 1] = last[:, 1] + Q * last[:, 4] / precision
+        state[returning, 2] = np.minimum(grown, engine.initial_deviation)
+        state[active, 0] = p
+        state[active, 3:5] = 0
+
+        # Every game of the period is scored against the ratings at its start
+        for me, opponent, my_score in ((pa, pb, s), (pb, pa, 1 - s)):
+            g = _g(state[opponent, 2])
+            expected = _expected(state[me, 1], state[opponent, 1], g)
+            np.add.at(state[:, 3], me, g**2 * expected * (1 - expected))
+            np.add.at(state[:, 4], me, g * (my_score - expected))
+            np.add.at(state[:, 5], me, 1)
+    return state
+
+
+def recompute(
+    model_x: Sequence[str], model_o: Sequence[str], outcomes: Sequence[str], played_at: Sequence[float]
+) -> RatingEngine:
+    """
+    Rate a whole game history from scratch.
+
+    Args:
+        model_x: X model of each game, in the order the games were played
+        model_o: O model of each game
+        outcomes: "X", "O", "draw" or "error" of each game
+        played_at: Unix time of each game
+
+    Returns:
+        RatingEngine: Engine holding the resulting player states, ready for incremental updates
+    """
+    engine = RatingEngine()
+    outcomes = np.asarray(outcomes, dtype=object)
+    rated = np.isin(outcomes, list(SCORES))
+    if not rated.any():
+        return engine
+    score = np.vectorize(SCORES.get, otypes=[float])(outcomes[rated])
+    period = (np.asarray(played_at, dtype=float)[rated] // engine.period_seconds).astype(np.int64)
+    models, codes = np.unique(np.r_[np.asarray(model_x)[rated], np.asarray(model_o)[rated]], return_inverse=True)
+    x, o = codes[: len(score)], codes[len(score):]
+    order = np.argsort(period, kind="stable")
+    x, o, score, period = x[order], o[order], score[order], period[order]
+
+    pools = (
+        # Overall: models against each other, leaving out self-play
+        (OVERALL, OVERALL, x != o, 0),
+        # By colour: X ratings against O ratings, the O players numbered after the X ones
+        (settings.PLAYER_X, settings.PLAYER_O, np.ones(len(score), dtype=bool), len(models)),
+    )
+    for colour_a, colour_b, games, offset in pools:
+        state = _replay(x[games], o[games] + offset, score[games], period[games], len(models) + offset, engine)
+        for index in np.flatnonzero(state[:, 0] >= 0):
+            model, colour = (models[index], colour_a) if index < len(models) else (models[index - offset], colour_b)
+            engine.states[(str(model), colour)] = state[index].tolist()
+    return engine
+
+
+if __name__ == "__main__":
+    from src.game.result_store import get_result_store
+
+    parser = argparse.ArgumentParser(description="Show model ratings from the result store.")
+    parser.add_argument("--recompute", action="store_true", help="recompute all ratings from the stored games first")
+    args = parser.parse_args()
+
+    store = get_result_store()
+    if args.recompute:
+        start = time.perf_counter()
+        store.recompute_ratings()
+        print(f"Recomputed ratings over {len(store):,} games in {time.perf_counter() - start:.2f}s")
+    colours = {(r.model, r.colour): r for r in store.ratings(by_colour=True)}
+    print(f"{'model':<40} {'rating':>16} {'as X':>16} {'as O':>16} {'games':>7}")
+    for r in store.ratings():
+        cells = [r] + [colours.get((r.model, colour)) for colour in (settings.PLAYER_X, settings.PLAYER_O)]
+        shown = [f"{c.rating:.0f} ± {Z_95 * c.deviation:.0f}" if c else "-" for c in cells]
+        print(f"{r.model:<40} {shown[0]:>16} {shown[1]:>16} {shown[2]:>16} {r.games:>7}")
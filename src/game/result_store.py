@@ -0,0 +1,541 @@
+"""
+Append-only store of played games and their moves.
+
+Every finished game, whether played in the app, by ``src.run_matches`` or by a
+tournament, is appended to a SQLite database in WAL mode, so readers never
+block the writer and results outlive the browser session. Rows are never
+updated or deleted; triggers reject both.
+
+Writes are off the hot path: ``record`` only queues the rows, and a
+background thread inserts whatever has queued up in one transaction per
+batch (settings.RESULT_STORE_BATCH_SIZE rows, or every
+settings.RESULT_STORE_FLUSH_MS).
+
+Aggregates are pre-computed: insert triggers keep per-outcome totals (overall
+and per source), per-model-and-colour records and per-pairing records up to date, so the
+sidebar reads a few dozen rows however many games are stored. Games may
+carry a unique key (tournaments use their fixture keys); a game whose key is
+already stored is skipped, so replaying it never counts it twice. Model ratings
+(``src.game.ratings``) are updated from each batch in the same transaction;
+unlike the games they are derived state, and ``recompute_ratings`` rebuilds
+them from the stored history.
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from src.config.settings import settings
+from src.game.match_runner import MatchResult
+from src.game.ratings import Rating, RatingEngine, recompute
+from src.utils.logger import logger
+
+OUTCOMES = (settings.PLAYER_X, settings.PLAYER_O, "draw", "error")
+
+# Queue marker asking the writer to write its batch without waiting for more games
+_FLUSH = object()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    source TEXT NOT NULL,
+    model_x TEXT NOT NULL,
+    model_o TEXT NOT NULL,
+    board_size INTEGER NOT NULL,
+    win_length INTEGER NOT NULL,
+    prompt_format TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    moves INTEGER NOT NULL,
+    elapsed REAL NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    key TEXT
+);
+CREATE INDEX IF NOT EXISTS games_pair ON games (model_x, model_o, played_at);
+CREATE INDEX IF NOT EXISTS games_model_o ON games (model_o, outcome);
+CREATE INDEX IF NOT EXISTS games_outcome ON games (outcome, played_at);
+CREATE INDEX IF NOT EXISTS games_played_at ON games (played_at);
+
+CREATE TABLE IF NOT EXISTS moves (
+    game_id INTEGER NOT NULL,
+    ply INTEGER NOT NULL,
+    cell INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    latency_ms REAL NOT NULL,
+    requests INTEGER NOT NULL,
+    wasted INTEGER NOT NULL,
+    fallback INTEGER NOT NULL,
+    cached INTEGER NOT NULL,
+    PRIMARY KEY (game_id, ply)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS outcome_totals (
+    outcome TEXT PRIMARY KEY,
+    games INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS model_stats (
+    model TEXT NOT NULL,
+    colour TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    draws INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    PRIMARY KEY (model, colour)
+);
+CREATE TABLE IF NOT EXISTS pair_stats (
+    model_x TEXT NOT NULL,
+    model_o TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    x_wins INTEGER NOT NULL,
+    o_wins INTEGER NOT NULL,
+    draws INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    PRIMARY KEY (model_x, model_o)
+);
+
+CREATE TABLE IF NOT EXISTS ratings (
+    model TEXT NOT NULL,
+    colour TEXT NOT NULL,
+    period INTEGER NOT NULL,
+    rating REAL NOT NULL,
+    deviation REAL NOT NULL,
+    variance REAL NOT NULL,
+    delta REAL NOT NULL,
+    games INTEGER NOT NULL,
+    PRIMARY KEY (model, colour)
+);
+
+CREATE TRIGGER IF NOT EXISTS games_aggregate AFTER INSERT ON games BEGIN
+    INSERT INTO outcome_totals VALUES (NEW.outcome, 1)
+        ON CONFLICT (outcome) DO UPDATE SET games = games + 1;
+    INSERT INTO model_stats VALUES (
+        NEW.model_x, 'X', 1, NEW.outcome = 'X', NEW.outcome = 'draw', NEW.outcome = 'O', NEW.outcome = 'error'
+    ) ON CONFLICT (model, colour) DO UPDATE SET
+        games = games + 1, wins = wins + excluded.wins, draws = draws + excluded.draws,
+        losses = losses + excluded.losses, errors = errors + excluded.errors;
+    INSERT INTO model_stats VALUES (
+        NEW.model_o, 'O', 1, NEW.outcome = 'O', NEW.outcome = 'draw', NEW.outcome = 'X', NEW.outcome = 'error'
+    ) ON CONFLICT (model, colour) DO UPDATE SET
+        games = games + 1, wins = wins + excluded.wins, draws = draws + excluded.draws,
+        losses = losses + excluded.losses, errors = errors + excluded.errors;
+    INSERT INTO pair_stats VALUES (
+        NEW.model_x, NEW.model_o, 1, NEW.outcome = 'X', NEW.outcome = 'O', NEW.outcome = 'draw', NEW.outcome = 'error'
+    ) ON CONFLICT (model_x, model_o) DO UPDATE SET
+        games = games + 1, x_wins = x_wins + excluded.x_wins, o_wins = o_wins + excluded.o_wins,
+        draws = draws + excluded.draws, errors = errors + excluded.errors;
+END;
+
+-- Stores from before per-source totals count their games once, under the write lock, before the trigger exists
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS source_totals (
+    source TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    PRIMARY KEY (source, outcome)
+);
+INSERT INTO source_totals
+    SELECT source, outcome, COUNT(*) FROM games
+    WHERE NOT EXISTS (SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'games_source_totals')
+    GROUP BY source, outcome;
+CREATE TRIGGER IF NOT EXISTS games_source_totals AFTER INSERT ON games BEGIN
+    INSERT INTO source_totals VALUES (NEW.source, NEW.outcome, 1)
+        ON CONFLICT (source, outcome) DO UPDATE SET games = games + 1;
+END;
+COMMIT;
+
+CREATE TRIGGER IF NOT EXISTS games_no_update BEFORE UPDATE ON games BEGIN
+    SELECT RAISE(ABORT, 'games are append-only');
+END;
+CREATE TRIGGER IF NOT EXISTS games_no_delete BEFORE DELETE ON games BEGIN
+    SELECT RAISE(ABORT, 'games are append-only');
+END;
+CREATE TRIGGER IF NOT EXISTS moves_no_update BEFORE UPDATE ON moves BEGIN
+    SELECT RAISE(ABORT, 'moves are append-only');
+END;
+CREATE TRIGGER IF NOT EXISTS moves_no_delete BEFORE DELETE ON moves BEGIN
+    SELECT RAISE(ABORT, 'moves are append-only');
+END;
+"""
+
+GAME_COLUMNS = (
+    "played_at, source, model_x, model_o, board_size, win_length, prompt_format, "
+    "outcome, moves, elapsed, input_tokens, output_tokens, key"
+)
+
+
+@dataclass
+class ModelRecord:
+    """A model's results with one colour, or with both when colour is None."""
+
+    model: str
+    colour: Optional[str]
+    games: int
+    wins: int
+    draws: int
+    losses: int
+    errors: int
+
+    @property
+    def win_rate(self) -> float:
+        """Share of games won."""
+        return self.wins / self.games if self.games else 0.0
+
+
+class ResultStore:
+    """SQLite store of games and moves with a batching background writer."""
+
+    def __init__(self, path: str, batch_size: Optional[int] = None, flush_ms: Optional[float] = None):
+        """
+        Open (or create) a store.
+
+        Args:
+            path: SQLite file
+            batch_size: Games inserted per transaction at most (default: settings.RESULT_STORE_BATCH_SIZE)
+            flush_ms: Longest time a queued game waits before being written (default: settings.RESULT_STORE_FLUSH_MS)
+        """
+        self.path = path
+        self.batch_size = batch_size or settings.RESULT_STORE_BATCH_SIZE
+        self.flush_ms = settings.RESULT_STORE_FLUSH_MS if flush_ms is None else flush_ms
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        # The writer owns its connection; readers share another one, serialized by the lock
+        self._write_conn = self._connect()
+        self._write_conn.executescript(SCHEMA)
+        # Stores written before games had keys get the column; the unique index skips unkeyed games
+        columns = [row[1] for row in self._write_conn.execute("PRAGMA table_info(games)")]
+        if "key" not in columns:
+            self._write_conn.execute("ALTER TABLE games ADD COLUMN key TEXT")
+        self._write_conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS games_key ON games (key) WHERE key IS NOT NULL")
+        self._write_conn.commit()
+        # Stores written before ratings existed get theirs from the history once
+        rated = self._write_conn.execute("SELECT EXISTS (SELECT 1 FROM ratings)").fetchone()[0]
+        if not rated and self._write_conn.execute("SELECT EXISTS (SELECT 1 FROM games)").fetchone()[0]:
+            self.recompute_ratings()
+        self._read_conn = self._connect()
+        self._read_lock = threading.Lock()
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="result-store", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a WAL-mode connection usable from any thread."""
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps commits durable across crashes of the process without an fsync per batch
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _rows(
+        result: MatchResult, source: str, played_at: float, key: Optional[str] = None
+    ) -> Tuple[tuple, List[tuple]]:
+        """Game row and move rows (without the game id) of a result."""
+        game = (
+            played_at,
+            source,
+            result.model_x,
+            result.model_o,
+            result.board_size,
+            result.win_length,
+            result.prompt_format,
+            result.outcome,
+            len(result.moves),
+            result.elapsed,
+            result.input_tokens,
+            result.output_tokens,
+            key,
+        )
+        moves = [
+            (
+                ply,
+                row * result.board_size + col,
+                stats.input_tokens,
+                stats.output_tokens,
+                stats.latency_ms,
+                stats.requests,
+                stats.wasted,
+                stats.fallback,
+                stats.cached,
+            )
+            for ply, ((row, col), stats) in enumerate(zip(result.moves, result.move_stats))
+        ]
+        return game, moves
+
+    def record(
+        self, result: MatchResult, source: str = "app", played_at: Optional[float] = None, key: Optional[str] = None
+    ):
+        """
+        Queue a finished game for writing; returns immediately.
+
+        Args:
+            result: The game
+            source: What played it, e.g. "app", "cli" or "tournament"
+            played_at: Unix time the game finished (default: now)
+            key: Unique id of the game; a game with a key that is already stored is not stored again
+        """
+        if self._closed:
+            logger.warning("Result store is closed; game not recorded")
+            return
+        self._queue.put(self._rows(result, source, played_at or time.time(), key))
+
+    def _write_loop(self):
+        """Insert queued games in batches until the store is closed."""
+        while True:
+            item = self._queue.get()
+            batch, taken, stop = [], 1, item is None
+            if item is not None and item is not _FLUSH:
+                batch.append(item)
+                # Let a burst accumulate, then take everything queued so far
+                deadline = time.monotonic() + self.flush_ms / 1000
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    taken += 1
+                    if item is None or item is _FLUSH:
+                        stop = item is None
+                        break
+                    batch.append(item)
+            if batch:
+                self._write(batch)
+            for _ in range(taken):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, batch: List[Tuple[tuple, List[tuple]]]):
+        """Insert a batch of games and their moves in one transaction."""
+        try:
+            with self._write_conn:
+                inserted = []
+                for game, moves in batch:
+                    # Ignored (and so neither aggregated nor rated) when the game's key is already stored
+                    cursor = self._write_conn.execute(
+                        f"INSERT OR IGNORE INTO games ({GAME_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        game,
+                    )
+                    if not cursor.rowcount:
+                        continue
+                    inserted.append((game, moves))
+                    self._write_conn.executemany(
+                        "INSERT INTO moves VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [(cursor.lastrowid, *move) for move in moves],
+                    )
+                if inserted:
+                    self._rate(inserted)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write {len(batch)} games to the result store: {e}")
+
+    def _rate(self, batch: List[Tuple[tuple, List[tuple]]]):
+        """Update the ratings of the batch's models, inside the batch's transaction."""
+        models = {model for game, _ in batch for model in (game[2], game[3])}
+        placeholders = ", ".join("?" * len(models))
+        # The transaction holds the write lock, so no other process moves these rows meanwhile
+        rows = self._write_conn.execute(
+            f"SELECT * FROM ratings WHERE model IN ({placeholders})", list(models)
+        ).fetchall()
+        engine = RatingEngine({(row[0], row[1]): list(row[2:]) for row in rows})
+        for game, _ in batch:
+            engine.update(game[2], game[3], game[7], game[0])
+        self._write_conn.executemany(
+            "INSERT OR REPLACE INTO ratings VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(*key, *state) for key, state in engine.states.items()],
+        )
+
+    def recompute_ratings(self):
+        """Rebuild all ratings from the stored games, replacing the incrementally updated ones."""
+        conn = self._connect()
+        try:
+            # Take the write lock first, so no batch lands between reading the history and replacing the ratings
+            conn.execute("BEGIN IMMEDIATE")
+            columns = conn.execute("SELECT model_x, model_o, outcome, played_at FROM games ORDER BY id").fetchall()
+            engine = recompute(*zip(*columns)) if columns else RatingEngine()
+            conn.execute("DELETE FROM ratings")
+            conn.executemany(
+                "INSERT INTO ratings VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(*key, *state) for key, state in engine.states.items()],
+            )
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        logger.info(f"Recomputed ratings of {len(engine.states)} players over {len(columns)} games")
+
+    def flush(self, wait: bool = True):
+        """
+        Write queued games now, without waiting for the batch to fill.
+
+        Args:
+            wait: Block until they are stored; otherwise only wake the writer
+        """
+        self._queue.put(_FLUSH)
+        if wait:
+            self._queue.join()
+
+    def totals(self, source: Optional[str] = None) -> Dict[str, int]:
+        """
+        Games per outcome.
+
+        Args:
+            source: Only count games from this source, e.g. "app" (default: all games)
+
+        Returns:
+            Dict[str, int]: "X", "O", "draw" and "error" counts
+        """
+        with self._read_lock:
+            if source is None:
+                rows = self._read_conn.execute("SELECT outcome, games FROM outcome_totals").fetchall()
+            else:
+                rows = self._read_conn.execute(
+                    "SELECT outcome, games FROM source_totals WHERE source = ?", (source,)
+                ).fetchall()
+        return {**dict.fromkeys(OUTCOMES, 0), **dict(rows)}
+
+    def model_records(self, by_colour: bool = False) -> List[ModelRecord]:
+        """
+        Per-model results.
+
+        Args:
+            by_colour: One record per model and colour instead of one per model
+
+        Returns:
+            List[ModelRecord]: Records ordered by wins, most first
+        """
+        colour = "colour" if by_colour else "NULL"
+        with self._read_lock:
+            rows = self._read_conn.execute(
+                f"SELECT model, {colour}, SUM(games), SUM(wins), SUM(draws), SUM(losses), SUM(errors) "
+                f"FROM model_stats GROUP BY model{', colour' if by_colour else ''} ORDER BY 4 DESC, 3, 1"
+            ).fetchall()
+        return [ModelRecord(*row) for row in rows]
+
+    def pair_records(self) -> Dict[Tuple[str, str], Dict[str, int]]:
+        """
+        Per-pairing results, X model first.
+
+        Returns:
+            Dict[Tuple[str, str], Dict[str, int]]: (model_x, model_o) -> games, x_wins, o_wins, draws, errors
+        """
+        with self._read_lock:
+            cursor = self._read_conn.execute("SELECT * FROM pair_stats")
+            columns = [column[0] for column in cursor.description]
+            rows = cursor.fetchall()
+        return {(row[0], row[1]): dict(zip(columns[2:], row[2:])) for row in rows}
+
+    def keys(self, prefix: str) -> Set[str]:
+        """
+        Keys of the stored games that start with a prefix.
+
+        Args:
+            prefix: Key prefix, e.g. a tournament's run id
+
+        Returns:
+            Set[str]: Matching keys
+        """
+        with self._read_lock:
+            rows = self._read_conn.execute(
+                "SELECT key FROM games WHERE key >= ? AND key < ?", (prefix, prefix + "\U0010ffff")
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def ratings(self, by_colour: bool = False) -> List[Rating]:
+        """
+        Current model ratings.
+
+        Args:
+            by_colour: Ratings as X and as O instead of overall ratings
+
+        Returns:
+            List[Rating]: Ratings ordered by the low end of their 95% interval, highest first
+        """
+        with self._read_lock:
+            rows = self._read_conn.execute("SELECT * FROM ratings").fetchall()
+        return RatingEngine({(row[0], row[1]): list(row[2:]) for row in rows}).ratings(by_colour)
+
+    def games(
+        self,
+        model_x: Optional[str] = None,
+        model_o: Optional[str] = None,
+        outcome: Optional[str] = None,
+        since: Optional[float] = None,
+        batch_size: int = 10_000,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream stored games in insertion order, filtered on indexed columns.
+
+        Args:
+            model_x: Only games with this X model
+            model_o: Only games with this O model
+            outcome: Only games with this outcome
+            since: Only games played at or after this Unix time
+            batch_size: Rows fetched per round trip
+
+        Yields:
+            Dict[str, Any]: Game rows with their id
+        """
+        filters = {"model_x = ?": model_x, "model_o = ?": model_o, "outcome = ?": outcome, "played_at >= ?": since}
+        where = [clause for clause, value in filters.items() if value is not None]
+        query = f"SELECT id, {GAME_COLUMNS} FROM games"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        params = [value for value in filters.values() if value is not None]
+        # A connection of its own, so a long scan does not hold the sidebar's lock
+        conn = self._connect()
+        try:
+            cursor = conn.execute(query + " ORDER BY id", params)
+            columns = [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            conn.close()
+
+    def __len__(self) -> int:
+        """Number of stored games (from the aggregates, without a table scan)."""
+        return sum(self.totals().values())
+
+    def close(self):
+        """Write what is queued and close the connections."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        self._write_conn.close()
+        with self._read_lock:
+            self._read_conn.close()
+
+
+_store: Optional[ResultStore] = None
+_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    """
+    Get the process-wide store, opening it on first use.
+
+    Returns:
+        ResultStore: The shared store; queued games are written when the process exits
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ResultStore(settings.RESULT_STORE_PATH)
+                atexit.register(_store.close)
+                logger.info(f"Opened result store at {settings.RESULT_STORE_PATH} ({len(_store)} games)")
+    return _store
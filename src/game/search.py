@@ -0,0 +1,325 @@
+"""
+Anytime search engine for board variants too large to solve perfectly.
+
+Iterative-deepening negamax with alpha-beta pruning, a transposition table
+keyed on the board's Zobrist hash, and threat-space move ordering: moves
+that win, block a win, or extend open windows are searched first. The
+engine respects a wall-clock budget and returns the best move of the
+deepest fully completed iteration.
+
+The transposition table lives as long as the engine, so it carries over
+between moves of a game. It is cleared when a search starts from an earlier
+ply than the last one (a new game) and when it has reached
+settings.ENGINE_TT_MAX_ENTRIES; once full, a search only updates positions
+already in it.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from src.config.settings import settings
+from src.game.board import TicTacToeBoard, popcount
+from src.utils.logger import logger
+
+WIN_SCORE = 1_000_000
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# How often (in nodes) the clock is checked
+CLOCK_INTERVAL = 16
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget is exhausted."""
+
+
+@dataclass
+class SearchResult:
+    """Best move found by a search and what it cost."""
+
+    move: Optional[Tuple[int, int]]
+    score: int
+    depth: int
+    nodes: int
+    elapsed_ms: float
+
+
+class IterativeDeepeningSearch:
+    """Time-budgeted alpha-beta engine."""
+
+    def __init__(
+        self,
+        time_budget_ms: Optional[int] = None,
+        max_depth: int = 64,
+        neighbourhood: int = 2,
+        max_table_entries: Optional[int] = None,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            time_budget_ms: Wall-clock budget per move (default: settings.ENGINE_TIME_BUDGET_MS)
+            max_depth: Deepest iteration to attempt
+            neighbourhood: Only cells within this distance of a stone are considered on big boards
+            max_table_entries: Transposition table size limit (default: settings.ENGINE_TT_MAX_ENTRIES)
+        """
+        self.time_budget_ms = time_budget_ms or settings.ENGINE_TIME_BUDGET_MS
+        self.max_depth = max_depth
+        self.neighbourhood = neighbourhood
+        self.max_table_entries = max_table_entries or settings.ENGINE_TT_MAX_ENTRIES
+        self.table: Dict[int, Tuple[int, int, int, int]] = {}
+        # Ply of the last searched root, to tell a new game from the next move of the same one
+        self._last_ply = -1
+        self._neighbour_masks: Dict[int, Tuple[int, ...]] = {}
+        self.nodes = 0
+        self._deadline = 0.0
+
+    def _threat_score(self, board: TicTacToeBoard, index: int, own: int, opp: int) -> int:
+        """
+        Rate a move by the windows through its cell.
+
+        Windows free of the opponent score by how many own stones they already hold;
+        windows free of our stones score (slightly less) for blocking.
+
+        Args:
+            board: Position being searched
+            index: Candidate cell
+            own: Bitboard of the player to move
+            opp: Bitboard of the other player
+
+        Returns:
+            int: Ordering score, highest first
+        """
+        k = board.win_length
+        score = 0
+        for mask in board.geometry.cell_win_masks[index]:
+            if not mask & opp:
+                count = popcount(mask & own)
+                score += 1_000_000 if count == k - 1 else 10 ** count
+            if not mask & own:
+                count = popcount(mask & opp)
+                score += 100_000 if count == k - 1 else 10 ** count // 2
+        return score
+
+    def _neighbours(self, size: int) -> Tuple[int, ...]:
+        """
+        Per cell, the bitboard of cells within ``neighbourhood`` of it (built once per size).
+
+        Args:
+            size: Width and height of the board
+
+        Returns:
+            Tuple[int, ...]: One mask per cell index
+        """
+        if size not in self._neighbour_masks:
+            reach = self.neighbourhood
+            self._neighbour_masks[size] = tuple(
+                sum(
+                    1 << (r * size + c)
+                    for r in range(max(0, row - reach), min(size, row + reach + 1))
+                    for c in range(max(0, col - reach), min(size, col + reach + 1))
+                )
+                for row in range(size)
+                for col in range(size)
+            )
+        return self._neighbour_masks[size]
+
+    def _candidates(self, board: TicTacToeBoard, own: int, opp: int, tt_move: int) -> List[int]:
+        """
+        Legal cells worth searching, in threat-space order.
+
+        Args:
+            board: Position being searched
+            own: Bitboard of the player to move
+            opp: Bitboard of the other player
+            tt_move: Best move from the transposition table, or -1
+
+        Returns:
+            List[int]: Cell indices, most promising first
+        """
+        geometry = board.geometry
+        occupied = own | opp
+        if not occupied:
+            centre = board.size // 2
+            return [centre * board.size + centre]
+
+        free = [index for index in range(geometry.cell_count) if not occupied >> index & 1]
+        candidates = free
+        if board.size > 4:
+            neighbours = self._neighbours(board.size)
+            candidates = [index for index in free if occupied & neighbours[index]]
+        if not candidates:
+            candidates = free
+
+        candidates.sort(key=lambda index: self._threat_score(board, index, own, opp), reverse=True)
+        if tt_move in candidates:
+            candidates.remove(tt_move)
+            candidates.insert(0, tt_move)
+        return candidates
+
+    def _evaluate(self, board: TicTacToeBoard, own: int, opp: int) -> int:
+        """
+        Static evaluation for the player to move: open windows weighted by fill.
+
+        Args:
+            board: Position being evaluated
+            own: Bitboard of the player to move
+            opp: Bitboard of the other player
+
+        Returns:
+            int: Positive when the player to move stands better
+        """
+        score = 0
+        occupied = own | opp
+        for mask in board.geometry.win_masks:
+            if not mask & occupied:
+                continue
+            own_count = popcount(mask & own)
+            opp_count = popcount(mask & opp)
+            if own_count and not opp_count:
+                score += 4 ** own_count
+            elif opp_count and not own_count:
+                score -= 4 ** opp_count
+        return score
+
+    def _negamax(self, board: TicTacToeBoard, depth: int, alpha: int, beta: int, ply: int) -> int:
+        """
+        Alpha-beta search from the player to move's point of view.
+
+        Args:
+            board: Position to search; moves are pushed and undone in place
+            depth: Remaining depth
+            alpha: Lower bound of the search window
+            beta: Upper bound of the search window
+            ply: Distance from the root, used to prefer faster wins
+
+        Returns:
+            int: Score of the position
+        """
+        self.nodes += 1
+        if self.nodes % CLOCK_INTERVAL == 0 and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+
+        if board.winner:
+            return -(WIN_SCORE - ply)
+        if board.occupied == board.geometry.full_mask:
+            return 0
+
+        own, opp = (board.x_bits, board.o_bits) if board.current_player == settings.PLAYER_X \
+            else (board.o_bits, board.x_bits)
+        if depth == 0:
+            return self._evaluate(board, own, opp)
+
+        key = board.zobrist_hash
+        tt_move = -1
+        entry = self.table.get(key)
+        if entry is not None:
+            entry_depth, value, flag, tt_move = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        alpha_orig = alpha
+        best, best_move = -WIN_SCORE - 1, -1
+        for index in self._candidates(board, own, opp, tt_move):
+            board.push(index)
+            try:
+                value = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                board.undo_move()
+            if value > best:
+                best, best_move = value, index
+                alpha = max(alpha, value)
+                if alpha >= beta:
+                    break
+
+        flag = UPPER if best <= alpha_orig else LOWER if best >= beta else EXACT
+        if entry is not None or len(self.table) < self.max_table_entries:
+            self.table[key] = (depth, best, flag, best_move)
+        return best
+
+    def _search_root(self, board: TicTacToeBoard, depth: int, first: int) -> Tuple[int, int]:
+        """
+        Search every root move to a fixed depth.
+
+        Args:
+            board: Root position
+            depth: Iteration depth
+            first: Best move of the previous iteration, searched first
+
+        Returns:
+            Tuple[int, int]: (best cell index, score)
+        """
+        own, opp = (board.x_bits, board.o_bits) if board.current_player == settings.PLAYER_X \
+            else (board.o_bits, board.x_bits)
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_move, best = -1, -WIN_SCORE - 1
+        for index in self._candidates(board, own, opp, first):
+            board.push(index)
+            try:
+                value = -self._negamax(board, depth - 1, -beta, -alpha, 1)
+            finally:
+                board.undo_move()
+            if value > best:
+                best, best_move = value, index
+                alpha = max(alpha, value)
+        return best_move, best
+
+    def search(self, board: TicTacToeBoard) -> SearchResult:
+        """
+        Find the best move within the time budget.
+
+        The board is searched in place with push/undo and restored before returning.
+
+        Args:
+            board: Position to search
+
+        Returns:
+            SearchResult: Best move of the deepest completed iteration
+        """
+        start = time.perf_counter()
+        self._deadline = start + self.time_budget_ms / 1000
+        self.nodes = 0
+        start_ply = board.ply
+        if start_ply < self._last_ply or len(self.table) >= self.max_table_entries:
+            self.table.clear()
+        self._last_ply = start_ply
+
+        result = SearchResult(move=None, score=0, depth=0, nodes=0, elapsed_ms=0.0)
+        valid_moves = board.get_valid_moves()
+        if board.winner or not valid_moves:
+            return result
+
+        best_index = -1
+        remaining = len(valid_moves)
+        try:
+            for depth in range(1, min(self.max_depth, remaining) + 1):
+                index, score = self._search_root(board, depth, best_index)
+                best_index = index
+                result.move, result.score, result.depth = board.geometry.coords[index], score, depth
+                if abs(score) >= WIN_SCORE - self.max_depth:
+                    break  # Forced result found
+        except SearchTimeout:
+            pass
+        finally:
+            while board.ply > start_ply:
+                board.undo_move()
+
+        if result.move is None:
+            # Not even depth 1 finished: fall back to the best-ordered legal move
+            own, opp = (board.x_bits, board.o_bits) if board.current_player == settings.PLAYER_X \
+                else (board.o_bits, board.x_bits)
+            result.move = board.geometry.coords[self._candidates(board, own, opp, -1)[0]]
+
+        result.nodes = self.nodes
+        result.elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(
+            f"Engine chose {result.move} at depth {result.depth} "
+            f"({result.nodes} nodes, {result.elapsed_ms:.0f} ms, score {result.score})"
+        )
+        return result
@@ -0,0 +1,232 @@
+"""
+Perfect-play solver for Tic Tac Toe positions.
+
+Negamax search with alpha-beta pruning and a transposition table keyed on
+the canonical form of the position under the 8 board symmetries. Scores are
+always from the point of view of the player to move: 1 win, 0 draw, -1 loss.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from src.config.settings import settings
+from src.game.board import BoardGeometry, TicTacToeBoard, get_geometry
+from src.utils.logger import logger
+
+# Transposition table bound flags
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+@dataclass
+class SolverStats:
+    """Search cost counters for the most recent solver call."""
+
+    nodes: int = 0
+    tt_hits: int = 0
+    tt_size: int = 0
+    elapsed_ms: float = 0.0
+
+
+class Solver:
+    """Alpha-beta solver for one board variant."""
+
+    def __init__(self, geometry: BoardGeometry):
+        """
+        Initialize the solver.
+
+        Args:
+            geometry: Lookup tables of the board variant to solve
+        """
+        self.geometry = geometry
+        self.table: Dict[int, Tuple[int, int]] = {}
+        self.stats = SolverStats()
+
+        # Cells on the most lines are searched first (center, then corners)
+        self.move_order = tuple(sorted(
+            range(geometry.cell_count), key=lambda index: -len(geometry.cell_win_masks[index])
+        ))
+
+    def _own_and_opp(self, board: TicTacToeBoard) -> Tuple[int, int]:
+        """Split the board into (player to move, other player) bitboards."""
+        if board.current_player == settings.PLAYER_X:
+            return board.x_bits, board.o_bits
+        return board.o_bits, board.x_bits
+
+    def _completes_line(self, bits: int, index: int) -> bool:
+        """Check whether ``bits`` fills any window through cell ``index``."""
+        for mask in self.geometry.cell_win_masks[index]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def _negamax(self, own: int, opp: int, alpha: int, beta: int) -> int:
+        """
+        Score a position for the player to move.
+
+        Args:
+            own: Bitboard of the player to move
+            opp: Bitboard of the other player
+            alpha: Lower bound of the search window
+            beta: Upper bound of the search window
+
+        Returns:
+            int: 1 if the player to move wins, 0 for a draw, -1 for a loss
+        """
+        self.stats.nodes += 1
+        occupied = own | opp
+        if occupied == self.geometry.full_mask:
+            return 0
+
+        key, _ = self.geometry.canonical(own, opp)
+        entry = self.table.get(key)
+        if entry is not None:
+            self.stats.tt_hits += 1
+            value, flag = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        alpha_orig = alpha
+        best = -2
+        for index in self.move_order:
+            bit = 1 << index
+            if occupied & bit:
+                continue
+            placed = own | bit
+            if self._completes_line(placed, index):
+                value = 1
+            else:
+                value = -self._negamax(opp, placed, -beta, -alpha)
+            if value > best:
+                best = value
+                alpha = max(alpha, value)
+                if alpha >= beta:
+                    break
+
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table[key] = (best, flag)
+        return best
+
+    def _begin(self):
+        """Reset the per-call counters."""
+        self.stats = SolverStats()
+        return time.perf_counter()
+
+    def _finish(self, start: float, label: str):
+        """Record timing for a finished call."""
+        self.stats.elapsed_ms = (time.perf_counter() - start) * 1000
+        self.stats.tt_size = len(self.table)
+        logger.debug(
+            f"Solver {label}: {self.stats.nodes} nodes, {self.stats.tt_hits} TT hits, "
+            f"{self.stats.tt_size} TT entries, {self.stats.elapsed_ms:.2f} ms"
+        )
+
+    def evaluate(self, board: TicTacToeBoard) -> int:
+        """
+        Game-theoretic value of a position for the player to move.
+
+        Args:
+            board: Position to evaluate
+
+        Returns:
+            int: 1 if the player to move can force a win, 0 for a draw, -1 for a loss
+        """
+        start = self._begin()
+        if board.winner:
+            value = 1 if board.winner == board.current_player else -1
+        else:
+            own, opp = self._own_and_opp(board)
+            value = self._negamax(own, opp, -1, 1)
+        self._finish(start, "evaluate")
+        return value
+
+    def score_position(self, own: int, opp: int) -> Dict[int, int]:
+        """
+        Exact value of every legal move in a raw bitboard position.
+
+        Args:
+            own: Bitboard of the player to move
+            opp: Bitboard of the other player
+
+        Returns:
+            Dict[int, int]: Cell index -> 1 win, 0 draw, -1 loss
+        """
+        scores = {}
+        occupied = own | opp
+        for index in self.move_order:
+            bit = 1 << index
+            if occupied & bit:
+                continue
+            placed = own | bit
+            if self._completes_line(placed, index):
+                scores[index] = 1
+            else:
+                scores[index] = -self._negamax(opp, placed, -1, 1)
+        return scores
+
+    def score_moves(self, board: TicTacToeBoard) -> Dict[Tuple[int, int], int]:
+        """
+        Exact value of every legal move for the player to move.
+
+        Args:
+            board: Position to analyse
+
+        Returns:
+            Dict[Tuple[int, int], int]: (row, col) -> 1 win, 0 draw, -1 loss
+        """
+        start = self._begin()
+        scores = {}
+        if not board.winner:
+            own, opp = self._own_and_opp(board)
+            coords = self.geometry.coords
+            scores = {coords[index]: value for index, value in self.score_position(own, opp).items()}
+        self._finish(start, "score_moves")
+        return scores
+
+    def best_moves(self, board: TicTacToeBoard) -> List[Tuple[int, int]]:
+        """
+        All moves that achieve the best possible outcome.
+
+        Args:
+            board: Position to analyse
+
+        Returns:
+            List[Tuple[int, int]]: Optimal (row, col) moves, empty if the game is over
+        """
+        scores = self.score_moves(board)
+        if not scores:
+            return []
+        best = max(scores.values())
+        return sorted(move for move, value in scores.items() if value == best)
+
+
+_solvers: Dict[Tuple[int, int], Solver] = {}
+
+
+def get_solver(size: Optional[int] = None, win_length: Optional[int] = None) -> Solver:
+    """
+    Get the shared solver for a board variant, so its transposition table is reused.
+
+    Args:
+        size: Width and height of the board (default: settings.BOARD_SIZE)
+        win_length: Marks in a row needed to win (default: settings.WIN_LENGTH)
+
+    Returns:
+        Solver: Cached solver instance
+    """
+    size = size or settings.BOARD_SIZE
+    win_length = min(win_length or settings.WIN_LENGTH, size)
+    key = (size, win_length)
+    if key not in _solvers:
+        _solvers[key] = Solver(get_geometry(size, win_length))
+    return _solvers[key]
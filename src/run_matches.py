@@ -0,0 +1,102 @@
+"""
+Headless batch runner: play many games between two models without the UI.
+
+Models are given as MODEL_OPTIONS names or "provider:model_name" strings.
+Games run concurrently on the asyncio match engine, each one a MatchRunner,
+under the same rate limits, retries, cache, speculation and hedging as the
+app. Games are added to the result store; one JSON line per game, or a
+compact binary record per game, can also be written for later analysis.
+
+Usage:
+    python -m src.run_matches --games 1000 --x mock:heuristic --o mock:random
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from typing import List
+
+from src.agents.match_engine import AsyncMatchEngine, MatchResult
+from src.agents.prompts import PROMPT_FORMATS
+from src.config.settings import settings
+from src.game.game_record import GameRecord, GameRecordWriter
+from src.game.result_store import get_result_store
+
+
+def summarize(results: List[MatchResult], elapsed: float) -> dict:
+    """
+    Aggregate a batch of results.
+
+    Args:
+        results: Played games
+        elapsed: Wall-clock time of the batch, in seconds
+
+    Returns:
+        dict: Outcome rates, throughput and per-game costs
+    """
+    games = len(results)
+    outcomes = Counter(result.outcome for result in results)
+    moves = sum(len(result.moves) for result in results)
+    # Rates and averages of an empty batch are zero
+    per_game = 1 / games if games else 0.0
+    return {
+        "games": games,
+        "x_win_rate": outcomes[settings.PLAYER_X] * per_game,
+        "o_win_rate": outcomes[settings.PLAYER_O] * per_game,
+        "draw_rate": outcomes["draw"] * per_game,
+        "errors": outcomes["error"],
+        "games_per_minute": games / elapsed * 60 if elapsed else 0.0,
+        "avg_moves": moves * per_game,
+        "avg_game_seconds": sum(result.elapsed for result in results) * per_game,
+        "input_tokens": sum(result.input_tokens for result in results),
+        "output_tokens": sum(result.output_tokens for result in results),
+        "wasted_requests": sum(result.wasted_requests for result in results),
+        "fallback_moves": sum(result.fallback_moves for result in results),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play games between two models without the UI.")
+    parser.add_argument("--games", type=int, default=100, help="number of games")
+    parser.add_argument("--x", default="mock:heuristic", help="model for X (MODEL_OPTIONS name or provider:model)")
+    parser.add_argument("--o", default="mock:random", help="model for O (MODEL_OPTIONS name or provider:model)")
+    parser.add_argument("--size", type=int, default=settings.BOARD_SIZE, help="board size")
+    parser.add_argument("--win-length", type=int, default=settings.WIN_LENGTH, help="marks in a row to win")
+    parser.add_argument("--prompt-format", choices=PROMPT_FORMATS, default=settings.PROMPT_FORMAT, help="prompt format")
+    parser.add_argument("--stream", action=argparse.BooleanOptionalAction, default=None, help="stream replies")
+    parser.add_argument("--speculate", action=argparse.BooleanOptionalAction, default=None, help="prefetch replies")
+    parser.add_argument("--hedge", action=argparse.BooleanOptionalAction, default=None, help="hedge slow requests")
+    parser.add_argument("--output", default=None, help="write one JSON line per game to this file")
+    parser.add_argument("--archive", default=None, help="append the games to this compact binary archive")
+    args = parser.parse_args()
+
+    missing_keys = settings.get_missing_keys([args.x, args.o])
+    if missing_keys:
+        sys.exit("Missing API keys: " + "; ".join(key.replace("*", "").replace("`", "") for key in missing_keys))
+
+    model_x = settings.MODEL_OPTIONS.get(args.x, args.x)
+    model_o = settings.MODEL_OPTIONS.get(args.o, args.o)
+    engine = AsyncMatchEngine(stream=args.stream, speculate=args.speculate, hedge=args.hedge)
+    start = time.perf_counter()
+    results = asyncio.run(
+        engine.play_games([(model_x, model_o)] * args.games, args.size, args.win_length, args.prompt_format)
+    )
+    elapsed = time.perf_counter() - start
+    store = get_result_store()
+    for result in results:
+        store.record(result, "cli")
+    store.flush()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            for result in results:
+                f.write(json.dumps(result.to_dict()) + "\n")
+    if args.archive:
+        with GameRecordWriter(args.archive) as archive:
+            archive.write_all([GameRecord.from_result(result) for result in results])
+    print(f"{model_x} (X) vs {model_o} (O) in {elapsed:.1f}s")
+    for name, value in summarize(results, elapsed).items():
+        print(f"{name:>18}: {value:,.4f}" if isinstance(value, float) else f"{name:>18}: {value:,}")
@@ -0,0 +1,513 @@
+"""
+Resumable round-robin tournament between every configured model.
+
+Every model plays every other model with both colours, a fixed number of
+games per ordered pairing. The fixtures are cut into shards that run on a
+process pool; each worker process keeps one event loop and one match engine
+for its whole life, with the provider concurrency caps and rate limits split
+evenly between the workers so the pool as a whole stays within them.
+
+Completed games are appended to a JSONL checkpoint as each shard finishes,
+then to the result store under the checkpoint's run id and their fixture key.
+The store skips keys it already holds, and a resumed run first stores any
+checkpointed game the store missed, so the store counts each game once.
+Each game is keyed by its pairing, board variant, prompt format and game
+number, so rerunning the same command after a crash or Ctrl-C only plays the
+games that are missing. Games that ended in an error are not checkpointed
+and are played again on resume.
+
+Progress lines report games/hour and each provider's utilisation: the
+share of its concurrency slots (over all workers) that held a request.
+
+Usage:
+    python -m src.tournament --games-per-pairing 20 --models mock-random mock-heuristic mock-solver
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+from src.agents.match_engine import AsyncMatchEngine, MatchResult
+from src.agents.prompts import PROMPT_FORMATS, validate_prompt_format
+from src.agents.rate_limiter import RateLimiter
+from src.config.settings import settings
+from src.game.result_store import get_result_store
+from src.utils.logger import logger
+
+
+@dataclass
+class Fixture:
+    """One scheduled game."""
+
+    model_x: str
+    model_o: str
+    index: int
+    board_size: int
+    win_length: int
+    prompt_format: str
+
+    @property
+    def key(self) -> str:
+        """Checkpoint key; games of other variants or formats never collide."""
+        return (
+            f"{self.model_x}|{self.model_o}|{self.board_size}x{self.win_length}|{self.prompt_format}|{self.index}"
+        )
+
+
+@dataclass
+class Standing:
+    """A model's record over the checkpointed games."""
+
+    model: str
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+
+    @property
+    def games(self) -> int:
+        """Games played."""
+        return self.wins + self.draws + self.losses
+
+    @property
+    def score(self) -> float:
+        """Points per game: 1 for a win, 0.5 for a draw."""
+        return (self.wins + 0.5 * self.draws) / self.games if self.games else 0.0
+
+
+@dataclass
+class TournamentProgress:
+    """Throughput and provider load of the games played in this run."""
+
+    total: int
+    resumed: int
+    workers: int
+    played: int = 0
+    errors: int = 0
+    busy_seconds: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    requests: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    start: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the run started."""
+        return time.perf_counter() - self.start
+
+    @property
+    def games_per_hour(self) -> float:
+        """Games completed per hour in this run."""
+        return self.played / self.elapsed * 3600 if self.elapsed else 0.0
+
+    def utilisation(self, provider: str, caps: Dict[str, int]) -> float:
+        """
+        Share of a provider's concurrency slots in use since the run started.
+
+        Args:
+            provider: Provider prefix of a model string
+            caps: Per-worker concurrency caps
+
+        Returns:
+            float: Busy slot-seconds over available slot-seconds
+        """
+        available = caps.get(provider, 1) * self.workers * self.elapsed
+        return self.busy_seconds[provider] / available if available else 0.0
+
+
+def schedule(
+    models: List[str],
+    games_per_pairing: int,
+    board_size: int,
+    win_length: int,
+    prompt_format: str,
+) -> List[Fixture]:
+    """
+    List every game of a double round robin.
+
+    Fixtures are ordered game number first, so any contiguous shard mixes
+    pairings (and providers) instead of hammering one pairing at a time.
+
+    Args:
+        models: Model strings taking part
+        games_per_pairing: Games per ordered (X, O) pairing
+        board_size: Width and height of the board
+        win_length: Marks in a row needed to win
+        prompt_format: "verbose" or "compact" prompts
+
+    Returns:
+        List[Fixture]: All games of the tournament
+    """
+    return [
+        Fixture(model_x, model_o, index, board_size, win_length, prompt_format)
+        for index in range(games_per_pairing)
+        for model_x in models
+        for model_o in models
+        if model_x != model_o
+    ]
+
+
+def split_caps(workers: int) -> Tuple[Dict[str, int], Dict[str, Dict[str, int]], Dict[str, Dict[str, int]]]:
+    """
+    Share the provider limits between worker processes.
+
+    Args:
+        workers: Number of worker processes
+
+    Returns:
+        Tuple: Per-worker concurrency caps, provider rate limits and model rate limits
+    """
+
+    def share(limits: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+        # A limit of 0 means unlimited and stays 0
+        return {
+            scope: {name: max(1, value // workers) if value else 0 for name, value in limit.items()}
+            for scope, limit in limits.items()
+        }
+
+    caps = {provider: max(1, cap // workers) for provider, cap in settings.PROVIDER_CONCURRENCY.items()}
+    return caps, share(settings.RATE_LIMITS), share(settings.MODEL_RATE_LIMITS)
+
+
+class TournamentCheckpoint:
+    """Append-only JSONL file of completed games, headed by a run id line."""
+
+    def __init__(self, path: str):
+        """
+        Open a checkpoint file, creating its directory if needed.
+
+        Args:
+            path: JSONL file
+        """
+        self.path = path
+        # Set by load(): the id tying this checkpoint's games to their rows in the result store
+        self.run_id: Optional[str] = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Read the games completed so far.
+
+        A last line cut short by a crash is removed; its game is played again.
+        Sets run_id from the header line, writing one first for a new checkpoint.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Game records by fixture key
+        """
+        records = {}
+        self.run_id = None
+        if os.path.exists(self.path):
+            with open(self.path, "rb+") as f:
+                complete = 0
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Cut the partial line so the next append starts on a fresh one
+                        logger.warning(f"Dropping a truncated line at the end of {self.path}")
+                        f.truncate(complete)
+                        break
+                    complete += len(line)
+                    record = json.loads(line)
+                    if "key" not in record:
+                        self.run_id = record["run_id"]
+                        continue
+                    records[record["key"]] = record
+        if self.run_id is None:
+            self.run_id = uuid.uuid4().hex
+            self._write([{"run_id": self.run_id}])
+        return records
+
+    def append(self, records: List[Dict[str, Any]]):
+        """
+        Durably add completed games.
+
+        Args:
+            records: Game records, each with a "key"
+        """
+        self._write(records)
+
+    def _write(self, records: List[Dict[str, Any]]):
+        """Append JSON lines and fsync them."""
+        if not records:
+            return
+        with open(self.path, "a") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def standings(records: List[Dict[str, Any]]) -> List[Standing]:
+    """
+    Rank models by points per game.
+
+    Args:
+        records: Checkpointed game records
+
+    Returns:
+        List[Standing]: One entry per model, best first
+    """
+    table: Dict[str, Standing] = {}
+    for record in records:
+        x = table.setdefault(record["model_x"], Standing(record["model_x"]))
+        o = table.setdefault(record["model_o"], Standing(record["model_o"]))
+        if record["outcome"] == settings.PLAYER_X:
+            x.wins, o.losses = x.wins + 1, o.losses + 1
+        elif record["outcome"] == settings.PLAYER_O:
+            o.wins, x.losses = o.wins + 1, x.losses + 1
+        else:
+            x.draws, o.draws = x.draws + 1, o.draws + 1
+    return sorted(table.values(), key=lambda standing: (-standing.score, standing.model))
+
+
+# State of a worker process, set up once by _init_worker
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_engine: Optional[AsyncMatchEngine] = None
+
+
+def _init_worker(workers: int, stream: Optional[bool], speculate: Optional[bool], hedge: Optional[bool]):
+    """Create the worker's event loop and match engine with its share of the provider limits."""
+    global _worker_loop, _worker_engine
+    caps, provider_limits, model_limits = split_caps(workers)
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+    _worker_engine = AsyncMatchEngine(
+        caps,
+        limiter=RateLimiter(provider_limits, model_limits),
+        stream=stream,
+        speculate=speculate,
+        hedge=hedge,
+    )
+
+
+def _play_shard(fixtures: List[Fixture]) -> Tuple[List[Tuple[str, MatchResult]], Dict[str, float], Dict[str, int]]:
+    """
+    Play a shard of fixtures on the worker's loop.
+
+    Returns:
+        Tuple: (fixture key, result) pairs, and the slot-seconds and requests per provider spent on the shard
+    """
+    engine = _worker_engine
+    busy_before, requests_before = dict(engine.busy_seconds), dict(engine.requests)
+    first = fixtures[0]
+    results = _worker_loop.run_until_complete(
+        engine.play_games(
+            [(fixture.model_x, fixture.model_o) for fixture in fixtures],
+            first.board_size,
+            first.win_length,
+            first.prompt_format,
+        )
+    )
+    busy = {provider: seconds - busy_before.get(provider, 0.0) for provider, seconds in engine.busy_seconds.items()}
+    requests = {provider: count - requests_before.get(provider, 0) for provider, count in engine.requests.items()}
+    return [(fixture.key, result) for fixture, result in zip(fixtures, results)], busy, requests
+
+
+class Tournament:
+    """Schedules a round robin on a process pool and checkpoints its games."""
+
+    def __init__(
+        self,
+        models: List[str],
+        games_per_pairing: Optional[int] = None,
+        board_size: Optional[int] = None,
+        win_length: Optional[int] = None,
+        prompt_format: Optional[str] = None,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        stream: Optional[bool] = None,
+        speculate: Optional[bool] = None,
+        hedge: Optional[bool] = None,
+    ):
+        """
+        Set up a tournament.
+
+        Args:
+            models: Model strings taking part (at least two)
+            games_per_pairing: Games per ordered pairing (default: settings.TOURNAMENT_GAMES_PER_PAIRING)
+            board_size: Width and height of the board (default: settings.BOARD_SIZE)
+            win_length: Marks in a row needed to win (default: settings.WIN_LENGTH)
+            prompt_format: "verbose" or "compact" prompts (default: settings.PROMPT_FORMAT)
+            workers: Worker processes (default: settings.TOURNAMENT_WORKERS)
+            chunk_size: Games per shard (default: settings.TOURNAMENT_CHUNK_SIZE)
+            checkpoint_path: JSONL file of completed games (default: settings.TOURNAMENT_CHECKPOINT_PATH)
+            stream: Stream replies and stop at the first legal move (default: settings.STREAM_MOVES)
+            speculate: Prefetch the opponent's replies (default: settings.SPECULATIVE_PREFETCH)
+            hedge: Duplicate requests that run past their model's tail latency (default: settings.HEDGE_REQUESTS)
+
+        Raises:
+            ValueError: If fewer than two models are given or the prompt format is not supported
+        """
+        if len(set(models)) < 2:
+            error_msg = f"A tournament needs at least two models, got: {', '.join(models) or 'none'}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        self.models = list(dict.fromkeys(models))
+        self.games_per_pairing = games_per_pairing or settings.TOURNAMENT_GAMES_PER_PAIRING
+        self.board_size = board_size or settings.BOARD_SIZE
+        self.win_length = win_length or settings.WIN_LENGTH
+        self.prompt_format = validate_prompt_format(prompt_format or settings.PROMPT_FORMAT)
+        self.workers = workers or settings.TOURNAMENT_WORKERS
+        self.chunk_size = chunk_size or settings.TOURNAMENT_CHUNK_SIZE
+        self.checkpoint = TournamentCheckpoint(checkpoint_path or settings.TOURNAMENT_CHECKPOINT_PATH)
+        self.engine_options = (stream, speculate, hedge)
+        self.caps, _, _ = split_caps(self.workers)
+
+    def fixtures(self) -> List[Fixture]:
+        """All games of the tournament, checkpointed or not."""
+        return schedule(self.models, self.games_per_pairing, self.board_size, self.win_length, self.prompt_format)
+
+    def _report(self, progress: TournamentProgress):
+        """Log throughput, ETA and provider utilisation."""
+        done = progress.resumed + progress.played
+        remaining = progress.total - done
+        eta = remaining / progress.games_per_hour * 3600 if progress.games_per_hour else 0.0
+        utilisation = ", ".join(
+            f"{provider} {progress.utilisation(provider, self.caps):.0%} ({progress.requests[provider]} requests)"
+            for provider in sorted(progress.busy_seconds)
+        )
+        logger.info(
+            f"Tournament: {done}/{progress.total} games ({progress.errors} errors to replay), "
+            f"{progress.games_per_hour:,.0f} games/hour, ETA {eta / 60:.1f} min; utilisation: {utilisation or '-'}"
+        )
+
+    def run(self) -> List[Dict[str, Any]]:
+        """
+        Play every game not checkpointed yet.
+
+        Interrupting the run (Ctrl-C) cancels the shards that have not started;
+        the finished ones are already checkpointed.
+
+        Returns:
+            List[Dict[str, Any]]: Checkpointed records of this tournament's games
+        """
+        fixtures = self.fixtures()
+        done = self.checkpoint.load()
+        self._sync_store(done)
+        todo = [fixture for fixture in fixtures if fixture.key not in done]
+        progress = TournamentProgress(len(fixtures), len(fixtures) - len(todo), self.workers)
+        logger.info(
+            f"Tournament of {len(self.models)} models, {self.games_per_pairing} games per pairing: "
+            f"{len(todo)} of {len(fixtures)} games to play on {self.workers} workers"
+        )
+
+        if todo:
+            shards = [todo[start:start + self.chunk_size] for start in range(0, len(todo), self.chunk_size)]
+            # Spawned workers start clean instead of inheriting this process's threads and event loop
+            executor = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.workers, *self.engine_options),
+            )
+            pending: Set[Future] = {executor.submit(_play_shard, shard) for shard in shards}
+            try:
+                while pending:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        self._collect(future.result(), progress, done)
+                    self._report(progress)
+            except KeyboardInterrupt:
+                logger.warning("Tournament interrupted; run the same command again to resume")
+                raise
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+                get_result_store().flush()
+
+        keys = {fixture.key for fixture in fixtures}
+        return [record for key, record in done.items() if key in keys]
+
+    def _store_key(self, fixture_key: str) -> str:
+        """Result store key of a game: unique across checkpoints, stable across resumes."""
+        return f"tournament|{self.checkpoint.run_id}|{fixture_key}"
+
+    def _sync_store(self, done: Dict[str, Dict[str, Any]]):
+        """Store checkpointed games the result store missed, e.g. when a run died before its writer flushed."""
+        store = get_result_store()
+        stored = store.keys(self._store_key(""))
+        missing = [record for key, record in done.items() if self._store_key(key) not in stored]
+        for record in missing:
+            store.record(
+                MatchResult.from_dict(record), "tournament", record["finished_at"], self._store_key(record["key"])
+            )
+        if missing:
+            store.flush()
+            logger.info(f"Stored {len(missing)} checkpointed games missing from the result store")
+
+    def _collect(
+        self,
+        shard: Tuple[List[Tuple[str, MatchResult]], Dict[str, float], Dict[str, int]],
+        progress: TournamentProgress,
+        done: Dict[str, Dict[str, Any]],
+    ):
+        """Checkpoint a finished shard and add it to the progress counters."""
+        results, busy, requests = shard
+        records, played = [], []
+        for key, result in results:
+            if result.error:
+                progress.errors += 1
+                continue
+            record = result.to_dict()
+            record.update(key=key, finished_at=time.time())
+            records.append(record)
+            played.append((record, result))
+        self.checkpoint.append(records)
+        # Keyed, so a game replayed because its checkpoint line was lost is not stored twice
+        store = get_result_store()
+        for record, result in played:
+            store.record(result, "tournament", record["finished_at"], self._store_key(record["key"]))
+        done.update((record["key"], record) for record in records)
+        progress.played += len(records)
+        for provider, seconds in busy.items():
+            progress.busy_seconds[provider] += seconds
+        for provider, count in requests.items():
+            progress.requests[provider] += count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play a resumable round-robin tournament between models.")
+    parser.add_argument("--models", nargs="+", default=None, help="MODEL_OPTIONS names (default: all with keys)")
+    parser.add_argument("--games-per-pairing", type=int, default=settings.TOURNAMENT_GAMES_PER_PAIRING,
+                        help="games per ordered pairing")
+    parser.add_argument("--size", type=int, default=settings.BOARD_SIZE, help="board size")
+    parser.add_argument("--win-length", type=int, default=settings.WIN_LENGTH, help="marks in a row to win")
+    parser.add_argument("--prompt-format", choices=PROMPT_FORMATS, default=settings.PROMPT_FORMAT, help="prompt format")
+    parser.add_argument("--workers", type=int, default=settings.TOURNAMENT_WORKERS, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=settings.TOURNAMENT_CHUNK_SIZE, help="games per shard")
+    parser.add_argument("--checkpoint", default=settings.TOURNAMENT_CHECKPOINT_PATH, help="checkpoint file")
+    parser.add_argument("--stream", action=argparse.BooleanOptionalAction, default=None, help="stream replies")
+    parser.add_argument("--speculate", action=argparse.BooleanOptionalAction, default=None, help="prefetch replies")
+    parser.add_argument("--hedge", action=argparse.BooleanOptionalAction, default=None, help="hedge slow requests")
+    args = parser.parse_args()
+
+    names = args.models or [name for name in settings.MODEL_OPTIONS if not settings.get_missing_keys([name])]
+    missing_keys = settings.get_missing_keys(names)
+    if missing_keys:
+        sys.exit("Missing API keys: " + "; ".join(key.replace("*", "").replace("`", "") for key in missing_keys))
+    tournament = Tournament(
+        [settings.MODEL_OPTIONS.get(name, name) for name in names],
+        args.games_per_pairing,
+        args.size,
+        args.win_length,
+        args.prompt_format,
+        args.workers,
+        args.chunk_size,
+        args.checkpoint,
+        args.stream,
+        args.speculate,
+        args.hedge,
+    )
+    start = time.perf_counter()
+    records = tournament.run()
+    print(f"{len(records)} games in {time.perf_counter() - start:.1f}s ({args.checkpoint})")
+    print(f"{'model':>28}  {'games':>6}  {'W':>5}  {'D':>5}  {'L':>5}  {'score':>6}")
+    for standing in standings(records):
+        print(
+            f"{standing.model:>28}  {standing.games:>6}  {standing.wins:>5}  {standing.draws:>5}  "
+            f"{standing.losses:>5}  {standing.score:>6.3f}"
+        )
@@ -4,12 +4,31 @@ UI components for the Tic Tac Toe application.
 
 import streamlit as st
 from typing import Tuple, Optional
-from src.game.board import TicTacToeBoard
+from src.game.board import Position, TicTacToeBoard
 
 
 class UIComponents:
     """UI components for displaying game elements."""
 
+    @staticmethod
+    def board_style(size: int) -> str:
+        """
+        Build the inline CSS variables that size a board grid.
+
+        Args:
+            size: Width and height of the board in cells
+
+        Returns:
+            str: Inline style declaring the grid dimensions
+        """
+        cell_px = min(120, 480 // size)
+        mini_px = max(8, min(28, 90 // size))
+        return (
+            f"--board-size: {size}; --cell-size: {cell_px}px; "
+            f"--cell-font-size: {3.5 * cell_px / 120:.2f}em; "
+            f"--mini-cell-size: {mini_px}px; --mini-font-size: {max(6, mini_px // 2)}px;"
+        )
+
     @staticmethod
     def display_board(board: TicTacToeBoard) -> None:
         """
@@ -18,16 +37,26 @@ class UIComponents:
         Args:
             board: TicTacToeBoard instance to display
         """
-        board_html = '<div class="game-board">'
+        board_html = f'<div class="game-board" style="{UIComponents.board_style(board.size)}">'
 
-        for i in range(3):
-            for j in range(3):
-                cell_value = board.board[i][j]
-                board_html += f'<div class="board-cell">{cell_value}</div>'
+        for cell_value in board.cells():
+            board_html += f'<div class="board-cell">{cell_value}</div>'
 
         board_html += "</div>"
         st.markdown(board_html, unsafe_allow_html=True)
 
+    @staticmethod
+    def show_perfect_play_hint(board: TicTacToeBoard) -> None:
+        """
+        Show the perfect-play outcome of the current position, when it is in the outcome table.
+
+        Args:
+            board: TicTacToeBoard instance being displayed
+        """
+        entry = board.outcome_entry()
+        if entry and entry.reachable and not entry.terminal:
+            st.caption(f"🎯 Perfect play from here: {entry.outcome_name}")
+
     @staticmethod
     def show_agent_status(agent_name: str, status: str) -> None:
         """
@@ -65,34 +94,60 @@ class UIComponents:
 
     @staticmethod
     def create_mini_board_html(
-        board_state: list, highlight_pos: Optional[Tuple[int, int]] = None, is_player1: bool = True
+        position: Position, highlight_pos: Optional[Tuple[int, int]] = None, is_player1: bool = True
     ) -> str:
         """
         Create HTML for a mini board with player-specific highlighting.
 
         Args:
-            board_state: Current state of the board
+            position: Board snapshot to draw
             highlight_pos: Position to highlight (row, col)
             is_player1: Whether this is player 1's move
 
         Returns:
             str: HTML string for the mini board
         """
-        html = '<div class="mini-board">'
-        for i in range(3):
-            for j in range(3):
-                highlight = (
-                    f"highlight player{1 if is_player1 else 2}"
-                    if highlight_pos and (i, j) == highlight_pos
-                    else ""
-                )
-                html += f'<div class="mini-cell {highlight}">{board_state[i][j]}</div>'
+        size = position.size
+        highlight_index = highlight_pos[0] * size + highlight_pos[1] if highlight_pos else -1
+        html = f'<div class="mini-board" style="{UIComponents.board_style(size)}">'
+        for index, cell_value in enumerate(position.cells()):
+            highlight = f"highlight player{1 if is_player1 else 2}" if index == highlight_index else ""
+            html += f'<div class="mini-cell {highlight}">{cell_value}</div>'
         html += "</div>"
         return html
 
     @staticmethod
-    def display_move_history() -> None:
-        """Display the move history with mini boards in two columns."""
+    def create_move_usage_html(move: dict) -> str:
+        """
+        Create the token and latency line of a move history entry.
+
+        Args:
+            move: Move history entry
+
+        Returns:
+            str: HTML line, or an empty string for moves that made no request (e.g. cache hits)
+        """
+        if not move.get("latency_ms"):
+            return ""
+        usage = f'{move["latency_ms"]:.0f}ms'
+        if move["input_tokens"] or move["output_tokens"]:
+            usage = f'{move["input_tokens"]} in / {move["output_tokens"]} out tokens · {usage} ({move["prompt_format"]})'
+        if move.get("cancelled"):
+            usage += f' · move after {move["time_to_move_ms"]:.0f}ms, ~{move["tokens_saved"]} tokens saved'
+        if move.get("wasted"):
+            usage += f' · {move["requests"]} requests'
+        if move.get("fallback"):
+            usage += " · fallback move"
+        return f'<div style="font-size: 0.8em; color: #888">{usage}</div>'
+
+    @staticmethod
+    def display_move_history(board: TicTacToeBoard) -> None:
+        """
+        Display the move history with mini boards in two columns.
+
+        Args:
+            board: Board of the game being played; its move stack supplies each ply's position
+        """
         st.markdown(
             '<h3 style="margin-bottom: 30px;">📜 Game History</h3>',
             unsafe_allow_html=True,
@@ -103,22 +158,19 @@ class UIComponents:
             # Split moves into player 1 and player 2 moves
             p1_moves = []
             p2_moves = []
-            current_board = [[" " for _ in range(3)] for _ in range(3)]
 
             # Process all moves first
-            for move in st.session_state.move_history:
-                row, col = map(int, move["move"].split(","))
+            for ply, move in enumerate(st.session_state.move_history[:board.ply], start=1):
+                row, col = board.move_at(ply)
                 is_player1 = "Player 1" in move["player"]
-                symbol = "X" if is_player1 else "O"
-                current_board[row][col] = symbol
-                board_copy = [row[:] for row in current_board]
 
                 move_html = f"""<div class="move-entry player{1 if is_player1 else 2}">
-                    {UIComponents.create_mini_board_html(board_copy, (row, col), is_player1)}
+                    {UIComponents.create_mini_board_html(board.position_at(ply), (row, col), is_player1)}
                     <div class="move-info">
                         <div class="move-number player{1 if is_player1 else 2}">Move #{move["number"]}</div>
                         <div>{move["player"]}</div>
                         <div style="font-size: 0.9em; color: #888">Position: ({row}, {col})</div>
+                        {UIComponents.create_move_usage_html(move)}
                     </div>
                 </div>"""
 
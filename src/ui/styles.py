@@ -50,7 +50,7 @@ CUSTOM_CSS = """
 /* Game Board - Glass Morphism with Glow */
 .game-board {
     display: grid;
-    grid-template-columns: repeat(3, 120px);
+    grid-template-columns: repeat(var(--board-size, 3), var(--cell-size, 120px));
     gap: 12px;
     justify-content: center;
     margin: 2em auto;
@@ -78,12 +78,12 @@ CUSTOM_CSS = """
 
 /* Board Cells - Animated with Glow */
 .board-cell {
-    width: 120px;
-    height: 120px;
+    width: var(--cell-size, 120px);
+    height: var(--cell-size, 120px);
     display: flex;
     align-items: center;
     justify-content: center;
-    font-size: 3.5em;
+    font-size: var(--cell-font-size, 3.5em);
     font-weight: 700;
     background: rgba(255, 255, 255, 0.05);
     backdrop-filter: blur(5px);
@@ -309,7 +309,7 @@ CUSTOM_CSS = """
 /* Mini Board - Enhanced */
 .mini-board {
     display: grid;
-    grid-template-columns: repeat(3, 28px);
+    grid-template-columns: repeat(var(--board-size, 3), var(--mini-cell-size, 28px));
     gap: 3px;
     background: rgba(255, 255, 255, 0.05);
     padding: 4px;
@@ -319,12 +319,12 @@ CUSTOM_CSS = """
 }
 
 .mini-cell {
-    width: 28px;
-    height: 28px;
+    width: var(--mini-cell-size, 28px);
+    height: var(--mini-cell-size, 28px);
     display: flex;
     align-items: center;
     justify-content: center;
-    font-size: 14px;
+    font-size: var(--mini-font-size, 14px);
     font-weight: 700;
     background: rgba(255, 255, 255, 0.03);
     color: #fff;
@@ -479,15 +479,15 @@ CUSTOM_CSS = """
 /* Responsive Design */
 @media (max-width: 768px) {
     .game-board {
-        grid-template-columns: repeat(3, 90px);
+        grid-template-columns: repeat(var(--board-size, 3), calc(var(--cell-size, 120px) * 0.75));
         gap: 8px;
         padding: 15px;
     }
 
     .board-cell {
-        width: 90px;
-        height: 90px;
-        font-size: 2.5em;
+        width: calc(var(--cell-size, 120px) * 0.75);
+        height: calc(var(--cell-size, 120px) * 0.75);
+        font-size: calc(var(--cell-font-size, 3.5em) * 0.7);
     }
 
     .main-title {